@@ -0,0 +1,148 @@
+"""
+Scenario Benchmarks
+===================
+
+Times the bee simulation end to end on a fixed set of scenarios so that its
+speed can be compared across commits.
+
+Each scenario is a map, the base parameter file and a few parameter overrides,
+always with the same seed. Each one is run headless in batch mode for a fixed
+number of ticks, as a separate `main.py -b` process so that peak memory is per
+scenario. The results are ticks per second, peak memory and the seconds spent
+in each phase of a tick, and they are written to a JSON file.
+
+Example:
+    $ python benchmark.py -o before.json
+    $ git checkout my-branch
+    $ python benchmark.py -o after.json --compare before.json
+"""
+
+# Standard library imports
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+import tempfile
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from sweep import read_parameter_file, run_one, SWEEP_STATUS_OK
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_SEED = 12345
+BENCHMARK_PARAMS = os.path.join(HERE, "params.csv")
+
+# name -> (map file, parameter overrides)
+SCENARIOS = {
+    "oasis": ("map_oasis.csv", {}),
+    "noise": ("random_noise_map.csv", {}),
+    "test": ("test_map.csv", {}),
+    "oasis_workers_60": ("map_oasis.csv", {"H_INITIAL_WORKERS": 60}),
+    "oasis_workers_150": ("map_oasis.csv", {"H_INITIAL_WORKERS": 150, "N_OBSTACLES": 20}),
+}
+
+def git_commit() -> str | None:
+    """The commit being benchmarked, with a + if the tree has uncommitted changes.
+
+    Returns:
+        str | None: The short commit hash, or None outside a git checkout
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("+" if dirty else "")
+
+def run_scenario(name: str, ticks: int, repeat: int, workdir: str) -> dict:
+    """Run one scenario repeat times and keep its fastest run.
+
+    Args:
+        name: Key of the scenario in SCENARIOS
+        ticks: Number of ticks per run
+        repeat: Number of runs
+        workdir: Directory for the runs' parameter files
+
+    Returns:
+        dict: The fastest run's summary, plus the ticks per second of every run
+    """
+    mapfile, overrides = SCENARIOS[name]
+    parameters = {**read_parameter_file(BENCHMARK_PARAMS), **overrides, "SEED": BENCHMARK_SEED}
+    best = None
+    rates = []
+    for attempt in range(repeat):
+        summary = run_one(os.path.join(HERE, mapfile), parameters, ticks, workdir, attempt)
+        if summary["status"] != SWEEP_STATUS_OK:
+            return summary
+        rates.append(summary["ticks_per_second"])
+        if best is None or summary["ticks_per_second"] > best["ticks_per_second"]:
+            best = summary
+    best["all_ticks_per_second"] = rates
+    return best
+
+def compare(results: dict, baseline: dict) -> None:
+    """Print each scenario's ticks per second against a baseline results file.
+
+    Args:
+        results: Results from this run
+        baseline: Results loaded from an earlier benchmark file
+    """
+    print(f"{'scenario':<20}{'before':>10}{'after':>10}{'speedup':>10}")
+    for name, summary in results["scenarios"].items():
+        before = baseline["scenarios"].get(name, {}).get("ticks_per_second")
+        after = summary.get("ticks_per_second")
+        if before is None or after is None:
+            print(f"{name:<20}{'-':>10}{'-' if after is None else after:>10}{'-':>10}")
+            continue
+        print(f"{name:<20}{before:>10}{after:>10}{after / before:>9.2f}x")
+    if baseline.get("ticks") != results["ticks"]:
+        print(f"Note: the baseline ran {baseline.get('ticks')} ticks per scenario, this run {results['ticks']}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the bee simulation on fixed-seed scenarios.")
+    parser.add_argument('-t', '--ticks', type=int, default=1000, help='Number of ticks per scenario (default=1000).')
+    parser.add_argument('-n', '--repeat', type=int, default=1, help='Runs per scenario, the fastest is kept (default=1).')
+    parser.add_argument('-s', '--scenario', action='append', choices=list(SCENARIOS), help='Scenario to run. Repeat for more (default=all).')
+    parser.add_argument('-o', '--output', type=str, default="benchmark_results.json", help='Path of the results JSON (default=benchmark_results.json).')
+    parser.add_argument('-c', '--compare', type=str, help='Earlier results JSON to compare ticks per second against.')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, mode='r') as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Error: could not read {args.compare}: {e}")
+            sys.exit(1)
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "ticks": args.ticks,
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="bee_benchmark_") as workdir:
+        for name in args.scenario or SCENARIOS:
+            summary = run_scenario(name, args.ticks, max(1, args.repeat), workdir)
+            results["scenarios"][name] = summary
+            rate = summary.get("ticks_per_second", summary["status"])
+            print(f"{name}: {rate} ticks/s, peak {summary.get('peak_memory_mb', '-')} MB", file=sys.stderr)
+
+    with open(args.output, mode='w') as file:
+        json.dump(results, file, indent=2)
+        file.write("\n")
+
+    if baseline is not None:
+        compare(results, baseline)
+
+if __name__ == "__main__":
+    main()
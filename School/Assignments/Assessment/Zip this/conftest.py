@@ -0,0 +1,37 @@
+"""
+Shared pytest fixtures.
+
+main.py is a script: it reads its command line and sets up the simulation as
+soon as it runs. The fixture below runs it headless in batch mode on the oasis
+map without its __main__ block, so the tests get its classes and functions and
+a ready-made simulation to work with, without running the batch loop.
+"""
+
+# Standard library imports
+import os
+import sys
+import runpy
+import types
+
+# Third-party imports
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture(scope="module")
+def bee_sim() -> types.SimpleNamespace:
+    """The globals of a freshly set up main.py, one per test module.
+
+    Functions defined in main.py keep using their own module globals, so
+    changing an attribute of the namespace does not change a constant.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    argv, cwd = sys.argv, os.getcwd()
+    sys.argv = ["main.py", "-b", "-f", "map_oasis.csv", "-p", "params.csv"]
+    os.chdir(HERE)
+    try:
+        namespace = runpy.run_path(os.path.join(HERE, "main.py"), run_name="bee_sim")
+    finally:
+        sys.argv = argv
+        os.chdir(cwd)
+    return types.SimpleNamespace(**namespace)
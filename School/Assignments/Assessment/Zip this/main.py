@@ -19,16 +19,26 @@ Key Features:
 """
 
 # Standard library imports
+import os
 import sys
 import random
 import math
 import argparse
+import glob
+import hashlib
+import json
 import time
+from collections import OrderedDict, deque
+
+# Optional: only used to report peak memory in batch mode, not available on Windows
+try:
+    import resource
+except ImportError:
+    resource = None
 
 # Third-party imports  
 import pygame
 import numpy as np
-from noise import pnoise2
 import csv
 
 # Configuration Constants
@@ -38,12 +48,25 @@ import csv
 WINDOW_WIDTH, WINDOW_HEIGHT = 1280, 720  # Window dimensions
 MAP_SIZE = 128  # World grid size
 FPS = 60  # Target frames per second
+BATCH_DEFAULT_TICKS = 3600  # Ticks simulated by batch mode when --ticks is not given
+SIM_SPEEDS = (1, 10, 100)  # Simulation ticks per rendered frame selected by the 1, 2 and 3 keys
+SIM_MAX_FRAME_SKIP = 5  # Most frames in a row that can go undrawn while the simulation catches up
+SNAPSHOT_FORMAT_VERSION = 2  # Bumped whenever the contents of a snapshot file change
+SNAPSHOT_NAME = "snapshot_{tick:08d}.npz"  # File name of the snapshot taken at a tick
+CHECKPOINT_NAME = "checkpoint_{tick:08d}.npz"  # File name of the checkpoint taken at a tick
+CHECKPOINT_KEEP = 3  # Number of most recent checkpoints kept, older ones are deleted
+PROFILER_HISTORY_FRAMES = 300  # Frames the phase profiler averages over and exports
+PROFILER_EXPORT_INTERVAL = 60  # Frames between rewrites of the --profile-out file
 TEXT_COLOUR = (255, 255, 255)
+TEXT_CACHE_SIZE = 512  # Rendered text surfaces kept by draw_text, least recently used are dropped first
+CIRCLE_SPRITE_CACHE_SIZE = 16384  # Circle sprites kept before they are all dropped and rendered again, bees each have their own colour
 
 # Map generation
 N_OBSTACLES = 30  # Number of obstacles
 AVOID_EDGE_MARGIN = 5  # Distance from edge to start avoidance
 AVOID_EDGE_STRENGTH = 0.00007  # Force multiplier for edge avoidance
+OBSTACLE_FIELD_RESOLUTION = 4  # Obstacle field samples per grid unit
+OBSTACLE_FIELD_TILE_SIZE = 256  # Obstacle field samples along each side of a tile, tiles are only allocated near obstacles
 
 # Visual settings
 BACKGROUND_FILL_COLOUR = (50, 50, 50)
@@ -65,11 +88,29 @@ CREATURE_MIN_VELOCITY = 0.02
 H_INITIAL_WORKERS = 20
 H_INITIAL_QUEENS = 1
 H_BEE_COOLDOWN = 3
+H_HATCH_BATCH = 1  # Most eggs a hive hatches per egg update, 1 hatches them one at a time
+H_EGG_MATURE_VALUE = -30  # Eggs at or below this value hatch
+H_HATCH_HONEY_VALUE = 80  # Cells holding more honey than this can feed a hatching egg
+H_HATCH_HONEY_CELLS = 2  # Full honey cells emptied for each hatched egg
+HIVE_LOD_INTERVAL = 60  # Ticks between updates of a hive's aggregate interior model
+HIVE_LOD_DEPOSIT_RATE = 0.06  # Honey an unloading worker puts into the comb per tick, measured on the per-bee model
+HIVE_LOD_EGG_RATE = 0.0067  # Eggs a queen lays per tick while she can, measured on the per-bee model
+HIVE_LOD_ENERGY_PER_HONEY = 5  # Energy a worker regains per unit of honey it deposits (0.5 per 0.1 deposit)
+HIVE_LOD_CELL_CAPACITY = 100.1  # Most honey a cell reaches, after a last 0.1 deposit into a cell holding 100
 COMB_WIDTH, COMB_HEIGHT = 12, 9
 EGG_CELL_VALUE = -2
+HIVE_INTERIOR_SIZE = 40  # Bees inside a hive move on a 40x40 grid of hive positions
+COMB_ORIGIN = 5  # Hive position of the first comb cell's centre, along both axes
+COMB_RADIUS = 1  # Distance from a comb cell's centre to its sides, bees within it can use the cell
+COMB_ROW_SPACING = 2 * COMB_RADIUS / np.cos(np.pi / 6)  # Distance between the centres of neighbouring comb rows
+
+# Bee population storage
+BEE_ROLES = ("worker", "queen", "drone")  # Role names, indexed by the role codes held in BeeStore
+BEE_STORE_INITIAL_CAPACITY = 256
 
 # Flower properties
 F_SIZE = 8
+F_MAX_BEES = 25  # Flowers visited by more bees than this are not sought out
 
 # Background generation parameters
 BG_NOISE_OCTAVES = 8
@@ -80,6 +121,27 @@ BG_COLOUR_VIBRANCY_EXP = 0.5
 BG_COLOUR_DULLNESS_EXP = 1.1
 BG_TILE_BORDER_DARKEN_FACTOR = 0.5
 BG_TILE_BORDER_THRESHOLD_SCALE = 16
+MAP_CACHE_SUFFIX = ".npz"  # Parsed CSV maps are cached beside the map file with this suffix added
+
+# Binary map format: a fixed 64 byte header followed by the terrain values in row-major order
+MAP_FILE_MAGIC = b"BEEMAP01"
+MAP_HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("height", "<u8"),  # rows, the first axis of maparr
+    ("width", "<u8"),
+    ("dtype", "S8"),  # numpy dtype string of the terrain values, e.g. b"<f4"
+    ("water_threshold", "<f8"),
+    ("sand_threshold", "<f8"),
+    ("reserved", "V16"),
+])
+MAP_FILE_DTYPE = np.float32  # Terrain value type written by the CSV converter
+MAP_VALIDATE_BLOCK_ROWS = 256  # Rows of a binary map range-checked at a time when it is loaded
+WATER_FIELD_SMOOTHING = 2  # Cells either side of a shoreline that bees are pushed away from water
+WORLD_CHUNK_SIZE = 64  # Cells along each side of a lazily generated terrain chunk
+WORLD_CHUNK_CACHE_BYTES = 64 * 1024 * 1024  # Memory budget for cached terrain chunks
+VIEW_INDEX_CELL_SIZE = 16  # Grid units along each side of a cell of the index used to find entities in view
+VIEW_CULL_MARGIN = 4  # Grid units a hive, flower or obstacle can reach from its position, see view_rect for bees
+VIEW_CULL_MARGIN_PX = 40  # Pixels the text labels and bee outlines drawn next to entities can reach
 
 # Initialize Pygame
 pygame.init()
@@ -165,6 +227,165 @@ def screenpos2hive(x: pygame.Vector2) -> pygame.Vector2:
     """
     return ((x - pygame.Vector2(WINDOW_WIDTH-410, WINDOW_HEIGHT-410)) / 10)
 
+def comb_layout() -> list[tuple]:
+    """Centres of a hive's comb cells in hive coordinates.
+
+    The cells form a hex grid of COMB_HEIGHT rows of COMB_WIDTH cells, with
+    the even rows shifted half a cell to the right. Cells are listed in
+    row-major order, the same order as the flattened combs_honey array.
+
+    Returns:
+        list[tuple]: (x, y) of each cell
+    """
+    combs = []
+    for i in range(COMB_HEIGHT):
+        y_pos = COMB_ORIGIN + i * COMB_ROW_SPACING
+        offset_val = COMB_RADIUS if i % 2 == 0 else 0
+        for j in range(COMB_WIDTH):
+            combs.append((COMB_ORIGIN + j * 2 * COMB_RADIUS + offset_val, y_pos))
+    return combs
+
+COMB_CENTRES = np.array(comb_layout())
+
+def comb_cells_near(x: float, y: float) -> list[int]:
+    """Comb cells that could be within COMB_RADIUS of a hive position.
+
+    Rows are further apart than two radii, so only the nearest row can be
+    close enough, and in that row only the two cells either side of x. The
+    caller still checks the exact distance.
+
+    Args:
+        x: X-coordinate in the hive
+        y: Y-coordinate in the hive
+
+    Returns:
+        list[int]: Flat indices of at most two cells, in row-major order
+    """
+    row = round((y - COMB_ORIGIN) / COMB_ROW_SPACING)
+    if not 0 <= row < COMB_HEIGHT:
+        return []
+    offset_val = COMB_RADIUS if row % 2 == 0 else 0
+    column = math.floor((x - COMB_ORIGIN - offset_val) / (2 * COMB_RADIUS))
+    return [row * COMB_WIDTH + j for j in (column, column + 1) if 0 <= j < COMB_WIDTH]
+
+class TextCache():
+    """Least-recently-used cache of rendered text surfaces.
+
+    Rendering text is slow and most labels are the same from one frame to
+    the next, so surfaces are kept keyed by (text, font, colour). Cached
+    surfaces are shared, so they must only be blitted, never drawn on.
+
+    Attributes:
+        max_entries (int): Most surfaces kept
+        surfaces (OrderedDict): (text, font, colour) -> surface, least recently used first
+        hits (int): Lookups answered from the cache
+        misses (int): Lookups that had to render
+    """
+
+    def __init__(self, max_entries: int = TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text: str, font: pygame.font.Font, colour) -> pygame.Surface:
+        """Rendered surface of a text, from the cache if it is there.
+
+        Args:
+            text: Text to render
+            font: Font to render it in
+            colour: Colour of the text
+
+        Returns:
+            pygame.Surface: The rendered text
+        """
+        key = (text, font, tuple(colour))
+        text_surface = self.surfaces.get(key)
+        if text_surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return text_surface
+        self.misses += 1
+        text_surface = font.render(text, True, colour)
+        self.surfaces[key] = text_surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return text_surface
+
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache, 0 before any lookup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+TEXT_CACHE = TextCache()
+
+class CircleSprites():
+    """Pre-rendered filled circles, so many circles can be drawn with one Surface.blits call.
+
+    pygame.draw.circle truncates its centre and radius to whole pixels, so
+    sprites are keyed by (colour, whole radius) and drawn on a transparent
+    surface with the same call. Blitting one at the truncated centre gives
+    exactly the pixels drawing the circle would. The radii in use change
+    with the zoom, so every sprite is dropped when the scale changes, and
+    also when more than max_entries have piled up.
+
+    Attributes:
+        max_entries (int): Most sprites kept
+        sprites (dict): (colour, radius) -> sprite surface
+        scaled (float): Scale the sprites were rendered for
+    """
+
+    def __init__(self, max_entries: int = CIRCLE_SPRITE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.sprites = {}
+        self.scaled = None
+
+    def rescale(self, scaled: float) -> None:
+        """Drop every sprite if the scale has changed since they were rendered.
+
+        Args:
+            scaled: Current scale factor
+        """
+        if scaled != self.scaled:
+            self.sprites.clear()
+            self.scaled = scaled
+
+    def sprite(self, colour: tuple, radius: int) -> pygame.Surface:
+        """The sprite of a filled circle, rendering it if it is not cached.
+
+        The circle's centre is at (radius, radius) in the sprite.
+
+        Args:
+            colour: RGB colour of the circle
+            radius: Radius in whole pixels
+
+        Returns:
+            pygame.Surface: The sprite
+        """
+        key = (colour, radius)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            if len(self.sprites) >= self.max_entries:
+                self.sprites.clear()
+            sprite = pygame.Surface((2 * radius + 2, 2 * radius + 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, colour, (radius, radius), radius)
+            self.sprites[key] = sprite
+        return sprite
+
+    def blit_item(self, colour: tuple, centre: tuple, radius: float) -> tuple:
+        """A (sprite, position) pair for Surface.blits that draws a filled circle.
+
+        Args:
+            colour: RGB colour of the circle
+            centre: (x, y) screen position of the centre
+            radius: Radius in pixels
+
+        Returns:
+            tuple: The sprite and the screen position of its top left corner
+        """
+        radius = int(radius)
+        return self.sprite(colour, radius), (int(centre[0]) - radius, int(centre[1]) - radius)
+
 def draw_text(surface: pygame.Surface, text: str, font: pygame.font.Font, 
               colour: tuple, position: tuple, anchor: str = "topleft") -> None:
     """Draw text on a surface with specified parameters.
@@ -177,7 +398,7 @@ def draw_text(surface: pygame.Surface, text: str, font: pygame.font.Font,
         position: Position to draw at
         anchor: Text anchor point ("topleft", "center", etc.)
     """
-    text_surface = font.render(text, True, colour)
+    text_surface = TEXT_CACHE.render(text, font, colour)
     text_rect = text_surface.get_rect()
     setattr(text_rect, anchor, position)
     surface.blit(text_surface, text_rect)
@@ -193,6 +414,110 @@ def get_sigmoid(x: float) -> float:
     """
     return 1 / (1 + math.exp(-x))
 
+# Ken Perlin's reference permutation, the same table the noise library uses
+PERLIN_PERMUTATION = np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225,
+    140, 36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148,
+    247, 120, 234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32,
+    57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175,
+    74, 165, 71, 134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122,
+    60, 211, 133, 230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54,
+    65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169,
+    200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64,
+    52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212,
+    207, 206, 59, 227, 47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213,
+    119, 248, 152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9,
+    129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185, 112, 104,
+    218, 246, 97, 228, 251, 34, 242, 193, 238, 210, 144, 12, 191, 179, 162, 241,
+    81, 51, 145, 235, 249, 14, 239, 107, 49, 192, 214, 31, 181, 199, 106, 157,
+    184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150, 254, 138, 236, 205, 93,
+    222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156, 180,
+], dtype=np.int64)
+PERLIN_GRADIENTS = np.array([
+    (1, 1), (-1, 1), (1, -1), (-1, -1), (1, 0), (-1, 0), (1, 0), (-1, 0),
+    (0, 1), (0, -1), (0, 1), (0, -1), (1, 0), (-1, 0), (0, -1), (0, 1),
+], dtype=np.float32)
+
+def perlin_noise_2d(x: np.ndarray, y: np.ndarray, octaves: int = 1, persistence: float = 0.5,
+                    lacunarity: float = 2.0, repeat: float = 1024) -> np.ndarray:
+    """Vectorised 2D Perlin noise for whole arrays of points.
+
+    A NumPy port of noise.pnoise2 (same permutation, gradients, fade curve
+    and single precision arithmetic), so it gives the same values as calling
+    pnoise2 once per point, only without the Python loop.
+
+    Args:
+        x: X coordinates
+        y: Y coordinates (same shape as x)
+        octaves: Number of noise layers summed together
+        persistence: Amplitude multiplier between octaves
+        lacunarity: Frequency multiplier between octaves
+        repeat: Period of the noise before it tiles
+
+    Returns:
+        np.ndarray: Noise values, roughly in the range -1 to 1
+    """
+    perm = np.concatenate((PERLIN_PERMUTATION, PERLIN_PERMUTATION))
+    x = np.asarray(x, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+
+    def gradient(hash_value, dx, dy):
+        g = PERLIN_GRADIENTS[hash_value & 15]
+        return dx * g[..., 0] + dy * g[..., 1]
+
+    def lerp(t, a, b):
+        return a + t * (b - a)
+
+    def octave(x, y, period):
+        i = np.floor(np.fmod(x, period)).astype(np.int64)
+        j = np.floor(np.fmod(y, period)).astype(np.int64)
+        ii = np.fmod(i + 1, period).astype(np.int64) & 255
+        jj = np.fmod(j + 1, period).astype(np.int64) & 255
+        i &= 255
+        j &= 255
+
+        x = x - np.floor(x)
+        y = y - np.floor(y)
+        fx = x * x * x * (x * (x * 6 - 15) + 10)
+        fy = y * y * y * (y * (y * 6 - 15) + 10)
+
+        a, b = perm[i], perm[ii]
+        return lerp(fy, lerp(fx, gradient(perm[perm[a + j]], x, y), gradient(perm[perm[b + j]], x - 1, y)),
+                    lerp(fx, gradient(perm[perm[a + jj]], x, y - 1), gradient(perm[perm[b + jj]], x - 1, y - 1)))
+
+    total = np.zeros(x.shape, dtype=np.float32)
+    freq = np.float32(1)
+    amp = np.float32(1)
+    max_amp = np.float32(0)
+    for _ in range(octaves):
+        total += octave(x * freq, y * freq, np.float32(repeat) * freq) * amp
+        max_amp += amp
+        freq *= np.float32(lacunarity)
+        amp *= np.float32(persistence)
+    return total / max_amp
+
+def generate_terrain(xs: np.ndarray, ys: np.ndarray, x_offset: int, y_offset: int, size: int) -> np.ndarray:
+    """Perlin noise terrain for a rectangle of the world.
+
+    The terrain is a pure function of position, so any part of the world can
+    be generated on its own and matches the same cells generated all at once.
+
+    Args:
+        xs: Grid columns to generate
+        ys: Grid rows to generate
+        x_offset: Noise offset along x
+        y_offset: Noise offset along y
+        size: Size of the world grid, the noise is scaled to it
+
+    Returns:
+        np.ndarray: (len(xs), len(ys)) terrain values (0-1), indexed [x, y]
+    """
+    noise_x, noise_y = np.meshgrid((xs + x_offset) * BG_NOISE_SCALE / size,
+                                   (ys + y_offset) * BG_NOISE_SCALE / size,
+                                   indexing="ij")
+    noise_values = perlin_noise_2d(noise_x, noise_y, BG_NOISE_OCTAVES).astype(float)
+    return (noise_values + 1) / 2  # Normalize to 0-1 range
+
 def load_parameters_from_file(filepath: str) -> dict:
     """Load simulation parameters from a CSV file.
 
@@ -227,6 +552,467 @@ def load_parameters_from_file(filepath: str) -> dict:
         sys.exit(1)
     return parameters
 
+def map_file_stamp(filepath: str) -> np.ndarray:
+    """Modification time and size of a map file, used to tell if its cache is stale.
+
+    Args:
+        filepath: Path to the map file
+
+    Returns:
+        np.ndarray: [mtime in nanoseconds, size in bytes]
+    """
+    stat = os.stat(filepath)
+    return np.array([stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+
+def read_map_cache(filepath: str, source_stamp: np.ndarray) -> np.ndarray | None:
+    """Read the cached terrain array for a CSV map.
+
+    Args:
+        filepath: Path to the map CSV file
+        source_stamp: Current stamp of the CSV from map_file_stamp
+
+    Returns:
+        np.ndarray | None: Cached terrain values, or None if there is no
+        usable cache for this version of the file
+    """
+    try:
+        with np.load(filepath + MAP_CACHE_SUFFIX) as cache:
+            if not np.array_equal(cache["source_stamp"], source_stamp):
+                return None
+            return cache["maparr"]
+    except (OSError, KeyError, ValueError):
+        return None
+
+def write_map_cache(filepath: str, source_stamp: np.ndarray, maparr: np.ndarray) -> None:
+    """Write the parsed terrain array for a CSV map to its sidecar cache.
+
+    The cache is written to a temporary file first and renamed into place so a
+    run that is killed part way through never leaves a truncated cache. Failing
+    to write the cache (e.g. a read-only directory) is not an error.
+
+    Args:
+        filepath: Path to the map CSV file
+        source_stamp: Stamp of the CSV from map_file_stamp
+        maparr: Parsed terrain values
+    """
+    cache_path = filepath + MAP_CACHE_SUFFIX
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            np.savez(file, maparr=maparr, source_stamp=source_stamp)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def read_map_header(filepath: str) -> np.void | None:
+    """Read the header of a binary map file.
+
+    Args:
+        filepath: Path to the map file
+
+    Returns:
+        np.void | None: Header record (fields as in MAP_HEADER_DTYPE), or None
+        if the file is missing or is not a binary map
+    """
+    try:
+        header = np.fromfile(filepath, dtype=MAP_HEADER_DTYPE, count=1)
+    except (OSError, ValueError):
+        return None
+    if len(header) != 1 or header[0]["magic"] != MAP_FILE_MAGIC:
+        return None
+    return header[0]
+
+def open_binary_map(filepath: str) -> tuple[np.void, np.memmap]:
+    """Memory-map the terrain values of a binary map file.
+
+    Nothing is read up front, pages of the file are loaded as they are touched.
+
+    Args:
+        filepath: Path to the binary map file
+
+    Returns:
+        tuple[np.void, np.memmap]: Header record and read-only (height, width) terrain array
+
+    Raises:
+        ValueError: If the file is not a binary map or is shorter than its header says
+    """
+    header = read_map_header(filepath)
+    if header is None:
+        raise ValueError(f"{filepath} is not a binary map file")
+    shape = (int(header["height"]), int(header["width"]))
+    dtype = np.dtype(header["dtype"].decode("ascii"))
+    expected_size = MAP_HEADER_DTYPE.itemsize + shape[0] * shape[1] * dtype.itemsize
+    if os.path.getsize(filepath) < expected_size:
+        raise ValueError(f"{filepath} is truncated, expected {expected_size} bytes")
+    maparr = np.memmap(filepath, dtype=dtype, mode="r", offset=MAP_HEADER_DTYPE.itemsize, shape=shape)
+    return header, maparr
+
+def map_values_in_range(maparr: np.ndarray, block_rows: int = MAP_VALIDATE_BLOCK_ROWS) -> bool:
+    """Check every terrain value is between 0 and 1 (inclusive), NaN is not.
+
+    The map is checked a block of rows at a time, so a memory-mapped map never
+    has more than one block's comparison arrays in memory at once.
+
+    Args:
+        maparr: (height, width) terrain values
+        block_rows: Rows checked at a time
+
+    Returns:
+        bool: True if every value is in range
+    """
+    for start in range(0, maparr.shape[0], block_rows):
+        block = maparr[start:start + block_rows]
+        if not np.all((block >= 0) & (block <= 1)):
+            return False
+    return True
+
+def write_binary_map(filepath: str, maparr: np.ndarray, water_threshold: float,
+                     sand_threshold: float, dtype=MAP_FILE_DTYPE) -> None:
+    """Write terrain values to a binary map file.
+
+    Args:
+        filepath: Path of the binary map file to create
+        maparr: (height, width) terrain values (0-1)
+        water_threshold: Terrain values at or above this are water
+        sand_threshold: Terrain values above this and below water_threshold are sand
+        dtype: Type the terrain values are stored as
+    """
+    dtype = np.dtype(dtype).newbyteorder("<")
+    header = np.zeros(1, dtype=MAP_HEADER_DTYPE)
+    header["magic"] = MAP_FILE_MAGIC
+    header["height"], header["width"] = maparr.shape
+    header["dtype"] = dtype.str.encode("ascii")
+    header["water_threshold"] = water_threshold
+    header["sand_threshold"] = sand_threshold
+    with open(filepath, "wb") as file:
+        header.tofile(file)
+        np.ascontiguousarray(maparr, dtype=dtype).tofile(file)
+
+def convert_csv_map(csv_path: str, output_path: str, water_threshold: float, sand_threshold: float) -> None:
+    """Convert a CSV map to the binary map format.
+
+    Args:
+        csv_path: Path to the map CSV file
+        output_path: Path of the binary map file to create
+        water_threshold: Water threshold recorded in the header
+        sand_threshold: Sand threshold recorded in the header
+
+    Raises:
+        ValueError: If the CSV cannot be parsed or has values outside [0, 1]
+    """
+    maparr = np.loadtxt(csv_path, delimiter=",", dtype=float, ndmin=2)
+    if not np.all((maparr >= 0) & (maparr <= 1)):
+        raise ValueError(f"{csv_path} contains values outside the expected range [0, 1]")
+    write_binary_map(output_path, maparr, water_threshold, sand_threshold)
+
+class WaterField:
+    """Water mask and smoothed water repulsion field, built once per map.
+
+    The mask marks every cell at or above the water threshold. It is box
+    blurred over WATER_FIELD_SMOOTHING cells either side, and the negative
+    gradient of the blur gives a vector field pointing away from water. The
+    field is scaled so a bee within the smoothing band of a straight shore
+    is pushed with unit strength, and clipped to unit length.
+
+    Attributes:
+        maparr (np.ndarray): Terrain the field was built from
+        threshold (float): Water threshold the field was built with
+        mask (np.ndarray): (S, S) True for water cells
+        repulsion (np.ndarray): (S, S, 2) force pointing away from nearby water
+    """
+
+    def __init__(self, maparr: np.ndarray, threshold: float, smoothing: int = WATER_FIELD_SMOOTHING):
+        """Build the mask and field.
+
+        Args:
+            maparr: Terrain height values
+            threshold: Values at or above this are water
+            smoothing: Blur radius in cells
+        """
+        self.maparr = maparr
+        self.threshold = threshold
+        self.mask = maparr >= threshold
+
+        # box blur from a summed area table, edges are padded with the nearest cell
+        width = 2 * smoothing + 1
+        padded = np.pad(self.mask.astype(float), smoothing, mode="edge")
+        table = np.pad(padded.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+        blurred = (table[width:, width:] - table[:-width, width:]
+                   - table[width:, :-width] + table[:-width, :-width]) / width**2
+
+        grad_x, grad_y = np.gradient(blurred)
+        repulsion = -np.stack((grad_x, grad_y), axis=-1) * width
+        length = np.hypot(repulsion[..., 0], repulsion[..., 1])
+        repulsion[length > 1] /= length[length > 1, None]
+        self.repulsion = repulsion
+
+    def sample(self, points: np.ndarray) -> np.ndarray:
+        """Water repulsion at many points in one gather.
+
+        Args:
+            points: (N, 2) world grid positions
+
+        Returns:
+            np.ndarray: (N, 2) repulsion forces
+        """
+        size = self.mask.shape[0]
+        cells = np.clip(points.astype(np.int64), 0, size - 1)
+        return self.repulsion[cells[:, 0], cells[:, 1]]
+
+class TerrainChunk:
+    """Terrain, colours and water repulsion of one chunk of a TerrainChunks world.
+
+    Attributes:
+        terrain (np.ndarray): (W, H) terrain values
+        colours (np.ndarray): (W, H, 3) uint8 terrain colours
+        repulsion (np.ndarray): (W, H, 2) water repulsion, None until first needed
+    """
+
+    def __init__(self, terrain: np.ndarray, colours: np.ndarray):
+        self.terrain = terrain
+        self.colours = colours
+        self.repulsion = None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the chunk's arrays."""
+        held = self.terrain.nbytes + self.colours.nbytes
+        if self.repulsion is not None:
+            held += self.repulsion.nbytes
+        return held
+
+class TerrainChunks:
+    """Lazily generated terrain split into fixed-size chunks.
+
+    A chunk's terrain and colours are generated from Perlin noise the first
+    time one of its cells is looked up, and kept in an LRU cache. Once the
+    cache holds more than its memory budget the least recently used chunks
+    are dropped. The noise is a pure function of position, so a dropped chunk
+    is regenerated identically if it is touched again.
+
+    For zoomed out views there are also overview chunks, which sample only
+    every step-th cell over a step times larger area. They share the cache
+    with the full resolution (step 1) chunks.
+
+    Supports the parts of the ndarray interface the simulation uses on maparr
+    (maparr[x, y] and shape), and the sample method of WaterField.
+
+    Attributes:
+        size (int): Size of the world grid
+        x_offset (int): Noise offset along x
+        y_offset (int): Noise offset along y
+        colour_fn (callable): Converts terrain values to (.., 3) uint8 colours
+        chunk_size (int): Cells along each side of a chunk
+        budget (int): Most bytes of chunk data to keep cached
+        water_threshold (float): Threshold the cached water repulsion was built with
+        chunks (OrderedDict): (cx, cy, step) -> TerrainChunk, least recently used first
+        cached_bytes (int): Bytes held by the cached chunks
+    """
+
+    def __init__(self, size: int, x_offset: int, y_offset: int, colour_fn,
+                 chunk_size: int = WORLD_CHUNK_SIZE, budget: int = WORLD_CHUNK_CACHE_BYTES):
+        """Initialize an empty world, nothing is generated yet.
+
+        Args:
+            size: Size of the world grid
+            x_offset: Noise offset along x
+            y_offset: Noise offset along y
+            colour_fn: Converts terrain values to (.., 3) uint8 colours
+            chunk_size: Cells along each side of a chunk
+            budget: Most bytes of chunk data to keep cached
+        """
+        self.size = size
+        self.x_offset = x_offset
+        self.y_offset = y_offset
+        self.colour_fn = colour_fn
+        self.chunk_size = chunk_size
+        self.budget = budget
+        self.water_threshold = None
+        self.chunks = OrderedDict()
+        self.cached_bytes = 0
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self.size, self.size)
+
+    def terrain(self, x0: int, y0: int, x1: int, y1: int, step: int = 1) -> np.ndarray:
+        """Generate the terrain of a rectangle without caching it.
+
+        Args:
+            x0, y0: First column and row
+            x1, y1: One past the last column and row
+            step: Stride between the cells generated
+
+        Returns:
+            np.ndarray: (W, H) terrain values of every step-th cell
+        """
+        return generate_terrain(np.arange(x0, x1, step), np.arange(y0, y1, step),
+                                self.x_offset, self.y_offset, self.size)
+
+    def chunk(self, cx: int, cy: int, step: int = 1) -> TerrainChunk:
+        """Chunk at chunk coordinates (cx, cy), generating it if it is not cached.
+
+        Args:
+            cx, cy: Chunk column and row, in units of chunk_size * step cells
+            step: Stride between the cells sampled, 1 for a full resolution chunk
+
+        Returns:
+            TerrainChunk: The chunk, now the most recently used
+        """
+        key = (cx, cy, step)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        span = self.chunk_size * step
+        x0, y0 = cx * span, cy * span
+        terrain = self.terrain(x0, y0, min(x0 + span, self.size), min(y0 + span, self.size), step)
+        chunk = TerrainChunk(terrain, self.colour_fn(terrain))
+        self.chunks[key] = chunk
+        self.cached_bytes += chunk.nbytes
+        self.evict()
+        return chunk
+
+    def evict(self) -> None:
+        """Drop least recently used chunks until the cache is within budget.
+
+        The most recently used chunk is always kept.
+        """
+        while self.cached_bytes > self.budget and len(self.chunks) > 1:
+            _, chunk = self.chunks.popitem(last=False)
+            self.cached_bytes -= chunk.nbytes
+
+    def __getitem__(self, cell: tuple[int, int]) -> float:
+        """Terrain value of one cell, maparr[x, y]."""
+        x, y = cell
+        chunk = self.chunk(x // self.chunk_size, y // self.chunk_size)
+        return chunk.terrain[x % self.chunk_size, y % self.chunk_size]
+
+    def colours(self, x0: int, y0: int, x1: int, y1: int, step: int = 1) -> np.ndarray:
+        """Terrain colours of a rectangle, copied out of the chunks under it.
+
+        Args:
+            x0, y0: First column and row
+            x1, y1: One past the last column and row
+            step: Stride between the cells returned. Only the cells whose column
+                and row are multiples of step are included, so the same overview
+                chunks are reused as the view pans
+
+        Returns:
+            np.ndarray: (W, H, 3) uint8 colours, indexed [x, y]
+        """
+        size = self.chunk_size
+        # sample indices, cell = sample * step
+        s_x0, s_y0 = -(-x0 // step), -(-y0 // step)
+        s_x1, s_y1 = -(-x1 // step), -(-y1 // step)
+        colours = np.empty((max(0, s_x1 - s_x0), max(0, s_y1 - s_y0), 3), dtype=np.uint8)
+        for cx in range(s_x0 // size, (s_x1 - 1) // size + 1):
+            for cy in range(s_y0 // size, (s_y1 - 1) // size + 1):
+                chunk = self.chunk(cx, cy, step)
+                lo_x, hi_x = max(s_x0, cx * size), min(s_x1, (cx + 1) * size)
+                lo_y, hi_y = max(s_y0, cy * size), min(s_y1, (cy + 1) * size)
+                colours[lo_x - s_x0:hi_x - s_x0, lo_y - s_y0:hi_y - s_y0] = \
+                    chunk.colours[lo_x - cx * size:hi_x - cx * size, lo_y - cy * size:hi_y - cy * size]
+        return colours
+
+    def water_field(self, threshold: float) -> "TerrainChunks":
+        """Use the given water threshold for sample, dropping repulsion built with another.
+
+        Args:
+            threshold: Terrain values at or above this are water
+
+        Returns:
+            TerrainChunks: self, which samples like a WaterField
+        """
+        if threshold != self.water_threshold:
+            for chunk in self.chunks.values():
+                if chunk.repulsion is not None:
+                    self.cached_bytes -= chunk.repulsion.nbytes
+                    chunk.repulsion = None
+            self.water_threshold = threshold
+        return self
+
+    def chunk_repulsion(self, cx: int, cy: int) -> np.ndarray:
+        """Water repulsion over one chunk, building it if needed.
+
+        The field is built by a WaterField over the chunk plus a margin wide
+        enough for the blur and gradient, so it matches a field built over the
+        whole map.
+
+        Args:
+            cx, cy: Chunk column and row
+
+        Returns:
+            np.ndarray: (W, H, 2) repulsion forces
+        """
+        chunk = self.chunk(cx, cy)
+        if chunk.repulsion is None:
+            margin = WATER_FIELD_SMOOTHING + 1
+            x0, y0 = cx * self.chunk_size, cy * self.chunk_size
+            lo_x, lo_y = max(0, x0 - margin), max(0, y0 - margin)
+            hi_x = min(self.size, x0 + self.chunk_size + margin)
+            hi_y = min(self.size, y0 + self.chunk_size + margin)
+            field = WaterField(self.terrain(lo_x, lo_y, hi_x, hi_y), self.water_threshold)
+            width, height = chunk.terrain.shape
+            chunk.repulsion = field.repulsion[x0 - lo_x:x0 - lo_x + width, y0 - lo_y:y0 - lo_y + height].copy()
+            self.cached_bytes += chunk.repulsion.nbytes
+            self.evict()
+        return chunk.repulsion
+
+    def sample(self, points: np.ndarray) -> np.ndarray:
+        """Water repulsion at many points, as WaterField.sample.
+
+        Args:
+            points: (N, 2) world grid positions
+
+        Returns:
+            np.ndarray: (N, 2) repulsion forces
+        """
+        cells = np.clip(points.astype(np.int64), 0, self.size - 1)
+        chunk_cells = cells // self.chunk_size
+        per_side = (self.size - 1) // self.chunk_size + 1
+        keys, inverse = np.unique(chunk_cells[:, 0] * per_side + chunk_cells[:, 1], return_inverse=True)
+
+        forces = np.zeros((len(cells), 2))
+        for k, key in enumerate(keys.tolist()):
+            cx, cy = divmod(key, per_side)
+            in_chunk = inverse == k
+            local = cells[in_chunk] - (cx * self.chunk_size, cy * self.chunk_size)
+            forces[in_chunk] = self.chunk_repulsion(cx, cy)[local[:, 0], local[:, 1]]
+        return forces
+
+class MappedTerrainChunks(TerrainChunks):
+    """TerrainChunks over a memory-mapped binary map instead of Perlin noise.
+
+    Chunks copy their terrain out of the map file, so colours and water
+    repulsion are only ever built for the chunks that are drawn or visited,
+    and only the pages of the file under them are read.
+
+    Attributes:
+        source (np.memmap): (size, size) terrain values of the map file
+    """
+
+    def __init__(self, source: np.ndarray, colour_fn,
+                 chunk_size: int = WORLD_CHUNK_SIZE, budget: int = WORLD_CHUNK_CACHE_BYTES):
+        """Initialize an empty cache over a square map.
+
+        Args:
+            source: (size, size) terrain values, usually from open_binary_map
+            colour_fn: Converts terrain values to (.., 3) uint8 colours
+            chunk_size: Cells along each side of a chunk
+            budget: Most bytes of chunk data to keep cached
+        """
+        super().__init__(source.shape[0], 0, 0, colour_fn, chunk_size, budget)
+        self.source = source
+
+    def terrain(self, x0: int, y0: int, x1: int, y1: int, step: int = 1) -> np.ndarray:
+        """Copy the terrain of a rectangle out of the map file, see TerrainChunks.terrain."""
+        return np.array(self.source[x0:x1:step, y0:y1:step])
+
 class Environment:
     """Manages the simulation environment including terrain generation and rendering.
     
@@ -235,65 +1021,110 @@ class Environment:
     background rendering with proper caching for performance.
     
     Attributes:
-        map_world_surface (pygame.Surface): Surface for the world map
+        map_world_surface (pygame.Surface): World map drawn at one pixel per tile
+        world_surface_dirty (bool): Whether map_col changed since map_world_surface was drawn
         maparr (np.ndarray): 2D array storing terrain height values
-        map_col (np.ndarray): 2D array storing terrain colors
+        map_col (np.ndarray): (H, W, 3) uint8 array storing terrain colors
         cached_bg (pygame.Surface): Cached background surface for performance
         cached_camera_offset (pygame.Vector2): Last camera position for cache
         cached_scaled (float): Last scale factor for cache
+        cached_water_field (WaterField): Water field for the current map and threshold
+        cached_border_overlay (pygame.Surface): Tile border grid for cached_border_scaled
+        cached_border_scaled (float): Scale factor the border overlay was built for
+        chunks (TerrainChunks): Lazily generated terrain when the world is chunked, or the
+            chunk cache over a binary map file, otherwise None
+        fingerprint (str): Identifies the terrain, worked out once when it is generated or loaded
     """
     
-    def __init__(self, size: int, manager):
+    def __init__(self, size: int, manager, chunked: bool = False):
         """Initialize the environment.
         
         Args:
             size: Size of the world grid
             manager: Simulation manager instance
+            chunked: Generate the terrain lazily in chunks instead of all at once
         """
-        self.map_world_surface = pygame.Surface((size, size))
-        self.generate_background_texture(size)
+        if chunked:
+            self.generate_chunked_world(size)
+        else:
+            self.map_world_surface = pygame.Surface((size, size))
+            self.world_surface_dirty = True
+            self.generate_background_texture(size)
         
         # Initialize caching variables
         self.cached_bg = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
         self.cached_camera_offset = pygame.Vector2(-1, -1)
         self.cached_scaled = -1
+        self.cached_water_field = None
+        self.cached_border_overlay = None
+        self.cached_border_scaled = -1
+
+    def water_field(self, threshold: float) -> WaterField:
+        """Water mask and repulsion field for the current map.
+
+        The field is only rebuilt when the map or the water threshold changes.
+
+        Args:
+            threshold: Terrain values at or above this are water
+
+        Returns:
+            WaterField: Field built from maparr, or the TerrainChunks itself when
+            the world is chunked
+        """
+        if self.chunks is not None:
+            return self.chunks.water_field(threshold)
+
+        field = self.cached_water_field
+        if field is None or field.maparr is not self.maparr or field.threshold != threshold:
+            field = WaterField(self.maparr, threshold)
+            self.cached_water_field = field
+        return field
 
     def load_map_from_file(self, filepath: str, map_size_param: int) -> None:
-        """Load map terrain data from a CSV file.
+        """Load map terrain data from a CSV or binary map file.
+
+        Binary maps (see MAP_HEADER_DTYPE) are memory-mapped by load_binary_map.
+        A CSV is parsed in one pass by numpy and checked with whole-array
+        comparisons. The parsed map is written to a binary sidecar cache
+        (filepath + MAP_CACHE_SUFFIX) stamped with the CSV's modification time
+        and size, so later runs on an unchanged map skip the parse.
 
         Args:
             filepath: Path to the map CSV file.
             map_size_param: The expected size of the map (MAP_SIZE).
         """
+        if read_map_header(filepath) is not None:
+            self.load_binary_map(filepath, map_size_param)
+            return
+
         try:
-            loaded_map_data = []
-            with open(filepath, mode='r', newline='') as file:
-                reader = csv.reader(file)
-                for row_index, row in enumerate(reader):
-                    if len(row) != map_size_param:
-                        print(f"Error: Map file {filepath} row {row_index+1} has incorrect number of columns. Expected {map_size_param}, got {len(row)}.")
-                        sys.exit(1)
-                    try:
-                        loaded_map_data.append([float(val) for val in row])
-                    except ValueError as e:
-                        print(f"Error: Non-numeric value found in map file {filepath} at row {row_index+1}: {e}")
-                        sys.exit(1)
-            
-            if len(loaded_map_data) != map_size_param:
-                print(f"Error: Map file {filepath} has incorrect number of rows. Expected {map_size_param}, got {len(loaded_map_data)}.")
+            source_stamp = map_file_stamp(filepath)
+            maparr = read_map_cache(filepath, source_stamp)
+            if maparr is None:
+                try:
+                    maparr = np.loadtxt(filepath, delimiter=",", dtype=float, ndmin=2)
+                except ValueError as e:
+                    print(f"Error: Map file {filepath} has inconsistent columns or non-numeric values: {e}")
+                    sys.exit(1)
+                write_map_cache(filepath, source_stamp, maparr)
+
+            if maparr.shape[1] != map_size_param:
+                print(f"Error: Map file {filepath} has incorrect number of columns. Expected {map_size_param}, got {maparr.shape[1]}.")
+                sys.exit(1)
+            if maparr.shape[0] != map_size_param:
+                print(f"Error: Map file {filepath} has incorrect number of rows. Expected {map_size_param}, got {maparr.shape[0]}.")
                 sys.exit(1)
 
-            self.maparr = np.array(loaded_map_data, dtype=float)
-            
-            # Validate that all values are between 0 and 1 (inclusive)
-            if not np.all((self.maparr >= 0) & (self.maparr <= 1)):
+            # Validate that all values are between 0 and 1 (inclusive), NaN fails both checks
+            if not np.all((maparr >= 0) & (maparr <= 1)):
                 print(f"Error: Map file {filepath} contains values outside the expected range [0, 1].")
                 sys.exit(1)
 
-            self.map_col = np.empty((map_size_param, map_size_param), dtype=object)
-            for i in range(map_size_param):
-                for j in range(map_size_param):
-                    self.map_col[i][j] = self.get_tile_colour(self.maparr[i][j])
+            self.maparr = maparr
+            self.map_col = self.get_tile_colours(self.maparr)
+            self.chunks = None
+            self.world_surface_dirty = True
+            self.fingerprint = self._hash_terrain(maparr)
             
             print(f"Successfully loaded map from {filepath}")
 
@@ -304,6 +1135,43 @@ class Environment:
             print(f"Error reading map file {filepath}: {e}")
             sys.exit(1)
 
+    def load_binary_map(self, filepath: str, map_size_param: int) -> None:
+        """Load map terrain data from a binary map file.
+
+        maparr is the memory-mapped file itself, so terrain lookups read the
+        file's pages on demand instead of holding a copy of the map in memory.
+        Nothing is built for the whole map: colours and water repulsion come
+        from a MappedTerrainChunks, one chunk at a time as they are needed,
+        and the value range is checked a block of rows at a time.
+
+        Args:
+            filepath: Path to the binary map file.
+            map_size_param: The expected size of the map (MAP_SIZE).
+        """
+        try:
+            header, maparr = open_binary_map(filepath)
+        except (OSError, ValueError) as e:
+            print(f"Error reading map file {filepath}: {e}")
+            sys.exit(1)
+
+        if maparr.shape != (map_size_param, map_size_param):
+            print(f"Error: Map file {filepath} is {maparr.shape[0]}x{maparr.shape[1]}. Expected {map_size_param}x{map_size_param}.")
+            sys.exit(1)
+
+        if not map_values_in_range(maparr):
+            print(f"Error: Map file {filepath} contains values outside the expected range [0, 1].")
+            sys.exit(1)
+
+        self.maparr = maparr
+        self.chunks = MappedTerrainChunks(maparr, self.get_tile_colours)
+        self.map_col = None
+        self.map_world_surface = None
+        self.world_surface_dirty = False
+        # hashing the values would read the whole file, the header and file stamp identify it instead
+        self.fingerprint = "map:" + hashlib.sha1(header.tobytes() + map_file_stamp(filepath).tobytes()).hexdigest()
+
+        print(f"Successfully loaded map from {filepath}")
+
     def generate_background_texture(self, size: int) -> None:
         """Generate the background terrain using Perlin noise.
         
@@ -316,58 +1184,69 @@ class Environment:
         # Use consistent offsets based on seed
         x_offset = random.randint(0, 10000)
         y_offset = random.randint(0, 10000)
-        
-        self.maparr = np.zeros((size, size), dtype=float)
-        self.map_col = np.empty((size, size), dtype=object)
-
-        for i in range(size):
-            for j in range(size):
-                # Generate Perlin noise value
-                noise_value = pnoise2(
-                    (i + x_offset) * BG_NOISE_SCALE / size,
-                    (j + y_offset) * BG_NOISE_SCALE / size,
-                    BG_NOISE_OCTAVES
-                )
-                noise_value = (noise_value + 1) / 2  # Normalize to 0-1 range
-                self.maparr[i][j] = noise_value
-                self.map_col[i][j] = self.get_tile_colour(noise_value)
-
-    def get_tile_colour(self, pno: float) -> tuple:
-        """Convert Perlin noise value to terrain color.
+
+        # Generate Perlin noise for every cell at once, maparr[i, j] is column i, row j
+        self.maparr = generate_terrain(np.arange(size), np.arange(size), x_offset, y_offset, size)
+        self.map_col = self.get_tile_colours(self.maparr)
+        self.chunks = None
+        self.world_surface_dirty = True
+        self.fingerprint = self._hash_terrain(self.maparr)
+
+    def generate_chunked_world(self, size: int) -> None:
+        """Set up a lazily generated world of the given size.
+
+        Nothing is generated up front. maparr becomes a TerrainChunks that
+        generates each chunk the first time it is touched, and map_col is
+        unused. With the same seed the terrain matches generate_background_texture.
+
+        Args:
+            size: Size of the world grid
+        """
+        # Use consistent offsets based on seed
+        x_offset = random.randint(0, 10000)
+        y_offset = random.randint(0, 10000)
+
+        self.chunks = TerrainChunks(size, x_offset, y_offset, self.get_tile_colours)
+        self.maparr = self.chunks
+        self.map_col = None
+        self.map_world_surface = None
+        self.world_surface_dirty = False
+        self.fingerprint = f"chunks:{size}:{x_offset}:{y_offset}"
+
+    def get_tile_colours(self, maparr: np.ndarray) -> np.ndarray:
+        """Convert terrain values to terrain colours for the whole map.
         
         Args:
-            pno: Perlin noise value (0-1)
+            maparr: Terrain values (0-1)
             
         Returns:
-            tuple: RGB color values for the terrain
+            np.ndarray: (H, W, 3) uint8 RGB colours
         """
         # Ensure pno is within expected 0-1 range, helps prevent math errors with exponents
-        pno = max(0.0, min(1.0, pno))
+        pno = np.clip(maparr, 0.0, 1.0)
 
         c_float = 255 * (pno**BG_COLOUR_DULLNESS_EXP)
         fav_float = 255 * (pno**BG_COLOUR_VIBRANCY_EXP)
 
-        # Base values, rounded and clamped
-        c = max(0, min(255, int(round(c_float))))
-        fav = max(0, min(255, int(round(fav_float))))
-
-        if pno >= BG_WATER_THRESHOLD:
-            # Water tiles - blue tones
-            r = max(0, min(255, int(round(220 - c_float))))
-            g = max(0, min(255, int(round(200 - (c_float / 2.0)))))
-            b = fav # fav is already calculated from fav_float, rounded and clamped
-            return (r, g, b)
-        elif BG_SAND_THRESHOLD < pno < BG_WATER_THRESHOLD:
-            # Sand tiles - yellow tones
-            # fav is already calculated, rounded and clamped
-            # c is already calculated, rounded and clamped
-            return (fav, fav, c)
-        else:
-            # Land tiles - green tones
-            r = c # c is already calculated, rounded and clamped
-            g = max(0, min(255, int(round(fav_float + 15))))
-            b = max(0, min(255, int(round(c_float - 10))))
-            return (r, g, b)
+        def channel(value):
+            # rounded and clamped to a valid colour channel
+            return np.clip(np.round(value), 0, 255)
+
+        c = channel(c_float)
+        fav = channel(fav_float)
+
+        water = pno >= BG_WATER_THRESHOLD
+        sand = (BG_SAND_THRESHOLD < pno) & (pno < BG_WATER_THRESHOLD)
+        land = ~water & ~sand
+
+        colours = np.empty(pno.shape + (3,), dtype=np.uint8)
+        # Water tiles - blue tones
+        colours[water] = np.stack((channel(220 - c_float), channel(200 - c_float / 2.0), fav), axis=-1)[water]
+        # Sand tiles - yellow tones
+        colours[sand] = np.stack((fav, fav, c), axis=-1)[sand]
+        # Land tiles - green tones
+        colours[land] = np.stack((c, channel(fav_float + 15), channel(c_float - 10)), axis=-1)[land]
+        return colours
 
     def update_background(self, size: int, camera_offset: pygame.Vector2, scaled_value: float) -> pygame.Surface:
         """Update the background surface if camera or scale changed.
@@ -387,12 +1266,78 @@ class Environment:
 
         return self.cached_bg
 
+    def terrain_fingerprint(self) -> str:
+        """Short string identifying the terrain, used to check a snapshot belongs to this world.
+
+        Returns:
+            str: The noise offsets of a chunked world, the header and file stamp
+            of a binary map, otherwise a hash of maparr
+        """
+        return self.fingerprint
+
+    @staticmethod
+    def _hash_terrain(maparr: np.ndarray) -> str:
+        """Hash of the terrain values, for terrain held in memory."""
+        return hashlib.sha1(np.ascontiguousarray(maparr, dtype=float).tobytes()).hexdigest()
+
+    def render_world_surface(self) -> None:
+        """Draw map_col into map_world_surface, one pixel per tile.
+
+        map_col is indexed [x, y], which is the layout pygame.surfarray expects.
+        """
+        width, height = self.map_col.shape[:2]
+        if self.map_world_surface is None or self.map_world_surface.get_size() != (width, height):
+            self.map_world_surface = pygame.Surface((width, height))
+        pygame.surfarray.blit_array(self.map_world_surface, self.map_col)
+        self.world_surface_dirty = False
+
+    def get_border_overlay(self, scaled: float) -> pygame.Surface:
+        """Tile border grid for the given scale factor.
+
+        The overlay is a transparent surface big enough to cover the window with
+        a tile to spare on each side. Every tile gets a one pixel darkened outline
+        along its own edges, like the old per-tile border rects. Tile 0 starts at
+        the overlay's top left corner. The overlay is only rebuilt when the scale
+        changes.
+
+        Args:
+            scaled: Current scale factor
+
+        Returns:
+            pygame.Surface: Per-pixel alpha overlay of the tile borders
+        """
+        if self.cached_border_overlay is not None and self.cached_border_scaled == scaled:
+            return self.cached_border_overlay
+
+        cols = math.ceil(WINDOW_WIDTH / scaled) + 2
+        rows = math.ceil(WINDOW_HEIGHT / scaled) + 2
+        width = round(cols * scaled)
+        height = round(rows * scaled)
+
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        # Blending black at this alpha scales the tile colour by the darken factor
+        shade = (0, 0, 0, round(255 * (1 - BG_TILE_BORDER_DARKEN_FACTOR)))
+        for i in range(cols + 1):
+            edge = round(i * scaled)
+            # last column of tile i-1 and first column of tile i
+            overlay.fill(shade, (edge - 1, 0, 2, height))
+        for j in range(rows + 1):
+            edge = round(j * scaled)
+            overlay.fill(shade, (0, edge - 1, width, 2))
+
+        self.cached_border_overlay = overlay
+        self.cached_border_scaled = scaled
+        return overlay
+
     def actually_update_background(self, target_surface: pygame.Surface, size: int, 
                                  camera_offset: pygame.Vector2, scaled: float) -> None:
         """Render the visible portion of the background.
         
-        Only renders the tiles that are currently visible in the viewport
-        for better performance. Uses precise pixel calculations to prevent gaps.
+        The visible tiles are cut out of map_world_surface with a subsurface and
+        scaled up to screen size in one transform.scale call, so redrawing the
+        view costs a single scaled blit instead of a draw call per tile. Tile
+        borders are blitted from a cached overlay. A chunked world has no world
+        surface, so the visible tiles' colours are fetched from its chunks instead.
         
         Args:
             target_surface: Surface to draw on
@@ -402,50 +1347,210 @@ class Environment:
         """
         target_surface.fill(BACKGROUND_FILL_COLOUR)
 
+        if self.world_surface_dirty:
+            self.render_world_surface()
+
         # Calculate visible region
         start_col = max(0, math.floor(camera_offset.x / scaled))
         end_col = min(size, math.ceil((WINDOW_WIDTH + camera_offset.x) / scaled))
         start_row = max(0, math.floor(camera_offset.y / scaled))
         end_row = min(size, math.ceil((WINDOW_HEIGHT + camera_offset.y) / scaled))
+        if start_col >= end_col or start_row >= end_row:
+            return
 
-        for i in range(start_col, end_col):
-            for j in range(start_row, end_row):
-                col = self.map_col[i][j]
-                
-                # Calculate floating-point screen coordinates for the tile's corners
-                screen_x_start_float = i * scaled - camera_offset.x
-                screen_y_start_float = j * scaled - camera_offset.y
-                screen_x_end_float = (i + 1) * scaled - camera_offset.x
-                screen_y_end_float = (j + 1) * scaled - camera_offset.y
-
-                # Round coordinates to nearest pixel for drawing
-                draw_x = round(screen_x_start_float)
-                draw_y = round(screen_y_start_float)
-                
-                # Calculate width and height based on the difference of rounded edge coordinates
-                draw_w = round(screen_x_end_float) - draw_x
-                draw_h = round(screen_y_end_float) - draw_y
-                
-                # Draw the tile fill only if width and height are positive
-                if draw_w > 0 and draw_h > 0:
-                    pygame.draw.rect(target_surface, col, 
-                                   (draw_x, draw_y, draw_w, draw_h))
-                
-                    # Draw the border if enabled and tile is visible
-                    if scaled > BG_TILE_BORDER_THRESHOLD_SCALE:
-                        border_color = tuple(int(c * BG_TILE_BORDER_DARKEN_FACTOR) for c in col)
-                        pygame.draw.rect(target_surface, border_color,
-                                       (draw_x, draw_y, draw_w, draw_h), 1)
+        # Round the region's edges to the nearest pixel, the same way each tile used to be
+        draw_x = round(start_col * scaled - camera_offset.x)
+        draw_y = round(start_row * scaled - camera_offset.y)
+        draw_w = round(end_col * scaled - camera_offset.x) - draw_x
+        draw_h = round(end_row * scaled - camera_offset.y) - draw_y
+        if draw_w <= 0 or draw_h <= 0:
+            return
+
+        if self.chunks is not None:
+            # when zoomed out past one pixel per tile only every step-th tile is fetched,
+            # step is a power of two so the overview chunks are shared between zoom levels
+            step = max(1, math.ceil((end_col - start_col) / draw_w), math.ceil((end_row - start_row) / draw_h))
+            step = 2 ** math.ceil(math.log2(step))
+            visible = pygame.surfarray.make_surface(
+                self.chunks.colours(start_col, start_row, end_col, end_row, step))
+        else:
+            visible = self.map_world_surface.subsurface(
+                (start_col, start_row, end_col - start_col, end_row - start_row))
+        target_surface.blit(pygame.transform.scale(visible, (draw_w, draw_h)), (draw_x, draw_y))
+
+        # Draw the borders if enabled, clipped to the tiles that were drawn
+        if scaled > BG_TILE_BORDER_THRESHOLD_SCALE:
+            target_surface.set_clip((draw_x, draw_y, draw_w, draw_h))
+            target_surface.blit(self.get_border_overlay(scaled), (draw_x, draw_y))
+            target_surface.set_clip(None)
 
 # 
 # CLASSES
 #
 
+class ViewIndex():
+    """Grid index of the positions of static world entities, for finding the ones in view.
+
+    Entities are bucketed into square cells by their pos, so a rectangle
+    query only visits the cells under it. When the rectangle covers more
+    cells than are occupied, the occupied cells are scanned instead. Results
+    keep the order the entities were indexed in, which is their draw order.
+
+    Attributes:
+        cell_size (float): Width of a cell in grid units
+        entities (list): Indexed entities, in draw order
+        cells (dict): (cell_x, cell_y) -> indices into entities
+    """
+
+    def __init__(self, entities: list, cell_size: float = VIEW_INDEX_CELL_SIZE):
+        """Index entities by position.
+
+        Args:
+            entities: Entities with a pos, in draw order
+            cell_size: Width of a cell in grid units
+        """
+        self.cell_size = cell_size
+        self.entities = list(entities)
+        self.cells = {}
+        for index, entity in enumerate(self.entities):
+            key = (math.floor(entity.pos.x / cell_size), math.floor(entity.pos.y / cell_size))
+            self.cells.setdefault(key, []).append(index)
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> list:
+        """Entities whose position lies in a rectangle.
+
+        Args:
+            x0, y0: Top left corner in grid units
+            x1, y1: Bottom right corner in grid units
+
+        Returns:
+            list: The entities, in the order they were indexed
+        """
+        cell_x0, cell_y0 = math.floor(x0 / self.cell_size), math.floor(y0 / self.cell_size)
+        cell_x1, cell_y1 = math.floor(x1 / self.cell_size), math.floor(y1 / self.cell_size)
+        if (cell_x1 - cell_x0 + 1) * (cell_y1 - cell_y0 + 1) <= len(self.cells):
+            buckets = [self.cells.get((cell_x, cell_y), ()) for cell_x in range(cell_x0, cell_x1 + 1)
+                       for cell_y in range(cell_y0, cell_y1 + 1)]
+        else:
+            buckets = [bucket for (cell_x, cell_y), bucket in self.cells.items()
+                       if cell_x0 <= cell_x <= cell_x1 and cell_y0 <= cell_y <= cell_y1]
+        visible = []
+        for index in sorted(index for bucket in buckets for index in bucket):
+            entity = self.entities[index]
+            if x0 <= entity.pos.x <= x1 and y0 <= entity.pos.y <= y1:
+                visible.append(entity)
+        return visible
+
+class PhaseTimer():
+    """Wall-clock time spent in each named phase of a simulation tick or frame.
+
+    Phases are timed as laps: start() marks the beginning of a tick and each
+    lap(name) charges the time since the previous mark to that phase, so
+    timing a phase costs a single perf_counter call.
+
+    Besides the running totals, laps are also collected per frame. end_frame()
+    closes a frame and keeps it in a rolling history of the last
+    PROFILER_HISTORY_FRAMES frames, which the on-screen profiler averages and
+    export() writes out.
+
+    Attributes:
+        totals (dict): Phase name -> seconds accumulated since the last reset
+        frame (dict): Phase name -> seconds spent in the current frame so far
+        history (deque): One dict per finished frame: its tick, the number of
+            ticks it ran and the seconds spent in each phase
+        frames_recorded (int): Frames finished since the timer was created
+        last (float): perf_counter value at the previous mark
+    """
+
+    def __init__(self, history: int = PROFILER_HISTORY_FRAMES):
+        self.totals = {}
+        self.frame = {}
+        self.history = deque(maxlen=history)
+        self.frames_recorded = 0
+        self.last = time.perf_counter()
+
+    def start(self) -> None:
+        """Mark the start of a tick."""
+        self.last = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        """Charge the time since the previous mark to a phase.
+
+        Args:
+            name: Phase that has just finished
+        """
+        now = time.perf_counter()
+        elapsed = now - self.last
+        self.totals[name] = self.totals.get(name, 0.0) + elapsed
+        self.frame[name] = self.frame.get(name, 0.0) + elapsed
+        self.last = now
+
+    def reset(self) -> None:
+        """Forget the accumulated totals."""
+        self.totals = {}
+
+    def end_frame(self, tick: int, ticks_run: int) -> None:
+        """Move the current frame's laps into the rolling history.
+
+        Args:
+            tick: Simulation tick at the end of the frame
+            ticks_run: Number of ticks the frame ran
+        """
+        self.history.append({"tick": tick, "ticks": ticks_run, "phases": self.frame})
+        self.frame = {}
+        self.frames_recorded += 1
+
+    def phase_names(self) -> list[str]:
+        """Every phase in the history, in the order they were first timed."""
+        names = {}
+        for record in self.history:
+            names.update(dict.fromkeys(record["phases"]))
+        return list(names)
+
+    def averages(self) -> dict:
+        """Mean milliseconds per frame of each phase over the history.
+
+        Returns:
+            dict: Phase name -> milliseconds, phases not timed in a frame count as 0
+        """
+        if not self.history:
+            return {}
+        return {name: 1000 * sum(record["phases"].get(name, 0.0) for record in self.history) / len(self.history)
+                for name in self.phase_names()}
+
+    def export(self, filepath: str) -> None:
+        """Write the history to a file, as CSV if its name ends in .csv and JSON otherwise.
+
+        Every frame is one row or record holding its tick, the ticks it ran
+        and the milliseconds spent in each phase. The JSON file also holds the
+        averages. The file is replaced as a whole, so it always holds the last
+        PROFILER_HISTORY_FRAMES frames.
+
+        Args:
+            filepath: Path of the file to write
+        """
+        names = self.phase_names()
+        frames = [{"tick": record["tick"], "ticks": record["ticks"],
+                   **{name: round(1000 * record["phases"].get(name, 0.0), 3) for name in names}}
+                  for record in self.history]
+        temp_path = filepath + ".tmp"
+        with open(temp_path, mode='w', newline='') as file:
+            if filepath.lower().endswith(".csv"):
+                writer = csv.DictWriter(file, fieldnames=["tick", "ticks", *names])
+                writer.writeheader()
+                writer.writerows(frames)
+            else:
+                averages = {name: round(ms, 3) for name, ms in self.averages().items()}
+                json.dump({"unit": "ms", "averages": averages, "frames": frames}, file)
+        os.replace(temp_path, filepath)
+
 class Simulation():
-    def __init__(self, initial_world_size=4096):
+    def __init__(self, initial_world_size=4096, headless=False):
         #prev global variables
         self.scaled = initial_world_size/MAP_SIZE
         self.frames = 0
+        self.headless = headless # batch mode: no window, no drawing, no frame cap
+        self.steps_per_frame = 1 # simulation ticks per rendered frame in the interactive loop
 
         self.number_of_bees = H_INITIAL_WORKERS
         self.initial_bee_energy = CREATURE_INITIAL_ENERGY
@@ -453,16 +1558,26 @@ class Simulation():
         self.number_obstacles = N_OBSTACLES
         self.number_of_hives = 10 # Default number of hives
 
-        self.creatures = []
+        self.creatures = BeeSet()
+        self.bees = BeeStore() # array-backed state of every creature
+        self.bee_grid = SpatialHash(CREATURE_DETECTION_RADIUS) # flocking neighbour lookup, rebuilt every tick
+        self.rng = np.random.default_rng() # reseeded alongside random once the seed is known
+        self.phase_timer = PhaseTimer() # time spent in each phase of step, render and the main loop
+        self.show_profiler = False # toggled with the P key
+        self.hive_lod = False # hives that are not selected run the aggregate interior model, see Hive.update_aggregate
         self.hives = []
         self.flowers = []
+        self.flower_index = FlowerIndex()
         self.selected_bee = None
         self.selected_hive = None
         self.camera_offset = pygame.Vector2(0,0)
 
         self.obstacles = []
+        self.view_index = None # (hives, flowers, obstacles) ViewIndex, rebuilt when any of them change
+        self.circle_sprites = CircleSprites() # bee and flower sprites for the current scale
 
-        self.obstaclemap = np.zeros((MAP_SIZE+1, MAP_SIZE+1))
+        self.obstaclemap = set() # (x, y) cells on obstacle outlines, only used by pathfinding
+        self.obstacle_field = ObstacleField(MAP_SIZE, CREATURE_SEPARATION_THRESHOLD) # rock avoidance lookup
 
         self.background = None
 
@@ -484,31 +1599,40 @@ class Simulation():
         self.number_of_hives = number_of_hives
         
     def add(self,creature):
-        self.creatures.append(creature)
+        self.creatures.add(creature)
 
     def remove(self,creature):
         self.creatures.remove(creature)
+        self.bees.remove(creature.idx)
 
     def add_hive(self, hive):
         self.hives.append(hive)
+        self.view_index = None
 
     def rem_hive(self, hive):
         self.hives.remove(hive)
+        self.view_index = None
 
     def add_flo(self, flower):
         self.flowers.append(flower)
+        self.flower_index.rebuild(self.flowers)
+        self.view_index = None
 
     def rem_flo(self, flower):
         self.flowers.remove(flower)
+        self.flower_index.rebuild(self.flowers)
+        self.view_index = None
 
     def spawn_new_bee(self, hive, spawn_pos):
         temp_bee = Creature(hive.pos.x, hive.pos.y, hive, self, "worker")
         self.add(temp_bee)
-        hive.bees_inside.append(temp_bee)
+        hive.bees_inside.add(temp_bee)
         temp_bee.hive_pos = pygame.Vector2(spawn_pos)
 
     def add_obstacles(self, obstacle):
         self.obstacles.append(obstacle)
+        self.view_index = None
+        self.obstacle_field.add(obstacle)
         centre_x = int(obstacle.pos.x)
         centre_y = int(obstacle.pos.y)
         size=obstacle.size
@@ -517,23 +1641,44 @@ class Simulation():
             for j in range(2*obstacle.size):
                 pos_y = centre_y - obstacle.size + j
                 if (i == 0 or i == 2*obstacle.size-1) or (j == 0 or j == 2*obstacle.size-1):
-                    self.obstaclemap[pos_x, pos_y] = 1
+                    self.obstaclemap.add((pos_x, pos_y))
 
     def add_background(self, background):
         self.background = background
 
     def run(self):
+        """Advance the simulation by one tick and, unless headless, render it."""
+        self.step()
+        if not self.headless:
+            self.render()
+
+    def render(self):
+        """Draw the current state of the simulation without advancing it."""
+        timer = self.phase_timer
+        timer.start()
+        self.draw()
+        timer.lap("draw")
+        self.show_selected()
+        timer.lap("show_selected")
+        self.check_mouse_movement()
+        timer.lap("camera")
+        self.draw_population_graph() # Draw the population graph
+        timer.lap("graph")
+
+    def step(self):
+        """Advance the simulation logic by one tick without touching the screen."""
+        timer = self.phase_timer
+        timer.start()
         # increment curr frame by 1
         self.frames += 1
 
         for hive in self.hives[:]:
             hive.update(self)
-        for bee in self.creatures[:]:
-            bee.update(self)
+        timer.lap("hives")
+        self.update_bees()
         for flower in self.flowers[:]:
             flower.update(self)
-        for obstacle in self.obstacles[:]: 
-            obstacle.update(self)
+        timer.lap("flowers")
 
         # Update population history for the graph
         if self.frames % self.graph_update_interval == 0:
@@ -541,10 +1686,378 @@ class Simulation():
             self.population_history.append(current_population)
             if len(self.population_history) > self.max_history_points:
                 self.population_history = self.population_history[-self.max_history_points:] # Keep last N points
+        timer.lap("population_history")
 
-        self.show_selected()
-        self.check_mouse_movement()
-        self.draw_population_graph() # Draw the population graph
+    def update_bees(self):
+        """Update every bee for one tick.
+
+        Behaviour that still needs per-bee logic is gathered into one steering
+        array, then the physics is applied to the whole population at once.
+        """
+        store = self.bees
+        store.clamp() # clamps position to borders, does not avoid (see edge_forces)
+
+        # location at the start of the tick decides which space each bee moves in
+        outside = store.outside[:store.count].copy()
+        steering = store.edge_forces(outside) * 100
+
+        # each hive's inside and outside bees flock separately, so they get their own group
+        # the radius is passed every tick, it can change after the simulation is created (interactive mode)
+        self.bee_grid.rebuild(store.local_positions(outside), store.hive[:store.count] * 2 + outside,
+                              CREATURE_DETECTION_RADIUS)
+        timer = self.phase_timer
+        timer.lap("bee_setup")
+
+        # outside, bees calculate flocking forces every 5 frames on their own selected frame, this saves computational load
+        # inside, every bee flocks every frame
+        due = ~outside | (self.frames % 5 == store.selectedframe[:store.count])
+        # unless the hive is run by the aggregate model, then its inside bees only drift
+        aggregate = np.zeros(store.count, dtype=bool)
+        if self.hive_lod:
+            hive_aggregate = np.array([hive.is_aggregate(self) for hive in self.hives], dtype=bool)
+            aggregate = ~outside & hive_aggregate[store.hive[:store.count]]
+            due &= ~aggregate
+        rows = np.flatnonzero(due)
+        steering[rows] += store.flocking_forces(rows, outside, self.bee_grid)
+        timer.lap("flocking")
+
+        skip = aggregate.tolist()
+        is_outside = outside.tolist()
+        for bee in self.creatures[:]:
+            if skip[bee.idx]:
+                continue
+            force = bee.update(self, is_outside[bee.idx])
+            if force: # most bees steer through applyForce or not at all
+                steering[bee.idx] += (force.x, force.y)
+        timer.lap("bee_behaviour")
+
+        # steer away from rocks, and from any water the bee is heading into
+        outside_pos = store.pos[:store.count][outside]
+        steering[outside] += self.obstacle_field.repulsion(outside_pos)
+
+        velocity = store.velocity[:store.count][outside]
+        speed = np.hypot(velocity[:, 0], velocity[:, 1])[:, None]
+        direction = np.divide(velocity, speed, out=np.zeros_like(velocity), where=speed > 0)
+        look_pos = np.clip(outside_pos + direction, 0, MAP_SIZE - 1)
+        steering[outside] += self.background.water_field(BG_WATER_THRESHOLD).sample(look_pos) * 0.8
+        timer.lap("avoidance")
+
+        store.integrate(steering, outside, self.frames, self.rng)
+        timer.lap("integrate")
+
+        dead = np.flatnonzero(store.energy[:store.count] <= 0)
+        for bee in [store.owners[row] for row in dead]:
+            bee.die(self)
+        timer.lap("deaths")
+
+    def draw(self):
+        """Draw the world entities in view, in the same order the old update loop did.
+
+        Entities outside view_rect are skipped without working out where they
+        would be on screen. Hives, flowers and obstacles are looked up in a
+        ViewIndex, and the outside bees in view are picked from the BeeStore
+        positions in one vectorized test. Bees and flowers are drawn from
+        circle sprites, see draw_bees and draw_flowers.
+        """
+        x0, y0, x1, y1 = self.view_rect()
+        if self.view_index is None:
+            self.view_index = tuple(ViewIndex(entities) for entities in (self.hives, self.flowers, self.obstacles))
+        hive_view, flower_view, obstacle_view = self.view_index
+
+        for hive in hive_view.query(x0, y0, x1, y1):
+            hive.draw(self.camera_offset)
+
+        store = self.bees
+        pos = store.pos[:store.count]
+        in_view = store.outside[:store.count] & (pos[:, 0] >= x0) & (pos[:, 0] <= x1) & (pos[:, 1] >= y0) & (pos[:, 1] <= y1)
+        rows = np.flatnonzero(in_view)
+        if 2 * rows.size < len(self.creatures):
+            # few bees in view, put just those back in creatures order
+            bees = sorted((store.owners[row] for row in rows), key=self.creatures.positions.__getitem__)
+        else:
+            in_view = in_view.tolist()
+            bees = [bee for bee in self.creatures if in_view[bee.idx]]
+        self.circle_sprites.rescale(self.scaled)
+        self.draw_bees(bees)
+
+        self.draw_flowers(flower_view.query(x0, y0, x1, y1))
+        for obstacle in obstacle_view.query(x0, y0, x1, y1):
+            obstacle.draw(self.camera_offset, self.scaled)
+
+    def draw_bees(self, bees: list) -> None:
+        """Draw outside bees with batched sprite blits, the same pixels as Creature.draw.
+
+        Screen positions and radii come from the BeeStore for all the bees at
+        once. The selected bee is drawn by Creature.draw between two batches,
+        so its highlight rings are covered by the bees after it as before.
+
+        Args:
+            bees: Bees to draw, in draw order
+        """
+        if not bees:
+            return
+        store = self.bees
+        rows = np.array([bee.idx for bee in bees], dtype=np.int64)
+        centres = store.pos[rows] * self.scaled - (self.camera_offset.x, self.camera_offset.y)
+        # Creature.size_scaled for every bee, plus the 3 pixels Creature.draw adds
+        size = store.energy[rows] / 500 * self.scaled
+        size[store.role[rows] == BEE_ROLES.index("queen")] += 6
+        # truncated towards zero like pygame.draw.circle does, see CircleSprites
+        radii = (size + 3).astype(np.int64)
+        corners = (centres.astype(np.int64) - radii[:, None]).tolist()
+        radii = radii.tolist()
+
+        sprites = self.circle_sprites
+        cached = sprites.sprites
+        batch = []
+        for bee, corner, radius in zip(bees, corners, radii):
+            if bee is self.selected_bee:
+                screen.blits(batch, doreturn=False)
+                batch = []
+                bee.draw(self.camera_offset, self.scaled)
+            else:
+                sprite = cached.get((bee.colour, radius)) or sprites.sprite(bee.colour, radius)
+                batch.append((sprite, corner))
+        screen.blits(batch, doreturn=False)
+
+    def draw_flowers(self, flowers: list) -> None:
+        """Draw flowers and their visitor counts in one Surface.blits call, the same pixels as Flower.draw.
+
+        Args:
+            flowers: Flowers to draw, in draw order
+        """
+        sprites = self.circle_sprites
+        batch = []
+        for flower in flowers:
+            screen_pos = gridpos2screen(flower.pos, self.camera_offset)
+            batch.append(sprites.blit_item(flower.petal_color, screen_pos, self.scaled))
+            text_surface = TEXT_CACHE.render(f"{flower.n_bees}", STATS_FONT, TEXT_COLOUR)
+            text_rect = text_surface.get_rect()
+            text_rect.topleft = screen_pos
+            batch.append((text_surface, text_rect))
+        screen.blits(batch, doreturn=False)
+
+    def view_rect(self) -> tuple:
+        """The part of the world on screen, widened to take in anything drawn partly on it.
+
+        The selected bee's rings reach the detection radius past the bee's
+        size, and the radius can be changed in interactive mode, so the
+        margin is worked out again on every call.
+
+        Returns:
+            tuple: (x0, y0, x1, y1) in grid units
+        """
+        store = self.bees
+        largest_bee = store.energy[:store.count].max() / 500 if store.count else 0 # Creature.size_scaled in grid units
+        ring = max(CREATURE_DETECTION_RADIUS, CREATURE_SEPARATION_THRESHOLD) + largest_bee
+        margin = max(VIEW_CULL_MARGIN, ring) + VIEW_CULL_MARGIN_PX / self.scaled
+        return (self.camera_offset.x / self.scaled - margin, self.camera_offset.y / self.scaled - margin,
+                (self.camera_offset.x + WINDOW_WIDTH) / self.scaled + margin,
+                (self.camera_offset.y + WINDOW_HEIGHT) / self.scaled + margin)
+
+    def summary(self) -> dict:
+        """Collect end-of-run statistics, used by batch mode.
+
+        Returns:
+            dict: Name -> value of the colony statistics
+        """
+        workers = sum(1 for bee in self.creatures if bee.role == "worker")
+        return {
+            "ticks": self.frames,
+            "bees": len(self.creatures),
+            "workers": workers,
+            "queens": len(self.creatures) - workers,
+            "bees_inside": sum(len(hive.bees_inside) for hive in self.hives),
+            "bees_outside": sum(len(hive.bees_outside) for hive in self.hives),
+            "hives": len(self.hives),
+            "flowers": len(self.flowers),
+            "honey_in_combs": round(float(sum(hive.combs_honey[hive.combs_honey > 0].sum() for hive in self.hives)), 2),
+            "eggs": int(sum((hive.combs_honey <= EGG_CELL_VALUE).sum() for hive in self.hives)),
+            "total_honey_collected": round(float(sum(bee.total_honey for bee in self.creatures)), 2),
+        }
+
+    def save_snapshot(self, filepath: str) -> None:
+        """Save the complete dynamic state of the simulation to a compressed .npz file.
+
+        Includes every bee (its BeeStore row and its other attributes), every
+        hive (combs_honey, cooldown, beelook and the order of its bees), the
+        flowers, the obstacles and the state of both random generators. Bee
+        and hive set order is kept, because beelook and the update order depend
+        on it. The terrain and the parameters are not saved: they come from
+        the map, parameter file and seed the simulation was started with.
+
+        The file is written to a temporary file first and renamed into place,
+        so a process killed part way through never leaves a truncated snapshot.
+
+        Args:
+            filepath: Path of the snapshot file to write
+        """
+        store = self.bees
+        n = store.count
+        bees = store.owners[:n]
+        flower_rows = {flower: row for row, flower in enumerate(self.flowers)}
+
+        def bee_rows(bee_set):
+            return np.array([bee.idx for bee in bee_set], dtype=np.int64)
+
+        meta = {
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "frames": self.frames,
+            "map_size": MAP_SIZE,
+            "terrain": self.background.terrain_fingerprint(),
+            "random_state": random.getstate(),
+            "rng_state": self.rng.bit_generator.state,
+            "settings": [self.number_of_bees, self.initial_bee_energy, self.hive_release_cooldown,
+                         self.number_obstacles, self.number_of_hives],
+        }
+        arrays = {f"store_{name}": getattr(store, name)[:n] for name in store._fields()}
+        arrays.update(
+            bee_total_honey=np.array([bee.total_honey for bee in bees], dtype=float),
+            bee_angle=np.array([bee.angle for bee in bees], dtype=float),
+            bee_colour=np.array([bee.colour for bee in bees], dtype=np.int64).reshape(-1, 3),
+            bee_seeking_honey=np.array([bee.seeking_honey for bee in bees], dtype=bool),
+            bee_closestflower=np.array([flower_rows[bee.closestflower] if bee.closestflower is not None else -1
+                                        for bee in bees], dtype=np.int64),
+            bee_eggs=np.array([bee.eggs for bee in bees], dtype=np.int64),
+            bee_min_honey=np.array([getattr(bee, "min_honey", np.nan) for bee in bees], dtype=float),
+            creatures=bee_rows(self.creatures),
+            hive_pos=np.array([tuple(hive.pos) for hive in self.hives], dtype=float).reshape(-1, 2),
+            hive_counts=np.array([(hive.workerspop, hive.dronespop, hive.queenpop, hive.internal_cooldown, hive.beelook)
+                                  for hive in self.hives], dtype=np.int64).reshape(-1, 5),
+            hive_size=np.array([hive.size for hive in self.hives], dtype=float),
+            hive_lod_ticks=np.array([hive.lod_ticks for hive in self.hives], dtype=np.int64),
+            hive_combs=np.array([hive.combs for hive in self.hives], dtype=float).reshape(-1, COMB_WIDTH * COMB_HEIGHT, 2),
+            hive_combs_honey=np.array([hive.combs_honey for hive in self.hives], dtype=float).reshape(-1, COMB_HEIGHT, COMB_WIDTH),
+            hive_inside_counts=np.array([len(hive.bees_inside) for hive in self.hives], dtype=np.int64),
+            hive_inside=np.concatenate([bee_rows(hive.bees_inside) for hive in self.hives] + [np.zeros(0, dtype=np.int64)]),
+            hive_outside_counts=np.array([len(hive.bees_outside) for hive in self.hives], dtype=np.int64),
+            hive_outside=np.concatenate([bee_rows(hive.bees_outside) for hive in self.hives] + [np.zeros(0, dtype=np.int64)]),
+            flower_pos=np.array([tuple(flower.pos) for flower in self.flowers], dtype=float).reshape(-1, 2),
+            flower_values=np.array([(flower.size, flower.pollen, flower.n_bees, flower.angle, flower.rot_speed)
+                                    for flower in self.flowers], dtype=float).reshape(-1, 5),
+            flower_petal_color=np.array([flower.petal_color for flower in self.flowers], dtype=np.int64).reshape(-1, 3),
+            obstacle_pos=np.array([tuple(obstacle.pos) for obstacle in self.obstacles], dtype=float).reshape(-1, 2),
+            obstacle_size=np.array([obstacle.size for obstacle in self.obstacles], dtype=np.int64),
+            population_history=np.array(self.population_history, dtype=np.int64),
+            meta=np.array(json.dumps(meta)),
+        )
+        temp_path = f"{filepath}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                np.savez_compressed(file, **arrays)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def load_snapshot(self, filepath: str) -> None:
+        """Replace the state of the simulation with a snapshot from save_snapshot.
+
+        The simulation must have been set up with the same map, parameters and
+        seed as the one that saved the snapshot. Stepping on from here then
+        repeats the original run exactly.
+
+        Args:
+            filepath: Path of the snapshot file
+
+        Raises:
+            ValueError: If the snapshot is from another format version, map size or terrain
+        """
+        with np.load(filepath) as data:
+            data = {name: data[name] for name in data.files}
+        meta = json.loads(str(data["meta"]))
+        if meta["version"] != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"snapshot format version {meta['version']} is not supported (expected {SNAPSHOT_FORMAT_VERSION})")
+        if meta["map_size"] != MAP_SIZE or meta["terrain"] != self.background.terrain_fingerprint():
+            raise ValueError("snapshot was taken on a different map, start with the same map, parameters and seed")
+
+        self.frames = meta["frames"]
+        (self.number_of_bees, self.initial_bee_energy, self.hive_release_cooldown,
+         self.number_obstacles, self.number_of_hives) = meta["settings"]
+        self.population_history = data["population_history"].tolist()
+        self.selected_bee = None
+        self.selected_hive = None
+
+        # flowers
+        self.flowers = []
+        for pos, values, petal_color in zip(data["flower_pos"].tolist(), data["flower_values"].tolist(),
+                                            data["flower_petal_color"].tolist()):
+            flower = Flower.__new__(Flower)
+            flower.pos = pygame.Vector2(pos)
+            flower.size, flower.pollen, flower.n_bees, flower.angle, flower.rot_speed = values
+            flower.size, flower.n_bees = int(flower.size), int(flower.n_bees)
+            flower.petal_color = tuple(petal_color)
+            self.flowers.append(flower)
+        self.flower_index.rebuild(self.flowers)
+
+        # obstacles, stamped into fresh lookups
+        self.obstacles = []
+        self.obstaclemap = set()
+        self.obstacle_field = ObstacleField(MAP_SIZE, CREATURE_SEPARATION_THRESHOLD)
+        for pos, size in zip(data["obstacle_pos"].tolist(), data["obstacle_size"].tolist()):
+            obstacle = Obstacle.__new__(Obstacle)
+            obstacle.pos = pygame.Vector2(pos)
+            obstacle.size = size
+            obstacle.min_x, obstacle.min_y = obstacle.pos.x, obstacle.pos.y
+            obstacle.max_x, obstacle.max_y = obstacle.pos.x + size, obstacle.pos.y + size
+            self.add_obstacles(obstacle)
+
+        # hives, their bees are filled in below
+        self.hives = []
+        for index, (pos, counts, size, combs, combs_honey, hive_lod_ticks) in enumerate(zip(
+                data["hive_pos"].tolist(), data["hive_counts"].tolist(), data["hive_size"].tolist(),
+                data["hive_combs"].tolist(), data["hive_combs_honey"], data["hive_lod_ticks"].tolist())):
+            hive = Hive.__new__(Hive)
+            hive.pos = pygame.Vector2(pos)
+            hive.index = index
+            hive.workerspop, hive.dronespop, hive.queenpop, hive.internal_cooldown, hive.beelook = counts
+            hive.size = size
+            hive.combs = [tuple(comb) for comb in combs]
+            hive.combs_honey = combs_honey.copy()
+            hive.lod_ticks = hive_lod_ticks
+            self.hives.append(hive)
+
+        # bees, row for row as they were in the store
+        n = len(data["store_pos"])
+        store = BeeStore(max(BEE_STORE_INITIAL_CAPACITY, n))
+        for name in store._fields():
+            getattr(store, name)[:n] = data[f"store_{name}"]
+        store.count = n
+        self.bees = store
+        for row, (total_honey, angle, colour, seeking_honey, closestflower, eggs, min_honey) in enumerate(zip(
+                data["bee_total_honey"].tolist(), data["bee_angle"].tolist(), data["bee_colour"].tolist(),
+                data["bee_seeking_honey"].tolist(), data["bee_closestflower"].tolist(), data["bee_eggs"].tolist(),
+                data["bee_min_honey"].tolist())):
+            bee = Creature.__new__(Creature)
+            bee.manager = self
+            bee.store = store
+            bee.idx = row
+            bee.total_honey = total_honey
+            bee.angle = angle
+            bee.hive = self.hives[int(store.hive[row])]
+            bee.colour = tuple(colour)
+            bee.seeking_honey = seeking_honey
+            bee.closestflower = self.flowers[closestflower] if closestflower >= 0 else None
+            bee.eggs = eggs
+            if not math.isnan(min_honey):
+                bee.min_honey = min_honey
+            store.owners.append(bee)
+
+        self.creatures = BeeSet(store.owners[row] for row in data["creatures"].tolist())
+        inside = np.split(data["hive_inside"], np.cumsum(data["hive_inside_counts"])[:-1])
+        outside = np.split(data["hive_outside"], np.cumsum(data["hive_outside_counts"])[:-1])
+        for hive, inside_rows, outside_rows in zip(self.hives, inside, outside):
+            hive.bees_inside = BeeSet(store.owners[row] for row in inside_rows.tolist())
+            hive.bees_outside = BeeSet(store.owners[row] for row in outside_rows.tolist())
+
+        self.view_index = None
+
+        random_state = meta["random_state"]
+        random.setstate((random_state[0], tuple(random_state[1]), random_state[2]))
+        self.rng.bit_generator.state = meta["rng_state"]
 
     def check_mouse_movement(self):
         mouse = pygame.math.Vector2(pygame.mouse.get_pos())
@@ -591,23 +2104,23 @@ class Simulation():
         invalid_coords = []
 
         for i in range(self.number_of_hives): # Use configured number of hives
-            random_coord = pygame.Vector2(random.randint(5,123),random.randint(5,123))
-            while maparr[int(random_coord.x)][int(random_coord.y)] >= BG_WATER_THRESHOLD or random_coord in invalid_coords:
-                random_coord = pygame.Vector2(random.randint(5,123),random.randint(5,123))
+            random_coord = pygame.Vector2(random.randint(5,MAP_SIZE-5),random.randint(5,MAP_SIZE-5))
+            while maparr[int(random_coord.x), int(random_coord.y)] >= BG_WATER_THRESHOLD or random_coord in invalid_coords:
+                random_coord = pygame.Vector2(random.randint(5,MAP_SIZE-5),random.randint(5,MAP_SIZE-5))
             sim.add_hive(Hive(random_coord.x,random_coord.y, sim, self))
             invalid_coords.append(random_coord)
 
         for i in range(25):
-            random_coord = pygame.Vector2(random.randint(5,123),random.randint(5,123))
-            while maparr[int(random_coord.x)][int(random_coord.y)] >= BG_WATER_THRESHOLD or random_coord in invalid_coords:
-                random_coord = pygame.Vector2(random.randint(5,123),random.randint(5,123))
+            random_coord = pygame.Vector2(random.randint(5,MAP_SIZE-5),random.randint(5,MAP_SIZE-5))
+            while maparr[int(random_coord.x), int(random_coord.y)] >= BG_WATER_THRESHOLD or random_coord in invalid_coords:
+                random_coord = pygame.Vector2(random.randint(5,MAP_SIZE-5),random.randint(5,MAP_SIZE-5))
             sim.add_flo(Flower(random_coord.x, random_coord.y))
             invalid_coords.append(random_coord)
 
         for i in range(self.number_obstacles):
-            random_coord = pygame.Vector2(random.randint(5,123),random.randint(5,123))
-            while maparr[int(random_coord.x)][int(random_coord.y)] >= BG_WATER_THRESHOLD or random_coord in invalid_coords:
-                random_coord = pygame.Vector2(random.randint(5,123),random.randint(5,123))
+            random_coord = pygame.Vector2(random.randint(5,MAP_SIZE-5),random.randint(5,MAP_SIZE-5))
+            while maparr[int(random_coord.x), int(random_coord.y)] >= BG_WATER_THRESHOLD or random_coord in invalid_coords:
+                random_coord = pygame.Vector2(random.randint(5,MAP_SIZE-5),random.randint(5,MAP_SIZE-5))
             sim.add_obstacles(Obstacle(random_coord.x, random_coord.y))
             invalid_coords.append(random_coord)
 
@@ -742,6 +2255,33 @@ class Simulation():
         draw_text(screen, max_pop_text, STATS_FONT, self.graph_text_color,
                   (self.graph_rect.right - 5, self.graph_rect.bottom - padding_y + 2), anchor="bottomright")
 
+    def draw_profiler(self):
+        """Draw the mean time per frame of each phase, below the population graph."""
+        averages = self.phase_timer.averages()
+        line_height = 18
+        rect = pygame.Rect(self.graph_rect.left, self.graph_rect.bottom + 10,
+                           self.graph_rect.width, (len(averages) + 3) * line_height + 10)
+        panel_surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+        panel_surface.fill(self.graph_bg_color)
+        screen.blit(panel_surface, rect.topleft)
+        pygame.draw.rect(screen, self.graph_axis_color, rect, 1)
+
+        draw_text(screen, f"Frame time (last {len(self.phase_timer.history)} frames)", STATS_FONT,
+                  self.graph_text_color, (rect.centerx, rect.top + 5), anchor="midtop")
+        y = rect.top + 5 + line_height
+        # slowest phase first
+        for name, ms in sorted(averages.items(), key=lambda item: item[1], reverse=True):
+            draw_text(screen, name, STATS_FONT, self.graph_text_color, (rect.left + 5, y))
+            draw_text(screen, f"{ms:.2f} ms", STATS_FONT, self.graph_text_color, (rect.right - 5, y), anchor="topright")
+            y += line_height
+        draw_text(screen, "total", STATS_FONT, self.graph_line_color, (rect.left + 5, y))
+        draw_text(screen, f"{sum(averages.values()):.2f} ms", STATS_FONT, self.graph_line_color,
+                  (rect.right - 5, y), anchor="topright")
+        y += line_height
+        draw_text(screen, "text cache hits", STATS_FONT, self.graph_text_color, (rect.left + 5, y))
+        draw_text(screen, f"{TEXT_CACHE.hit_rate():.0%} of {TEXT_CACHE.hits + TEXT_CACHE.misses}", STATS_FONT,
+                  self.graph_text_color, (rect.right - 5, y), anchor="topright")
+
 class Flower:
     """Represents a flower in the simulation that bees can collect pollen from.
     
@@ -779,28 +2319,90 @@ class Flower:
         self.rot_speed = 0.005
     
     def update(self, manager) -> None:
-        """Update flower state and render.
+        """Update flower state.
         
         Handles pollen depletion and removes the flower if depleted.
         
         Args:
             manager: Simulation manager instance
         """
-        self.draw(manager.camera_offset, manager.scaled)
-        
         if self.pollen <= 0:
             manager.rem_flo(self)
 
-    def draw(self, camera_offset: pygame.Vector2, scaled: float) -> None:
-        """Draw the flower on the screen.
-        
+    def draw(self, camera_offset: pygame.Vector2, scaled: float) -> None:
+        """Draw the flower on the screen.
+        
+        Args:
+            camera_offset: Current camera position
+            scaled: Current scale factor
+        """
+        screen_pos = gridpos2screen(self.pos, camera_offset)
+        pygame.draw.circle(screen, self.petal_color, screen_pos, scaled)
+        draw_text(screen, f"{self.n_bees}", STATS_FONT, TEXT_COLOUR, screen_pos)
+
+class FlowerIndex():
+    """Index answering "nearest flower that is not saturated with bees" queries.
+
+    Flower positions are kept in one array, with a mask of the flowers that
+    still have room for visitors (n_bees <= F_MAX_BEES), so a query is a
+    single vectorised distance scan instead of a Python loop over every
+    flower. Visitor counts must be changed through add_visitor and
+    remove_visitor so the mask is updated when a flower crosses the
+    saturation threshold. Adding or removing flowers rebuilds the arrays.
+
+    Attributes:
+        flowers (list): Indexed flowers, in Simulation.flowers order
+        positions (np.ndarray): (F, 2) flower positions
+        available (np.ndarray): (F,) True for flowers with room for more bees
+        rows (dict): Flower -> row in the arrays
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.rebuild([])
+
+    def rebuild(self, flowers: list) -> None:
+        """Rebuild the index after flowers have been added or removed.
+
+        Args:
+            flowers: Every flower in the simulation
+        """
+        self.flowers = list(flowers)
+        self.positions = np.array([(flower.pos.x, flower.pos.y) for flower in self.flowers], dtype=float).reshape(-1, 2)
+        self.available = np.array([flower.n_bees <= F_MAX_BEES for flower in self.flowers], dtype=bool)
+        self.rows = {flower: row for row, flower in enumerate(self.flowers)}
+
+    def add_visitor(self, flower) -> None:
+        """Count a bee heading to a flower."""
+        flower.n_bees += 1
+        self._update_availability(flower)
+
+    def remove_visitor(self, flower) -> None:
+        """Stop counting a bee that is no longer heading to a flower."""
+        flower.n_bees -= 1
+        self._update_availability(flower)
+
+    def _update_availability(self, flower) -> None:
+        row = self.rows.get(flower)
+        if row is not None: # flowers removed from the simulation may still have visitors
+            self.available[row] = flower.n_bees <= F_MAX_BEES
+
+    def nearest(self, pos):
+        """Nearest flower that is not saturated.
+
+        Ties go to the flower that comes first in Simulation.flowers.
+
         Args:
-            camera_offset: Current camera position
-            scaled: Current scale factor
+            pos: (x, y) position to search from
+
+        Returns:
+            Flower: The nearest available flower, or None if there are none
         """
-        screen_pos = gridpos2screen(self.pos, camera_offset)
-        pygame.draw.circle(screen, self.petal_color, screen_pos, scaled)
-        draw_text(screen, f"{self.n_bees}", STATS_FONT, TEXT_COLOUR, screen_pos)
+        if not self.available.any():
+            return None
+        dist_sq = (self.positions[:, 0] - pos[0])**2 + (self.positions[:, 1] - pos[1])**2
+        dist_sq[~self.available] = np.inf
+        return self.flowers[int(np.argmin(dist_sq))]
 
 class Node():
     def __init__(self, parent=None, position=None):
@@ -825,9 +2427,6 @@ class Obstacle():
         self.max_x = self.pos.x + self.size
         self.max_y = self.pos.y + self.size
 
-    def update(self, manager):
-        self.draw(manager.camera_offset, manager.scaled)
-
     def get_closest_point(self, obj_pos):
         closest_point = pygame.Vector2(0,0)
 
@@ -842,6 +2441,145 @@ class Obstacle():
         pygame.draw.rect(screen, (80, 80, 80), (screen_pos.x, screen_pos.y, scaled*self.size, scaled*self.size))
 
 
+class ObstacleField():
+    """Precomputed distance and gradient field around the obstacles.
+
+    Obstacles do not move once placed, so the distance from every sample
+    point to the nearest obstacle, and the unit direction pointing away from
+    it, are worked out once as each obstacle is added. Rock avoidance is then
+    a bilinear lookup into these arrays instead of a loop over every obstacle.
+    Only samples within reach of an obstacle are ever written, and the field is
+    stored as square tiles that are only allocated once an obstacle reaches
+    them, so a large world with a few rocks costs a few tiles. Neighbouring
+    tiles share their edge samples, so every bilinear lookup stays in one tile.
+
+    Attributes:
+        resolution (int): Samples per grid unit
+        reach (float): Distance at which obstacles stop repelling bees
+        samples (int): Samples along each side of the whole field
+        tile_size (int): Samples between the first and last sample of a tile
+        tiles (dict): (tx, ty) -> (distance, gradient) for the tile covering
+            samples tx * tile_size to (tx + 1) * tile_size inclusive. distance is
+            (T+1, T+1) distance to the nearest obstacle, capped at reach, and
+            gradient is (T+1, T+1, 2) unit vectors pointing away from it
+    """
+
+    def __init__(self, size: int, reach: float, resolution: int = OBSTACLE_FIELD_RESOLUTION,
+                 tile_size: int = OBSTACLE_FIELD_TILE_SIZE):
+        """Initialize an empty field.
+
+        Args:
+            size: Size of the world grid
+            reach: Distance at which obstacles stop repelling bees
+            resolution: Samples per grid unit
+            tile_size: Samples between the first and last sample of a tile
+        """
+        self.resolution = resolution
+        self.reach = reach
+        self.samples = size * resolution + 1
+        self.tile_size = tile_size
+        self.tiles = {}
+
+    def tile(self, tx: int, ty: int) -> tuple[np.ndarray, np.ndarray]:
+        """Distance and gradient arrays of a tile, allocating it if needed."""
+        tile = self.tiles.get((tx, ty))
+        if tile is None:
+            side = self.tile_size + 1
+            tile = (np.full((side, side), self.reach, dtype=np.float32),
+                    np.zeros((side, side, 2), dtype=np.float32))
+            self.tiles[(tx, ty)] = tile
+        return tile
+
+    def add(self, obstacle) -> None:
+        """Stamp an obstacle into the field.
+
+        Args:
+            obstacle: Obstacle to add, its bounds are min_x/min_y to max_x/max_y
+        """
+        res = self.resolution
+        samples = self.samples
+        lo_x = max(0, math.floor((obstacle.min_x - self.reach) * res))
+        hi_x = min(samples, math.ceil((obstacle.max_x + self.reach) * res) + 1)
+        lo_y = max(0, math.floor((obstacle.min_y - self.reach) * res))
+        hi_y = min(samples, math.ceil((obstacle.max_y + self.reach) * res) + 1)
+        if lo_x >= hi_x or lo_y >= hi_y:
+            return
+
+        px, py = np.meshgrid(np.arange(lo_x, hi_x) / res, np.arange(lo_y, hi_y) / res, indexing="ij")
+        # same closest point as Obstacle.get_closest_point, for every sample at once
+        dx = px - np.clip(px, obstacle.min_x, obstacle.max_x)
+        dy = py - np.clip(py, obstacle.min_y, obstacle.max_y)
+        dist = np.hypot(dx, dy)
+        safe = np.where(dist > 0, dist, 1)
+        direction = np.where((dist > 0)[..., None], np.stack((dx / safe, dy / safe), axis=-1), 0)
+
+        size = self.tile_size
+        # a sample on a tile edge belongs to the tiles either side of it
+        for tx in range(max(0, (lo_x - 1) // size), (hi_x - 1) // size + 1):
+            for ty in range(max(0, (lo_y - 1) // size), (hi_y - 1) // size + 1):
+                win_lo_x, win_hi_x = max(lo_x, tx * size), min(hi_x, (tx + 1) * size + 1)
+                win_lo_y, win_hi_y = max(lo_y, ty * size), min(hi_y, (ty + 1) * size + 1)
+                if win_lo_x >= win_hi_x or win_lo_y >= win_hi_y:
+                    continue
+                distance, gradient = self.tile(tx, ty)
+                stamp = (slice(win_lo_x - lo_x, win_hi_x - lo_x), slice(win_lo_y - lo_y, win_hi_y - lo_y))
+                local = (slice(win_lo_x - tx * size, win_hi_x - tx * size),
+                         slice(win_lo_y - ty * size, win_hi_y - ty * size))
+
+                window = distance[local]
+                closer = dist[stamp] < window
+                window[closer] = dist[stamp][closer]
+                gradient[local][closer] = direction[stamp][closer]
+
+    def repulsion(self, points: np.ndarray) -> np.ndarray:
+        """Rock avoidance force at many points at once.
+
+        The force points away from the nearest obstacle and falls off linearly
+        from 1 at its edge to 0 at reach. Points inside an obstacle, or in a
+        tile no obstacle reaches, get no force.
+
+        Args:
+            points: (N, 2) world grid positions
+
+        Returns:
+            np.ndarray: (N, 2) avoidance forces
+        """
+        forces = np.zeros((len(points), 2))
+        if not self.tiles:
+            return forces
+
+        scaled = points * self.resolution
+        last = self.samples - 2
+        i = np.clip(np.floor(scaled).astype(np.int64), 0, last)
+        t = np.clip(scaled - i, 0, 1)
+        tile_xy = i // self.tile_size
+        per_side = last // self.tile_size + 1
+        keys, inverse = np.unique(tile_xy[:, 0] * per_side + tile_xy[:, 1], return_inverse=True)
+
+        for k, key in enumerate(keys.tolist()):
+            tile = self.tiles.get(divmod(key, per_side))
+            if tile is None:
+                continue
+            in_tile = inverse == k
+            local = i[in_tile] % self.tile_size
+            x0, y0 = local[:, 0], local[:, 1]
+            tx, ty = t[in_tile, 0], t[in_tile, 1]
+
+            def sample(field):
+                w00 = (1 - tx) * (1 - ty)
+                w10 = tx * (1 - ty)
+                w01 = (1 - tx) * ty
+                w11 = tx * ty
+                if field.ndim == 3:
+                    w00, w10, w01, w11 = (w[:, None] for w in (w00, w10, w01, w11))
+                return (field[x0, y0] * w00 + field[x0 + 1, y0] * w10 +
+                        field[x0, y0 + 1] * w01 + field[x0 + 1, y0 + 1] * w11)
+
+            distance, gradient = tile
+            strength = np.clip((self.reach - sample(distance)) / self.reach, 0, None)
+            forces[in_tile] = sample(gradient) * strength[:, None]
+        return forces
+
 class Hive():
     def __init__(self,x,y, sim, manager):
         """Initialize a hive.
@@ -853,47 +2591,37 @@ class Hive():
             manager: Simulation manager instance
         """
         self.pos=pygame.Vector2(x,y)
+        self.index = len(manager.hives) # position in manager.hives, set before the hive is added
         self.workerspop = manager.number_of_bees
         self.dronespop = self.workerspop
         self.queenpop = H_INITIAL_QUEENS
-        self.bees_inside = []
-        self.bees_outside = []
+        self.bees_inside = BeeSet()
+        self.bees_outside = BeeSet()
         
         self.internal_cooldown = 0
 
         self.beelook = 0
 
+        self.lod_ticks = 0 # ticks the aggregate interior model has not caught up on yet
+
         self.size = self.workerspop + self.queenpop
 
         for i in range(self.workerspop):
             offset_pos = [((random.random()-0.5)*100), ((random.random()-0.5)*100)]
             temp_bee = Creature(x,y, self, manager, "worker")
             sim.add(temp_bee)
-            self.bees_inside.append(temp_bee)
+            self.bees_inside.add(temp_bee)
 
         for i in range(self.queenpop):
             offset_pos = [((random.random()-0.5)*100), ((random.random()-0.5)*100)]
             temp_bee = Creature(x,y, self, manager, "queen")
             sim.add(temp_bee)
-            self.bees_inside.append(temp_bee)
+            self.bees_inside.add(temp_bee)
 
-        self.combs = []
+        self.combs = comb_layout()
         self.combs_honey = np.zeros((9,12))
-        radius = 1
-        radius_long = radius/np.cos(np.pi/6)
-        tringle_len = radius*np.tan(np.pi/6)
-
-        horizontal_diff = 2*radius
         for i in range(9):
-            y_pos = (5 + i*(2*radius_long))
-            if i % 2 == 0:
-                offset_val = radius
-            else:
-                offset_val = 0
             for j in range(12):
-                x_pos = 5 + j * (horizontal_diff) + offset_val
-                self.combs.append((x_pos, y_pos))
-
                 fake_comb_value = -1
 
                 self.combs_honey[i, j] = 0
@@ -907,6 +2635,14 @@ class Hive():
                     self.combs_honey[i,j] = fake_comb_value
 
     def update(self, manager):
+        if self.is_aggregate(manager):
+            self.lod_ticks += 1
+            if self.lod_ticks >= HIVE_LOD_INTERVAL:
+                self.update_aggregate(manager, manager.frames)
+        elif self.lod_ticks:
+            # just selected: catch up to the end of last tick, from this tick on the bees run themselves
+            self.update_aggregate(manager, manager.frames - 1)
+
         if self.beelook >= len(self.bees_inside):
             self.beelook = 0
 
@@ -917,43 +2653,115 @@ class Hive():
         if self.internal_cooldown == 0 and len(self.bees_inside) > 0:
             bee = self.bees_inside[self.beelook]
             if bee.seeking_honey == True:
-                self.bees_inside.pop(self.beelook)
-                self.bees_outside.append(bee)
+                self.release(bee) # the next bee to look at is swapped into this slot
             else:
                 self.beelook += 1
             self.internal_cooldown = manager.hive_release_cooldown
         elif self.internal_cooldown > 0 :
             self.internal_cooldown -= 1
 
-        self.draw(manager.camera_offset)
+    def is_aggregate(self, manager) -> bool:
+        """True if the hive's interior runs on the aggregate model rather than bee by bee.
 
-    def update_eggs(self, manager):
-        """this updates the hive every time its called, which is like every 60 frames i think"""
-        for r_egg, row_data in enumerate(self.combs_honey):
-            for c_egg, egg_value_at_iteration_start in enumerate(row_data):
-                if egg_value_at_iteration_start <= EGG_CELL_VALUE:  # Is it an egg cell?
-                    # Decrement the egg value in the hive's storage
-                    self.combs_honey[r_egg, c_egg] -= 1
-                    
-                    # Check for maturation using the egg's value *before* this frame's decrement
-                    if egg_value_at_iteration_start <= -30:  # Egg fully matured (threshold is -30)
-                        # Search for cells with > 80 honey
-                        honey_rows, honey_cols = np.where(self.combs_honey > 80) # Honey requirement is 80
-                        
-                        if honey_rows.size >= 2: # Check if there are at least 5 cells with enough honey
-                            # Consume honey from the first 5 found cells
-                            for i in range(2):
-                                r_honey_consume, c_honey_consume = honey_rows[i], honey_cols[i]
-                                self.combs_honey[r_honey_consume, c_honey_consume] = 0
-                            
-                            # Reset egg cell (which was just decremented, now set to -1)
-                            self.combs_honey[r_egg, c_egg] = -1 
-
-                            # Spawn bee
-                            flat_egg_cell_idx = r_egg * COMB_WIDTH + c_egg
-                            manager.spawn_new_bee(self, self.combs[flat_egg_cell_idx])
-                            
-                            return # Spawn one bee per update_eggs call and exit
+        With --hive-lod every hive does, except the selected hive whose
+        interior is on screen.
+        """
+        return manager.hive_lod and self is not manager.selected_hive
+
+    def update_aggregate(self, manager, last_tick: int) -> None:
+        """Advance the aggregate model of the hive's interior by the ticks owed to it.
+
+        Stands in for the inside bees' comb walking and flocking while the
+        hive is not shown. Over the owed ticks, each unloading worker puts up
+        to HIVE_LOD_DEPOSIT_RATE honey per tick into the comb, and regains the
+        energy the deposits would have given it. A worker that runs out of
+        honey goes back to seeking it and is released. Each queen gains her
+        egg every 60 ticks and lays a Poisson distributed number of eggs, at
+        HIVE_LOD_EGG_RATE per tick, into empty cells. Like the bees' own
+        targeting, cells are filled from the end of the comb.
+
+        Args:
+            manager: The simulation, whose random generator draws the eggs laid
+            last_tick: The last tick owed to the model
+        """
+        ticks = self.lod_ticks
+        self.lod_ticks = 0
+        cells = self.combs_honey.reshape(-1) # flat view, in the same order as COMB_CENTRES
+        for bee in self.bees_inside[:]:
+            if bee.role == 'worker':
+                if bee.seeking_honey:
+                    continue # waiting to be released
+                fillable = np.flatnonzero((cells >= 0) & (cells <= 100))[::-1]
+                room = HIVE_LOD_CELL_CAPACITY - cells[fillable]
+                honey = bee.honey
+                deposit = min(honey, HIVE_LOD_DEPOSIT_RATE * ticks, room.sum())
+                # fill each cell in turn, up to what is left of the deposit
+                cells[fillable] += np.clip(deposit - (np.cumsum(room) - room), 0, room)
+                bee.honey = honey - deposit
+                bee.energy = min(bee.energy + deposit * HIVE_LOD_ENERGY_PER_HONEY, CREATURE_INITIAL_ENERGY)
+                if bee.honey <= 0:
+                    bee.seeking_honey = True
+                    self.release(bee)
+            elif bee.role == 'queen':
+                bee.eggs += last_tick // 60 - (last_tick - ticks) // 60
+                empty = np.flatnonzero(cells == -1)
+                laid = min(bee.eggs, empty.size, int(manager.rng.poisson(HIVE_LOD_EGG_RATE * ticks)))
+                if laid > 0:
+                    cells[empty[-laid:]] -= 1
+                    bee.eggs -= laid
+
+    def release(self, bee):
+        """Move a bee from inside the hive to outside."""
+        if not bee.outside:
+            self.bees_inside.remove(bee)
+            self.bees_outside.add(bee)
+            bee.outside = True
+
+    def admit(self, bee):
+        """Move a bee from outside the hive to inside."""
+        if bee.outside:
+            self.bees_outside.remove(bee)
+            self.bees_inside.add(bee)
+            bee.outside = False
+
+    def remove_bee(self, bee):
+        """Forget a bee that has died, wherever it is."""
+        if bee.outside:
+            self.bees_outside.remove(bee)
+        else:
+            self.bees_inside.remove(bee)
+
+    def update_eggs(self, manager, max_hatch: int | None = None):
+        """Age every egg cell by one and hatch the mature eggs that can be fed.
+
+        Called every 60 frames. Cells are visited in row-major order. Each
+        egg cell's value drops by 1, and an egg that was at or below
+        H_EGG_MATURE_VALUE hatches if there are H_HATCH_HONEY_CELLS cells with
+        more than H_HATCH_HONEY_VALUE honey: the first such cells are emptied,
+        the egg cell goes back to -1 and a bee is spawned there. The visit
+        stops after max_hatch hatches, so the eggs after the last one to hatch
+        are not aged on that call.
+
+        Args:
+            manager: The simulation, which spawns the new bees
+            max_hatch: Most eggs to hatch this call (default=H_HATCH_BATCH)
+        """
+        if max_hatch is None:
+            max_hatch = H_HATCH_BATCH
+        cells = self.combs_honey.reshape(-1) # flat view, row-major like self.combs
+        eggs = cells <= EGG_CELL_VALUE
+        mature = np.flatnonzero(eggs & (cells <= H_EGG_MATURE_VALUE))
+        honey = np.flatnonzero(cells > H_HATCH_HONEY_VALUE) # egg cells are negative, so ageing cannot change this
+        hatching = mature[:min(max(0, max_hatch), honey.size // H_HATCH_HONEY_CELLS)]
+
+        if hatching.size and hatching.size == max_hatch:
+            eggs[hatching[-1] + 1:] = False # stopped at the last hatch
+        cells[eggs] -= 1
+
+        cells[honey[:hatching.size * H_HATCH_HONEY_CELLS]] = 0
+        cells[hatching] = -1
+        for cell in hatching:
+            manager.spawn_new_bee(self, self.combs[cell])
 
     def draw(self, camera_offset):
         """draws the hive onto the screen"""
@@ -961,9 +2769,401 @@ class Hive():
         pygame.draw.rect(screen, (255, 255, 0), (screen_pos.x-self.size/2, screen_pos.y-self.size/2, self.size, self.size))
         draw_text(screen, f"{len(self.bees_inside) + len(self.bees_outside)}", STATS_FONT, (0,0,0), screen_pos)
 
+class BeeSet():
+    """Collection of bees with O(1) add, remove, membership and indexing.
+
+    Bees are kept in a list alongside a dict of each bee's position in it.
+    Removing a bee moves the last bee into its slot (swap-remove), so the
+    order of the bees is not preserved. Slicing returns a plain list copy,
+    which is safe to iterate while the set changes.
+    """
+
+    def __init__(self, bees=()):
+        """Initialize the set.
+
+        Args:
+            bees: Initial bees
+        """
+        self.items = []
+        self.positions = {}
+        for bee in bees:
+            self.add(bee)
+
+    def add(self, bee) -> None:
+        """Add a bee, does nothing if it is already in the set."""
+        if bee not in self.positions:
+            self.positions[bee] = len(self.items)
+            self.items.append(bee)
+
+    def remove(self, bee) -> None:
+        """Remove a bee, raising KeyError if it is not in the set."""
+        index = self.positions.pop(bee)
+        last = self.items.pop()
+        if last is not bee:
+            self.items[index] = last
+            self.positions[last] = index
+
+    def discard(self, bee) -> None:
+        """Remove a bee if it is in the set."""
+        if bee in self.positions:
+            self.remove(bee)
+
+    def __contains__(self, bee) -> bool:
+        return bee in self.positions
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+class SpatialHash():
+    """Uniform grid spatial hash for "which points are near here" queries.
+
+    Points are bucketed into square cells as wide as the query radius, so every
+    point within that radius of a query point lies in the 3x3 block of cells
+    around it. Each point also carries an integer group, so separate populations
+    (the inside and outside bees of each hive) share one structure without ever
+    seeing each other. The hash is rebuilt from arrays in one sort per tick.
+
+    Attributes:
+        cell_size (float): Width of a cell, equal to the query radius
+        rows (np.ndarray): Point indices sorted by cell
+        sorted_keys (np.ndarray): Cell key of each entry of rows
+        cells (dict): Cell key -> (start, end) slice into rows
+    """
+
+    KEY_RANGE = 1 << 20 # cells per axis the key encoding can hold
+
+    def __init__(self, cell_size: float):
+        """Initialize an empty hash.
+
+        Args:
+            cell_size: Width of a cell, should equal the neighbour query radius
+        """
+        self.cell_size = cell_size
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.sorted_keys = np.zeros(0, dtype=np.int64)
+        self.cells = {}
+
+    def _key(self, group, cell_x, cell_y):
+        # cells are shifted by one so the neighbours of cell 0 never go negative
+        return (group * self.KEY_RANGE + cell_x + 1) * self.KEY_RANGE + cell_y + 1
+
+    def rebuild(self, points: np.ndarray, groups: np.ndarray, cell_size: float | None = None) -> None:
+        """Rebuild the hash from scratch.
+
+        Args:
+            points: (N, 2) point positions
+            groups: (N,) integer group of each point
+            cell_size: New cell width, if the query radius has changed
+        """
+        if cell_size is not None:
+            self.cell_size = cell_size
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        keys = self._key(groups.astype(np.int64), cells[:, 0], cells[:, 1])
+        self.rows = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.rows]
+        unique_keys, starts = np.unique(self.sorted_keys, return_index=True)
+        ends = np.append(starts[1:], len(keys))
+        self.cells = dict(zip(unique_keys.tolist(), zip(starts.tolist(), ends.tolist())))
+
+    def query(self, point, group: int) -> np.ndarray:
+        """Indices of every point of a group in the 3x3 cells around a point.
+
+        This is a superset of the points within cell_size of the query point,
+        callers still check the actual distance.
+
+        Args:
+            point: (x, y) query position
+            group: Group to search
+
+        Returns:
+            np.ndarray: Indices of the candidate points
+        """
+        cell_x = math.floor(point[0] / self.cell_size)
+        cell_y = math.floor(point[1] / self.cell_size)
+        slices = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                span = self.cells.get(self._key(group, cell_x + dx, cell_y + dy))
+                if span:
+                    slices.append(self.rows[span[0]:span[1]])
+        if not slices:
+            return self.rows[:0]
+        return np.concatenate(slices)
+
+    def query_pairs(self, points: np.ndarray, groups: np.ndarray) -> tuple:
+        """Vectorised query: every (query point, candidate) pair in the 3x3 cells around each query point.
+
+        Args:
+            points: (M, 2) query positions
+            groups: (M,) group of each query point
+
+        Returns:
+            tuple: (query, candidate) index arrays of equal length, query indexes
+                into points and candidate into the points the hash was built from
+        """
+        offsets = np.array([-1, 0, 1])
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        cell_x = cells[:, 0, None] + np.repeat(offsets, 3)
+        cell_y = cells[:, 1, None] + np.tile(offsets, 3)
+        keys = self._key(groups.astype(np.int64)[:, None], cell_x, cell_y).ravel()
+
+        starts = np.searchsorted(self.sorted_keys, keys, side="left")
+        counts = np.searchsorted(self.sorted_keys, keys, side="right") - starts
+
+        # expand every (start, count) run into the indices it covers
+        run_offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        query = np.repeat(np.arange(len(points)).repeat(9), counts)
+        candidate = self.rows[np.repeat(starts, counts) + run_offsets]
+        return query, candidate
+
+class BeeStore():
+    """Struct-of-arrays storage for the state of every bee in the simulation.
+
+    Each bee owns one row of the arrays below. Keeping the state in NumPy
+    arrays lets the per-tick physics (clamping, edge avoidance, steering,
+    velocity limits and energy decay) run over the whole population at once
+    instead of bee by bee. Rows are kept contiguous: removing a bee moves the
+    last row into the gap, so only the first `count` rows are ever valid.
+
+    Attributes:
+        count (int): Number of bees currently stored
+        pos (np.ndarray): (N, 2) world grid positions
+        hive_pos (np.ndarray): (N, 2) positions inside the hive
+        velocity (np.ndarray): (N, 2) velocities
+        acceleration (np.ndarray): (N, 2) accumulated acceleration for this tick
+        energy (np.ndarray): (N,) energy levels
+        honey (np.ndarray): (N,) honey carried
+        role (np.ndarray): (N,) role codes, indexes into BEE_ROLES
+        outside (np.ndarray): (N,) True if the bee is outside its hive
+        hive (np.ndarray): (N,) index of the bee's hive in Simulation.hives
+        selectedframe (np.ndarray): (N,) frame slot (of 5) on which the bee flocks while outside
+        owners (list): Creature object owning each row
+    """
+
+    VECTOR_FIELDS = ("pos", "hive_pos", "velocity", "acceleration")
+    SCALAR_FIELDS = (("energy", float), ("honey", float), ("role", np.int8), ("outside", bool), ("hive", np.int32),
+                     ("selectedframe", np.int8))
+
+    def __init__(self, capacity: int = BEE_STORE_INITIAL_CAPACITY):
+        """Allocate empty arrays.
+
+        Args:
+            capacity: Number of rows to allocate up front (grows as needed)
+        """
+        self.count = 0
+        self.capacity = capacity
+        for name in self.VECTOR_FIELDS:
+            setattr(self, name, np.zeros((capacity, 2)))
+        for name, dtype in self.SCALAR_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.owners = []
+
+    def _fields(self):
+        return list(self.VECTOR_FIELDS) + [name for name, _ in self.SCALAR_FIELDS]
+
+    def _grow(self) -> None:
+        """Double the capacity of every array, keeping the stored rows."""
+        self.capacity *= 2
+        for name in self._fields():
+            old = getattr(self, name)
+            new = np.zeros((self.capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, owner) -> int:
+        """Allocate a zeroed row for a new bee.
+
+        Args:
+            owner: Creature that will own the row
+
+        Returns:
+            int: Index of the new row
+        """
+        if self.count == self.capacity:
+            self._grow()
+        row = self.count
+        for name in self._fields():
+            getattr(self, name)[row] = 0
+        self.owners.append(owner)
+        self.count += 1
+        return row
+
+    def remove(self, row: int) -> None:
+        """Free a row by moving the last row into it (swap-remove).
+
+        Args:
+            row: Index of the row to free
+        """
+        last = self.count - 1
+        if row != last:
+            for name in self._fields():
+                array = getattr(self, name)
+                array[row] = array[last]
+            self.owners[row] = self.owners[last]
+            self.owners[row].idx = row
+        self.owners.pop()
+        self.count -= 1
+
+    def local_positions(self, outside: np.ndarray) -> np.ndarray:
+        """Position of every bee in the space it is moving in.
+
+        Args:
+            outside: (N,) mask of bees that are outside their hive
+
+        Returns:
+            np.ndarray: (N, 2) world positions for outside bees, hive positions for inside bees
+        """
+        n = self.count
+        return np.where(outside[:, None], self.pos[:n], self.hive_pos[:n])
+
+    def clamp(self) -> None:
+        """Clamp every bee to the map (outside) or to the hive interior (inside)."""
+        n = self.count
+        outside = self.outside[:n]
+        self.pos[:n][outside] = np.clip(self.pos[:n][outside], 0, MAP_SIZE - 0.01)
+        self.hive_pos[:n][~outside] = np.clip(self.hive_pos[:n][~outside], 0, HIVE_INTERIOR_SIZE - 0.01)
+
+    def edge_forces(self, outside: np.ndarray) -> np.ndarray:
+        """Edge avoidance force for every bee, in the space it is moving in.
+
+        Args:
+            outside: (N,) mask of bees that are outside their hive
+
+        Returns:
+            np.ndarray: (N, 2) steering forces
+        """
+        n = self.count
+        points = self.local_positions(outside)
+        max_bound = np.where(outside, MAP_SIZE, HIVE_INTERIOR_SIZE)[:, None]
+        margin = AVOID_EDGE_MARGIN
+
+        force = np.zeros((n, 2))
+        low = points <= margin
+        high = ~low & (points >= max_bound - margin)
+        force[low] = AVOID_EDGE_STRENGTH * (margin - points[low])
+        force[high] = -AVOID_EDGE_STRENGTH * (margin - (max_bound - points)[high])
+        return force
+
+    def flocking_forces(self, rows: np.ndarray, outside: np.ndarray, grid: SpatialHash) -> np.ndarray:
+        """Boids flocking force for many bees at once.
+
+        The three rules of boids: separation (avoid other bees), alignment
+        (match the heading of the flock) and cohesion (head for the centre of
+        the flock). Every (bee, neighbour) pair within the detection radius is
+        found through the spatial hash, then all three rules are accumulated
+        from that single set of pairs.
+
+        Args:
+            rows: Rows of the bees to calculate forces for
+            outside: (N,) mask of bees that are outside their hive
+            grid: Spatial hash built from local_positions(outside), grouped by hive and location
+
+        Returns:
+            np.ndarray: (len(rows), 2) flocking forces
+        """
+        n = self.count
+        m = len(rows)
+        points = self.local_positions(outside)
+        velocity = self.velocity[:n]
+        groups = self.hive[:n] * 2 + outside
+
+        query, candidate = grid.query_pairs(points[rows], groups[rows])
+        diff = points[candidate] - points[rows][query]
+        dist = np.hypot(diff[:, 0], diff[:, 1])
+        near = (0 < dist) & (dist <= CREATURE_DETECTION_RADIUS)
+        query, candidate, diff, dist = query[near], candidate[near], diff[near], dist[near]
+
+        def total(weights):
+            # bincount gives ints rather than floats when there are no pairs at all
+            return np.bincount(query, weights=weights, minlength=m).astype(float, copy=False)
+
+        counter = np.bincount(query, minlength=m)
+        speed = np.hypot(velocity[rows, 0], velocity[rows, 1])
+        has_flock = counter > 0
+        force = np.zeros((m, 2))
+
+        # separation, bees only ever separate inside the hive, outside they keep their tight flocks
+        close = (dist <= CREATURE_SEPARATION_THRESHOLD) & ~outside[rows][query]
+        inv_sq = np.where(close, 1 / dist**2, 0)
+        separation = np.column_stack((total(diff[:, 0] * inv_sq), total(diff[:, 1] * inv_sq)))
+        force -= separation * (speed * 2.5 * 2)[:, None]
+
+        # alignment: steer towards the average heading of the flock
+        heading = np.column_stack((total(velocity[candidate, 0]), total(velocity[candidate, 1])))
+        force += self._scaled_directions(heading, has_flock, speed * 0.5)
+
+        # cohesion: steer towards the centre of mass of the flock
+        com = np.column_stack((total(points[candidate, 0]), total(points[candidate, 1])))
+        com[has_flock] /= counter[has_flock, None]
+        force += self._scaled_directions(com - points[rows], has_flock, speed)
+
+        return force * 1.2
+
+    @staticmethod
+    def _scaled_directions(vectors: np.ndarray, mask: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Normalise the masked, non-zero vectors to the given lengths and zero the rest."""
+        norm = np.hypot(vectors[:, 0], vectors[:, 1])
+        valid = mask & (norm > 0)
+        result = np.zeros_like(vectors)
+        result[valid] = vectors[valid] / norm[valid, None] * lengths[valid, None]
+        return result
+
+    def integrate(self, steering: np.ndarray, outside: np.ndarray, frames: int, rng: np.random.Generator) -> None:
+        """Apply one tick of movement physics to the whole population.
+
+        Applies the steering force, adds a random heading change, limits the
+        speed, moves each bee in its own space and decays energy once per
+        second for everyone except queens.
+
+        Args:
+            steering: (N, 2) steering forces for this tick
+            outside: (N,) mask of bees that are outside their hive
+            frames: Current simulation frame
+            rng: Random generator for the heading changes
+        """
+        n = self.count
+        acceleration = self.acceleration[:n]
+        velocity = self.velocity[:n]
+
+        acceleration += steering / 15
+        velocity += acceleration
+        acceleration[:] = 0 # reset acceleration
+
+        # random steering: rotate by up to 15 degrees either way
+        angle = np.radians((rng.random(n) - 0.5) * 30)
+        cos, sin = np.cos(angle), np.sin(angle)
+        vx = velocity[:, 0].copy()
+        velocity[:, 0] = vx * cos - velocity[:, 1] * sin
+        velocity[:, 1] = vx * sin + velocity[:, 1] * cos
+
+        speed = np.hypot(velocity[:, 0], velocity[:, 1])
+        scale = np.ones(n)
+        too_fast = speed >= CREATURE_MAX_VELOCITY
+        too_slow = (0 < speed) & (speed <= CREATURE_MIN_VELOCITY)
+        scale[too_fast] = CREATURE_MAX_VELOCITY / speed[too_fast]
+        scale[too_slow] = CREATURE_MIN_VELOCITY / speed[too_slow]
+        velocity *= scale[:, None]
+
+        self.pos[:n][outside] += velocity[outside]
+        self.hive_pos[:n][~outside] += velocity[~outside]
+
+        if frames % FPS == 0: # queens dont die!
+            self.energy[:n][self.role[:n] != BEE_ROLES.index("queen")] -= CREATURE_ENERGY_DECAY_RATE
+
 class Creature():
     def __init__(self, x, y, hive, manager, role):
         """initialises the properties of the creature :DDD"""
+        # all the per-tick physics state lives in a row of the simulation's BeeStore
+        self.manager = manager
+        self.store = manager.bees
+        self.idx = self.store.add(self)
+
         self.role = role
 
         self.pos = pygame.Vector2(x, y) #change pos later 
@@ -977,6 +3177,7 @@ class Creature():
         self.angle = 0
 
         self.hive = hive
+        self.store.hive[self.idx] = hive.index
 
         self.hive_pos = (pygame.Vector2(random.randint(0,40), random.randint(0,40))) # to see if the function works. (it does!)
 
@@ -987,7 +3188,6 @@ class Creature():
         # self.acceleration = pygame.Vector2((random.random()-0.5)/100,(random.random()-0.5)/100)
         self.velocity = pygame.math.Vector2.rotate(pygame.Vector2(0.9, 0.9), random.randint(-360, 360))
 
-        self.speed = pygame.math.Vector2.magnitude(self.velocity)
         # self.velocity = pygame.Vector2(0,0)
 
         self.colour = (random.randint(170,255), random.randint(170,255), random.randint(0,50))
@@ -998,29 +3198,118 @@ class Creature():
 
         self.eggs = 100 # all start off with 0 eggs, only queen bees are able to "produce" eggs
 
-        self.size_raw = self.energy/500
-
-        if self.role == 'worker':
-            self.size_scaled = self.size_raw * manager.scaled
         if self.role == 'queen':
-            self.size_scaled = self.size_raw * manager.scaled + 6
             self.seeking_honey = False
-        else:
-            self.size_scaled = self.size_raw * manager.scaled
 
-        self.radius = (self.size_scaled+2)
-
-        self.selectedframe = random.randint(0, 5) # this is used to give the bee a random frame of the 5 frames, to ensure that the bee has a different, more random cycle. 
+        self.store.selectedframe[self.idx] = random.randint(0, 5) # this is used to give the bee a random frame of the 5 frames, to ensure that the bee has a different, more random cycle. 
 
         # self.image_file = pygame.image.load('bee.png') # this is not used but it doesnt affect the rest of the code so its still here. why not
 
         # im not entirely sure if this actually does anything
 
-    def update(self, manager):
-        self.avoidedge() # clamps position to borders, does not avoid (diff function)
-        # for some reason i decided to change the avoidedge to a new function but i cbb changing every instance
-        # this is called after i changed this to position clamp. (so saurry)
+    # the properties below are views onto this bee's row in the BeeStore, for drawing and the UI.
+    # vectors are returned as copies, so assign them back rather than mutating in place.
+    # the per-tick methods (update, seekFlowers, dohoneythings...) read and write the store directly instead
+
+    @property
+    def pos(self):
+        x, y = self.store.pos[self.idx].tolist()
+        return pygame.Vector2(x, y)
+
+    @pos.setter
+    def pos(self, value):
+        self.store.pos[self.idx] = (value[0], value[1])
+
+    @property
+    def hive_pos(self):
+        x, y = self.store.hive_pos[self.idx].tolist()
+        return pygame.Vector2(x, y)
+
+    @hive_pos.setter
+    def hive_pos(self, value):
+        self.store.hive_pos[self.idx] = (value[0], value[1])
+
+    @property
+    def velocity(self):
+        x, y = self.store.velocity[self.idx].tolist()
+        return pygame.Vector2(x, y)
+
+    @velocity.setter
+    def velocity(self, value):
+        self.store.velocity[self.idx] = (value[0], value[1])
+
+    @property
+    def acceleration(self):
+        x, y = self.store.acceleration[self.idx].tolist()
+        return pygame.Vector2(x, y)
+
+    @acceleration.setter
+    def acceleration(self, value):
+        self.store.acceleration[self.idx] = (value[0], value[1])
+
+    @property
+    def energy(self):
+        return float(self.store.energy[self.idx])
+
+    @energy.setter
+    def energy(self, value):
+        self.store.energy[self.idx] = value
+
+    @property
+    def honey(self):
+        return float(self.store.honey[self.idx])
+
+    @honey.setter
+    def honey(self, value):
+        self.store.honey[self.idx] = value
+
+    @property
+    def role(self):
+        return BEE_ROLES[int(self.store.role[self.idx])]
+
+    @role.setter
+    def role(self, value):
+        self.store.role[self.idx] = BEE_ROLES.index(value)
+
+    @property
+    def outside(self):
+        """True if the bee is outside its hive."""
+        return bool(self.store.outside[self.idx])
+
+    @outside.setter
+    def outside(self, value):
+        self.store.outside[self.idx] = value
+
+    @property
+    def speed(self):
+        vx, vy = self.store.velocity[self.idx].tolist()
+        return math.hypot(vx, vy)
+
+    @property
+    def size_scaled(self):
+        size_raw = self.energy/500
+        if self.role == 'queen':
+            return size_raw * self.manager.scaled + 6
+        return size_raw * self.manager.scaled
+
+    @property
+    def radius(self):
+        return (self.size_scaled+2)
+
+    def update(self, manager, is_outside):
+        """Work out the behavioural steering force of this bee for the current tick.
+
+        Position clamping, edge avoidance, integration and energy decay are
+        applied to the whole population by the BeeStore, so only behaviour
+        that still needs per-bee logic is handled here.
 
+        Args:
+            manager: Simulation manager instance
+            is_outside: True if the bee was outside its hive at the start of the tick
+
+        Returns:
+            pygame.Vector2: Steering force to apply this tick
+        """
         """This (below) is unsed a_star_pathfind code. It doesnt effect physics or the simulation at all and purely visual. 
         It looks nice (and interesting!), but I have found little reason to use it on top of the bee's already complex behaviour. 
         This pathfinding *could* circumvent a very rare issue (that is the bee getting stuck between two rocks), 
@@ -1037,12 +3326,12 @@ class Creature():
         #
         #     self.a_star_pathfind(manager, self.hive.pos, random_pos)
 
-        is_worker = self.role == "worker" # boolean true if worker 
-        is_outside = self in self.hive.bees_outside # boolean true if outside
+        role = BEE_ROLES[self.store.role[self.idx]]
+        is_worker = role == "worker" # boolean true if worker 
 
         steering = pygame.Vector2(0,0)
 
-        if self.role == "queen":
+        if role == "queen":
             if manager.frames % 60 == 0:
                 self.eggs += 1
 
@@ -1050,95 +3339,38 @@ class Creature():
         if is_worker: # if bee is worker
             self.whatamidoing() # checks if needs to search for honey 
 
+        # flocking, rock and water avoidance forces are calculated for the whole population in Simulation.update_bees
         if is_outside: # if bee is outside
-            # calculate forces every 5 frames. this saves computational oad
-            if manager.frames % 5 == self.selectedframe: # selected frame makes sure that bees calculate forces at different frames
-                steering += self.calculateForces(self.hive.bees_outside, self.pos, manager) # calculates all the forces to do/adds
-
-            steering += self.calculate_avoid_edge_force(self.pos, 0, MAP_SIZE, 1) * 100
-            steering += self.avoidrock(self.pos, manager)
-            
             if is_worker:
-                self.seekFlowers(manager.flowers)
-
-            steering += self.avoidwater(manager.background.maparr) * 0.8
+                self.seekFlowers(manager)
         elif not is_outside: # inside considered
-            steering += self.calculate_avoid_edge_force(self.hive_pos, 0, 40, 1) * 100
-
-            if self in self.hive.bees_inside:
-                steering += self.calculateForces(self.hive.bees_inside, (self.hive_pos), None)
+            if self.seeking_honey == False or role == 'queen':
+                steering += self.dohoneythings() * 2.5 # function to fill up the honey
 
-                if self.seeking_honey == False or self.role == 'queen':
-                    steering += self.dohoneythings() * 2.5 # function to fill up the honey
-
-        if self.role == "drone":
+        if role == "drone":
             print("hullo i am a drone", is_outside, self.pos)
 
+        return steering
 
-        self.applyForce(steering)
-        self.velocity += self.acceleration
-        self.acceleration *= 0 # reset acceleration
-
-        
-        fac = 30 # angle factor
-        rotate = (random.random() - 0.5)*fac # random steering force
-
-        self.velocity = pygame.math.Vector2.rotate(self.velocity, rotate)
-        
-        self.speed = pygame.math.Vector2.magnitude(self.velocity)
-
-        if self.speed >= CREATURE_MAX_VELOCITY:
-            self.velocity = pygame.math.Vector2.normalize(self.velocity) * CREATURE_MAX_VELOCITY
-        if 0 < self.speed <= CREATURE_MIN_VELOCITY:
-            self.velocity = pygame.math.Vector2.normalize(self.velocity) * CREATURE_MIN_VELOCITY
-        self.speed = pygame.math.Vector2.magnitude(self.velocity)
-
-        if is_outside:
-            self.pos += self.velocity
-        else:
-            self.hive_pos += self.velocity
-        
-        self.selected = (manager.selected_bee == self)
-
-        if manager.frames % FPS == 0 and self.role != "queen":  # queens dont die!
-            self.energy = self.energy - CREATURE_ENERGY_DECAY_RATE
-            # print(self.energy)
-
-        if self.energy <= 0:
-            # print("creature ran out of energy :(")
-            self.closestflower.n_bees -= 1
-            if is_outside:
-                self.hive.bees_outside.remove(self)
-            else:
-                self.hive.bees_inside.remove(self)
-            manager.remove(self)
-
-        self.size_raw = self.energy/500
-
-        if self.role == 'worker':
-            self.size_scaled = self.size_raw * manager.scaled
-        if self.role == 'queen':
-            self.size_scaled = self.size_raw * manager.scaled + 6
-        else:
-            self.size_scaled = self.size_raw * manager.scaled
-
-        self.radius = (self.size_scaled+2)
-
-        self.screen_pos = gridpos2screen(self.pos, manager.camera_offset)
-        # despite its name real pos is actually the pos of the character on the monitor so real is all relative xdxd
-
-        if is_outside:
-            self.draw(manager.scaled)
+    def die(self, manager):
+        """Remove a bee that has run out of energy from its hive and the simulation."""
+        # print("creature ran out of energy :(")
+        if self.closestflower:
+            manager.flower_index.remove_visitor(self.closestflower)
+        self.hive.remove_bee(self)
+        manager.remove(self)
 
     def applyForce(self, force):
         # print(force)
-        self.acceleration += force / 15
+        acceleration = self.store.acceleration
+        acceleration[self.idx, 0] += force.x / 15
+        acceleration[self.idx, 1] += force.y / 15
 
     def whatamidoing(self):
         """Checks to see if the bee has enough honey"""
         self.min_honey = 80 # Min Honey
 
-        if self.honey >= self.min_honey: # If more than min
+        if self.store.honey[self.idx] >= self.min_honey: # If more than min
             self.seeking_honey = False # No longer seeking!
 
     def a_star_pathfind(self, manager, in_pos, target_pos):
@@ -1183,8 +3415,10 @@ class Creature():
                     path.append(curr.position)
                     curr = curr.parent
 
-                for path_block in path:
-                    manager.background.map_col[int(path_block.x), int(path_block.y)] = self.colour
+                if manager.background.map_col is not None: # a chunked world has no colour map to paint on
+                    for path_block in path:
+                        manager.background.map_col[int(path_block.x), int(path_block.y)] = self.colour
+                    manager.background.world_surface_dirty = True
 
 
                 # print(path[::-1]) # return path but reversed
@@ -1207,7 +3441,7 @@ class Creature():
                     if manager.background.maparr[int(node_pos.x), int(node_pos.y)] >= BG_WATER_THRESHOLD:
                         continue
 
-                    if manager.obstaclemap[int(node_pos.x), int(node_pos.y)] == 1:
+                    if (int(node_pos.x), int(node_pos.y)) in manager.obstaclemap:
                         continue
 
                     child_node = Node(current_node, node_pos)
@@ -1251,47 +3485,53 @@ class Creature():
 
 
 
-    def seekFlowers(self, flowers):
+    def seekFlowers(self, manager):
         # 1. find closest flower
         # 2. if closest flower is arbitrarily ""close"" -> go to it
         # 3. if closest flower is ""far"" -> oh well! time to ''wander''
         # this code essentially does step (1)
 
-        for flower in flowers:
-            if not self.closestflower:
-                self.closestflower = flower # sets the flower if it does not exist
-                self.closestflower.n_bees += 1
-            if distance(flower.pos, self.pos) < distance(self.pos, self.closestflower.pos) and flower.n_bees <= 25:
-                # print(distance(flower.pos,self.pos))
-                self.closestflower.n_bees -= 1
-                self.closestflower = flower
-                self.closestflower.n_bees += 1
-                # print("CLOSEST FLOWER DETECTED!!", flower.pos)
+        flower_index = manager.flower_index
+        store = self.store
+        row = self.idx
+        pos = pygame.Vector2(store.pos[row].tolist()) # read once, the position does not change this tick
+        if not self.closestflower:
+            self.closestflower = manager.flowers[0] # sets the flower if it does not exist
+            flower_index.add_visitor(self.closestflower)
+
+        flower = flower_index.nearest(pos) # nearest flower with room for more bees
+        if flower is not None and distance(flower.pos, pos) < distance(pos, self.closestflower.pos):
+            # print(distance(flower.pos,self.pos))
+            flower_index.remove_visitor(self.closestflower)
+            self.closestflower = flower
+            flower_index.add_visitor(self.closestflower)
+            # print("CLOSEST FLOWER DETECTED!!", flower.pos)
         
         if self.seeking_honey == True:
-            self.goFlower()
-            if distance(self.pos, self.closestflower.pos) <= CREATURE_DETECTION_RADIUS/4:
-                self.honey += 0.5
+            self.goFlower(pos)
+            if distance(pos, self.closestflower.pos) <= CREATURE_DETECTION_RADIUS/4:
+                store.honey[row] += 0.5
                 self.total_honey += 0.5
                 # self.closestflower.pollen -= 0.5 pollen does not introduce the behavi
-                self.energy = min(self.energy + 0.5, CREATURE_INITIAL_ENERGY) # Replenish energy
+                store.energy[row] = min(store.energy[row] + 0.5, CREATURE_INITIAL_ENERGY) # Replenish energy
         elif self.seeking_honey == False: # If it is no longer seeking honey.
-            self.goHive()
+            self.goHive(pos)
     
-    def goFlower(self):
+    def goFlower(self, pos):
         # get vector from closest flower and itself
         # im not sure why but the current implementation the bees are circling the flowers
-        if distance(self.pos, self.closestflower.pos) <= CREATURE_DETECTION_RADIUS*3: 
-            diffVec = + self.closestflower.pos - self.pos
+        flower_pos = self.closestflower.pos
+        if distance(pos, flower_pos) <= CREATURE_DETECTION_RADIUS*3: 
+            diffVec = + flower_pos - pos
             # normalise it, multiply by speed, and multplied by distance from flower
-            outputVec = pygame.math.Vector2(diffVec) * self.speed * distance(self.closestflower.pos, self.pos)
+            outputVec = pygame.math.Vector2(diffVec) * self.speed * distance(flower_pos, pos)
 
             self.applyForce(outputVec)
 
-    def goHive(self):
+    def goHive(self, pos):
         hive_pos = self.hive.pos
 
-        diffVec = hive_pos - self.pos
+        diffVec = hive_pos - pos
         # print((pygame.math.Vector2.magnitude(diffVec)))
 
         if (pygame.math.Vector2.magnitude(diffVec) <= 4):
@@ -1303,153 +3543,15 @@ class Creature():
             self.applyForce(force_applied)
 
     def enter_hive(self):
-        self.hive.bees_inside.append(self)
-        self.hive.bees_outside.remove(self)
-        # known error   File "/Users/thomas/Desktop/Code/School/Assignments/Assessment/main.py", line 686, in enter_hive
-        # self.hive.bees_outside.remove(self)
+        # the move is guarded by the bee's location, which fixes the old
         # ValueError: list.remove(x): x not in list
+        self.hive.admit(self)
 
-    def calculateForces(self, bees, beepos, manager):
-        """This Function Calculates the basic movement of the bees following the rules of boids"""
-        # behaviours of bees: 
-        # 1. flocking: boid behaviour with their 3 rules: 1. avoid other bees, 2. same speed as other bees, tend towards the centre of a flock
-        # 2. go to flowers
-        # 3. random deviations in movement
-        return (self.separation(bees, beepos) * 2 + self.align(bees, beepos) + self.cohesion(bees, beepos)) * 1.2
-
-    def avoidrock(self, beepos, manager):
-        # 1. logic to steer away from rock
-        force = pygame.Vector2(0,0)
-        if manager:
-            for rock in manager.obstacles:
-                closest_point = rock.get_closest_point(beepos)
-                diff = beepos - closest_point
-                diff_mag = pygame.math.Vector2.magnitude(diff)
-
-                if (0 < diff_mag < CREATURE_SEPARATION_THRESHOLD):
-                    force += pygame.math.Vector2.normalize(diff) * (CREATURE_SEPARATION_THRESHOLD-diff_mag)/(CREATURE_SEPARATION_THRESHOLD)
-
-
-        return force
-
-    def avoidwater(self, maparr):
-        force = pygame.Vector2(0,0)
-
-        # print(maparr)
-        if self.speed == 0 or maparr.all == None:
-            return force
-        
-        direction = pygame.math.Vector2.normalize(self.velocity)
-        look_pos = pygame.Vector2(0)
-        look_pos.x = max(0, min(self.pos.x + direction.x, MAP_SIZE - 1))
-        look_pos.y = max(0, min(self.pos.y + direction.y, MAP_SIZE - 1))
-        # print(self.pos, look_pos)
-
-        if (maparr[int(look_pos.x)][int(look_pos.y)]) >= BG_WATER_THRESHOLD:
-            force -= direction
-
-        return force
-
-    
-    def calculate_avoid_edge_force(self, beepos, min_bound, max_bound, strength_multiplier):
-        force = pygame.Vector2(0,0)
-        
-        margin = AVOID_EDGE_MARGIN 
-        base_strength = AVOID_EDGE_STRENGTH * strength_multiplier # Allow dynamic strength
-
-        if beepos.x <= min_bound+margin:
-            force.x += base_strength * (margin - (beepos.x-min_bound))
-        elif beepos.x >= max_bound-margin:
-            force.x -= base_strength * (margin - (max_bound - beepos.x))
-
-
-        if beepos.y <= min_bound+margin:
-            force.y+=base_strength * (margin - (beepos.y-min_bound))
-
-        elif beepos.y >= max_bound - margin:
-            force.y-=base_strength * (margin - (max_bound - beepos.y))
-
-        return force
-
-    def avoidedge(self):
-        """Despite saying avoid, in reality it clamps the bees position
-        The real avoid function occurs later."""
-        if self in self.hive.bees_outside: # Checks if it is outside
-            self.pos.x = max(0, min(self.pos.x, MAP_SIZE - 0.01)) # Clamps from 0-MAP_SIZE range for array indexing
-            self.pos.y = max(0, min(self.pos.y, MAP_SIZE - 0.01)) # Same thing here
-        else: # Else, (basically if inside)
-            self.hive_pos.x = max(0, min(self.hive_pos.x, 39.99)) # Clamps 0-40
-            self.hive_pos.y = max(0, min(self.hive_pos.y, 39.99)) # same thing
-
-        # note to self: add bottom left right border  too! future note: done!
-
-    def separation(self, bees, beepos):
-        sepForce = pygame.Vector2(0,0)
-
-        for bee in bees: 
-            if beepos == self.hive_pos:
-                detectpos = bee.hive_pos
-            else: detectpos = beepos
-
-            dist = distance(detectpos, beepos)
-
-            if dist <= CREATURE_DETECTION_RADIUS and detectpos != beepos:
-                diffVec = detectpos - beepos
-                if abs(dist) <= CREATURE_SEPARATION_THRESHOLD:
-                    nomVec = pygame.Vector2.normalize(diffVec)
-                    sepForce += nomVec/dist * self.speed * 2.5
-
-        return(-sepForce)        
-
-
-    # aligns the boid/bee to the average direction of its nearest "flock"
-    def align(self, bees, beepos):
-        avgV = pygame.Vector2(0,0)
-        counter = 0
-
-        for bee in bees: 
-            if beepos == self.hive_pos:
-                detectpos = bee.hive_pos
-            else: detectpos = bee.pos
-
-            dist = distance(detectpos, beepos)
-            if 0 < dist <= CREATURE_DETECTION_RADIUS and detectpos != beepos:
-                avgV += bee.velocity
-                counter += 1
-
-        if counter != 0 and pygame.Vector2.magnitude(avgV) != 0:
-            alignV = avgV/counter
-            alignD = pygame.Vector2.normalize(alignV) * self.speed * 0.5
-            return(alignD)
-        
-        return (avgV)
-
-    # aims the bee towards to centre of the ""flock""
-    def cohesion(self, bees, beepos):
-        com = pygame.Vector2(0,0) # centre of mass
-        counter = 0
-        for bee in bees:
-            if beepos == self.hive_pos:
-                detectpos = bee.hive_pos
-            else: detectpos = bee.pos
-
-            dist = distance(detectpos, beepos)
-            if 0 < dist <= CREATURE_DETECTION_RADIUS and detectpos != beepos:
-                counter += 1
-                com += detectpos
-
-        if counter != 0 and com != beepos:
-            com /= counter
-            diff = com - beepos
-
-            if pygame.math.Vector2.magnitude(diff) == 0:
-                return (com)
+    def draw(self, camera_offset, scaled):
+        self.screen_pos = gridpos2screen(self.pos, camera_offset)
+        # despite its name real pos is actually the pos of the character on the monitor so real is all relative xdxd
+        self.selected = (sim.selected_bee == self)
 
-            dir = pygame.Vector2.normalize(diff) * self.speed
-            return(dir)
-        return (com)
-        
-    def draw(self, scaled):
         pygame.draw.circle(screen, self.colour, self.screen_pos, (self.size_scaled+3)) 
         if self.selected == True:
             pygame.draw.circle(screen, CREATURE_HOVER_COLOUR, self.screen_pos, (self.size_scaled+4), 2) 
@@ -1457,42 +3559,55 @@ class Creature():
             pygame.draw.circle(screen, (255,0,0), self.screen_pos, self.size_scaled+CREATURE_SEPARATION_THRESHOLD*scaled, 2)
 
     def dohoneythings(self):
-        i = 0
-        j = 0
+        """Fill or lay eggs in the comb cells within reach, and steer towards the next cell to use.
 
-        diff = pygame.Vector2(0,0)
+        Workers put honey into every cell within COMB_RADIUS that holds 0 to
+        100 honey, and head for the last such cell in the comb. Queens lay an
+        egg in every empty (-1) cell within reach and head for the last empty
+        cell. Only the cells next to the bee are looked at for filling, see
+        comb_cells_near, and the cell to head for is one query over the comb.
+
+        Returns:
+            pygame.Vector2: Steering force towards the target cell
+        """
         nomForce = pygame.Vector2(0,0)
+        store = self.store
+        row = self.idx
+        role = BEE_ROLES[store.role[row]]
 
         # check honey status
-        if self.honey <= 0 and self.role == 'worker':
+        if store.honey[row] <= 0 and role == 'worker':
             # print("im removing myself (from hive)")
             self.seeking_honey = True
-            self.hive.bees_outside.append(self)
-            self.hive.bees_inside.remove(self)
-
-        comb_pos = None
-        for comb_honey in self.hive.combs_honey:
-            for comb_honey_actual in comb_honey:
-                comb_pos = pygame.math.Vector2(self.hive.combs[i][0], self.hive.combs[i][1])
-                lowest_egg = -1
-                if self.role == 'worker':
-                    if 0 <= comb_honey_actual <= 100:
-                        diff = comb_pos - self.hive_pos
-                        if pygame.math.Vector2.magnitude(diff) <= 1 and self.honey >= 0:
-                            self.honey = max(self.honey - 0.1, 0)
-                            self.hive.combs_honey[j, i%COMB_WIDTH] += 0.1
-                            self.energy = min(self.energy + 0.5, CREATURE_INITIAL_ENERGY) # Replenish energy
-                elif self.role == 'queen':
-                    if lowest_egg <= comb_honey_actual <= -1:
-                        lowest_egg = comb_honey_actual
-                        diff = comb_pos - self.hive_pos
-                        if pygame.math.Vector2.magnitude(diff) <= 1 and self.eggs > 0:
-                            self.eggs -= 1
-                            self.hive.combs_honey[j, i%COMB_WIDTH] -= 1
-                i+=1
-            j+=1
+            self.hive.release(self)
 
-        if comb_pos:
+        if role != 'worker' and role != 'queen':
+            return nomForce
+        hive_pos = pygame.Vector2(store.hive_pos[row].tolist())
+        cells = self.hive.combs_honey.reshape(-1) # flat view, in the same order as COMB_CENTRES
+
+        # chosen before any cell is filled, so filling cannot change the target
+        if role == 'worker':
+            targets = np.flatnonzero((cells >= 0) & (cells <= 100))
+        else:
+            targets = np.flatnonzero(cells == -1)
+
+        for cell in comb_cells_near(hive_pos.x, hive_pos.y):
+            comb_honey_actual = cells[cell]
+            diff = pygame.Vector2(COMB_CENTRES[cell].tolist()) - hive_pos
+            if pygame.math.Vector2.magnitude(diff) > COMB_RADIUS:
+                continue
+            if role == 'worker':
+                if 0 <= comb_honey_actual <= 100 and store.honey[row] >= 0:
+                    store.honey[row] = max(store.honey[row] - 0.1, 0)
+                    cells[cell] += 0.1
+                    store.energy[row] = min(store.energy[row] + 0.5, CREATURE_INITIAL_ENERGY) # Replenish energy
+            elif comb_honey_actual == -1 and self.eggs > 0:
+                self.eggs -= 1
+                cells[cell] -= 1
+
+        if targets.size:
+            diff = pygame.Vector2(COMB_CENTRES[targets[-1]].tolist()) - hive_pos
             if pygame.math.Vector2.magnitude(diff) != 0:
                 nomForce = pygame.math.Vector2.normalize(diff) * self.speed
         return (nomForce)
@@ -1514,16 +3629,59 @@ parser.add_argument('-s', '--seed', type=int, help='random seed for terrain and
 parser.add_argument('-b', '--batch', action='store_true', help='Run in batch mode. Requires -f and -p.')
 parser.add_argument('-f', '--mapfile', type=str, help='Path to the map data file (e.g., map1.csv) for batch mode.')
 parser.add_argument('-p', '--paramfile', type=str, help='Path to the parameter file (e.g., para1.csv) for batch mode.')
+parser.add_argument('-w', '--chunked-world', action='store_true', help='Generate the terrain lazily in chunks as it is needed, for very large MAP_SIZE. Ignored when a map file is loaded.')
+parser.add_argument('-c', '--convert-map', type=str, metavar='OUTPUT', help='Convert the CSV map given by --mapfile (-f) to a binary map file and exit. Terrain thresholds come from --paramfile (-p) if given.')
+parser.add_argument('-x', '--speed', type=int, default=1, help='Simulation ticks per rendered frame to start the interactive mode with (default=1). The 1, 2 and 3 keys switch between ' + '/'.join(f'{speed}x' for speed in SIM_SPEEDS) + '.')
+parser.add_argument('--hive-lod', action='store_true', help='Run the interiors of hives that are not selected on a cheap aggregate model instead of bee by bee.')
+parser.add_argument('--json', action='store_true', help='Print the batch mode summary as a single line of JSON.')
+parser.add_argument('--snapshot-every', type=int, default=0, metavar='TICKS', help='Save a snapshot of the simulation every TICKS ticks (default=never).')
+parser.add_argument('--snapshot-dir', type=str, default='snapshots', help='Directory snapshots are saved to (default=snapshots).')
+parser.add_argument('--replay', type=str, metavar='SNAPSHOT', help='Start from a saved snapshot instead of tick 0. Use the same map, parameters and seed as the run that saved it.')
+parser.add_argument('--checkpoint-every', type=int, default=0, metavar='TICKS', help='Batch mode: save a checkpoint every TICKS ticks (default=never).')
+parser.add_argument('--checkpoint-dir', type=str, default='checkpoints', help='Batch mode: directory checkpoints are saved to and resumed from (default=checkpoints).')
+parser.add_argument('--checkpoint-keep', type=int, default=CHECKPOINT_KEEP, help=f'Batch mode: number of most recent checkpoints to keep (default={CHECKPOINT_KEEP}).')
+parser.add_argument('--resume', action='store_true', help='Batch mode: continue from the latest checkpoint in --checkpoint-dir. Use the same map, parameters and seed as the interrupted run.')
+parser.add_argument('--profile-out', type=str, metavar='FILE', help=f'Write the time spent in each phase of the last {PROFILER_HISTORY_FRAMES} frames (ticks in batch mode) to FILE every {PROFILER_EXPORT_INTERVAL} frames, as CSV if FILE ends in .csv and JSON otherwise.')
+parser.add_argument('-t', '--ticks', type=int, help=f'Tick to stop at in batch mode, counted from the start of the run even when replaying a snapshot (default={BATCH_DEFAULT_TICKS}).')
 
 args = parser.parse_args()
 
+if args.resume and args.replay:
+    print("Error: --resume and --replay cannot be used together.")
+    sys.exit(1)
+
+# checkpoints are only written and resumed by run_batch
+checkpoint_flags = [flag for flag, used in (
+    ("--resume", args.resume),
+    ("--checkpoint-every", args.checkpoint_every),
+    ("--checkpoint-dir", args.checkpoint_dir != parser.get_default("checkpoint_dir")),
+    ("--checkpoint-keep", args.checkpoint_keep != parser.get_default("checkpoint_keep"))) if used]
+if checkpoint_flags and not args.batch:
+    print(f"Error: {', '.join(checkpoint_flags)} can only be used in batch mode (-b).")
+    sys.exit(1)
+
+if args.convert_map:
+    if not args.mapfile:
+        print("Error: --convert-map requires the CSV map to be given with --mapfile (-f).")
+        sys.exit(1)
+    convert_params = load_parameters_from_file(args.paramfile) if args.paramfile else {}
+    try:
+        convert_csv_map(args.mapfile, args.convert_map,
+                        convert_params.get('BG_WATER_THRESHOLD', BG_WATER_THRESHOLD),
+                        convert_params.get('BG_SAND_THRESHOLD', BG_SAND_THRESHOLD))
+    except (OSError, ValueError) as e:
+        print(f"Error converting map file {args.mapfile}: {e}")
+        sys.exit(1)
+    print(f"Converted {args.mapfile} to {args.convert_map}")
+    sys.exit(0)
+
 # Set random seed
 seed = None
 param_file_path = None # Define to ensure it's available in all branches
 
 if args.batch:
-    if not args.mapfile or not args.paramfile:
-        print("Error: Batch mode requires both --mapfile (-f) and --paramfile (-p) to be specified.")
+    if not args.paramfile or not (args.mapfile or args.chunked_world):
+        print("Error: Batch mode requires both --mapfile (-f) and --paramfile (-p) to be specified, or --paramfile (-p) with --chunked-world (-w).")
         sys.exit(1)
     print("Running in batch mode.")
     param_file_path = args.paramfile
@@ -1535,16 +3693,23 @@ if args.batch:
     H_INITIAL_WORKERS = loaded_params.get('H_INITIAL_WORKERS', H_INITIAL_WORKERS)
     CREATURE_INITIAL_ENERGY = loaded_params.get('CREATURE_INITIAL_ENERGY', CREATURE_INITIAL_ENERGY)
     H_BEE_COOLDOWN = loaded_params.get('H_BEE_COOLDOWN', H_BEE_COOLDOWN)
+    H_HATCH_BATCH = loaded_params.get('H_HATCH_BATCH', H_HATCH_BATCH)
     N_OBSTACLES = loaded_params.get('N_OBSTACLES', N_OBSTACLES)
     MAP_SIZE = loaded_params.get('MAP_SIZE', MAP_SIZE) # Ensure MAP_SIZE is updated before Environment creation
     FPS = loaded_params.get('FPS', FPS)
     # Add other parameters as needed, e.g., for Environment or Creature
     BG_NOISE_OCTAVES = loaded_params.get('BG_NOISE_OCTAVES', BG_NOISE_OCTAVES)
     BG_NOISE_SCALE = loaded_params.get('BG_NOISE_SCALE', BG_NOISE_SCALE)
+    # Binary maps carry their own size and thresholds, the parameter file still wins for the thresholds
+    map_header = read_map_header(args.mapfile) if args.mapfile else None
+    if map_header is not None:
+        MAP_SIZE = int(map_header["width"])
+        BG_WATER_THRESHOLD = float(map_header["water_threshold"])
+        BG_SAND_THRESHOLD = float(map_header["sand_threshold"])
     BG_WATER_THRESHOLD = loaded_params.get('BG_WATER_THRESHOLD', BG_WATER_THRESHOLD)
     BG_SAND_THRESHOLD = loaded_params.get('BG_SAND_THRESHOLD', BG_SAND_THRESHOLD)
 
-    sim = Simulation()
+    sim = Simulation(headless=True)
     sim.update_values(H_INITIAL_WORKERS, CREATURE_INITIAL_ENERGY, H_BEE_COOLDOWN, N_OBSTACLES, 10)
 
     # Seed precedence: 1. param file, 2. command line, 3. time-based
@@ -1624,35 +3789,130 @@ else:
         seed = int(time.time())
 
 random.seed(seed)
+sim.rng = np.random.default_rng(seed)
 print(f"Using seed: {seed}")
 if param_file_path:
     print(f"Parameters loaded from: {param_file_path}")
 
-# Initialize Pygame screen and clock AFTER potential FPS change from params
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-clock = pygame.time.Clock()
-pygame.event.set_grab(True)
+if args.batch:
+    # Batch mode is headless: no window, no mouse grab and no frame cap
+    screen = None
+    clock = None
+else:
+    # Initialize Pygame screen and clock AFTER potential FPS change from params
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    clock = pygame.time.Clock()
+    pygame.event.set_grab(True)
+    screen.fill("white")
+
+sim.steps_per_frame = max(1, args.speed)
+sim.hive_lod = args.hive_lod
 
 mouse = pygame.Vector2(0,0)
 
 background_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
 background_surface.fill(BACKGROUND_FILL_COLOUR)
-screen.fill("white")
 
-background = Environment(MAP_SIZE, sim)
+# a map file replaces the terrain straight away, so only set up an empty chunked world before loading it
+background = Environment(MAP_SIZE, sim, chunked=args.chunked_world or bool(args.batch and args.mapfile))
 sim.add_background(background)
 
 if args.batch and args.mapfile:
     background.load_map_from_file(args.mapfile, MAP_SIZE)
+elif args.chunked_world:
+    background.generate_chunked_world(MAP_SIZE)
 else:
     # Procedural generation if not batch mode or mapfile not specified (though batch implies it)
     background.generate_background_texture(MAP_SIZE)
 
 sim.add_objs(background.maparr)
 
+if args.replay:
+    try:
+        sim.load_snapshot(args.replay)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Error: Could not load snapshot {args.replay}: {e}")
+        sys.exit(1)
+    print(f"Replaying from tick {sim.frames} of {args.replay}")
+
+def checkpoint_paths() -> list:
+    """Checkpoints in --checkpoint-dir, oldest first."""
+    return sorted(glob.glob(os.path.join(args.checkpoint_dir, CHECKPOINT_NAME.replace("{tick:08d}", "[0-9]" * 8))))
+
+def resume_from_checkpoint() -> None:
+    """Load the latest usable checkpoint, or carry on from tick 0 if there is none.
+
+    A checkpoint that cannot be loaded is skipped in favour of the one before it.
+    """
+    checkpoints = checkpoint_paths()
+    if not checkpoints:
+        print(f"No checkpoint found in {args.checkpoint_dir}, starting from tick 0")
+        return
+    for path in reversed(checkpoints):
+        try:
+            sim.load_snapshot(path)
+        except Exception as e:
+            print(f"Warning: Skipping checkpoint {path}: {e}")
+            continue
+        print(f"Resuming from tick {sim.frames} of {path}")
+        return
+    print(f"Error: None of the checkpoints in {args.checkpoint_dir} could be loaded.")
+    sys.exit(1)
+
+def checkpoint_if_due() -> None:
+    """Save a checkpoint if --checkpoint-every says one is due, deleting all but the newest --checkpoint-keep."""
+    if args.checkpoint_every > 0 and sim.frames % args.checkpoint_every == 0:
+        os.makedirs(args.checkpoint_dir, exist_ok=True)
+        sim.save_snapshot(os.path.join(args.checkpoint_dir, CHECKPOINT_NAME.format(tick=sim.frames)))
+        checkpoints = checkpoint_paths()
+        for path in checkpoints[:max(0, len(checkpoints) - max(1, args.checkpoint_keep))]:
+            os.remove(path)
+
+if args.batch and args.resume:
+    resume_from_checkpoint()
+
+def snapshot_if_due() -> None:
+    """Save a snapshot if --snapshot-every says one is due at the current tick."""
+    if args.snapshot_every > 0 and sim.frames % args.snapshot_every == 0:
+        os.makedirs(args.snapshot_dir, exist_ok=True)
+        sim.save_snapshot(os.path.join(args.snapshot_dir, SNAPSHOT_NAME.format(tick=sim.frames)))
+
+def profile_if_due(force: bool = False) -> None:
+    """Write the --profile-out file if it was asked for and an export is due.
+
+    Args:
+        force: Write it even if PROFILER_EXPORT_INTERVAL frames have not passed
+    """
+    timer = sim.phase_timer
+    if args.profile_out and timer.history and (force or timer.frames_recorded % PROFILER_EXPORT_INTERVAL == 0):
+        timer.export(args.profile_out)
+
 def main():
+    """Interactive loop.
+
+    The simulation runs on a fixed timestep: at 1x it advances one tick every
+    1/FPS seconds of real time, and at Nx it owes N ticks per 1/FPS seconds,
+    however fast frames are actually drawn. Owed ticks are run before each
+    frame, for at most one frame's worth of real time so input is still
+    handled promptly. If ticks are still owed after that the drawing is
+    skipped, up to SIM_MAX_FRAME_SKIP frames in a row, so the time goes to the
+    simulation instead. Ticks owed beyond that are dropped rather than
+    piling up.
+
+    Every drawn frame is profiled: the simulation phases of the ticks it ran,
+    drawing the background and the entities, the overlays, the display flip
+    and the time left waiting for the frame cap. The P key shows the mean of
+    each over the last PROFILER_HISTORY_FRAMES frames.
+    """
+    timer = sim.phase_timer
     running = True
+    tick_length = 1 / FPS # real seconds per simulation tick at 1x
+    ticks_owed = 0.0
+    frames_skipped = 0
+    ticks_run = 0 # ticks run since the last drawn frame
+    last_time = time.perf_counter()
     while running:
+        timer.start()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running=False
@@ -1667,10 +3927,33 @@ def main():
                     new_conceptual_world_size = max(512, sim.scaled*MAP_SIZE / 1.5)
                     sim.scaled = new_conceptual_world_size/MAP_SIZE
                     background.cached_scaled = -1
+                if event.key in (pygame.K_1, pygame.K_2, pygame.K_3): # Simulation speed
+                    sim.steps_per_frame = SIM_SPEEDS[event.key - pygame.K_1]
+                if event.key == pygame.K_p: # Phase profiler overlay
+                    sim.show_profiler = not sim.show_profiler
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     sim.handle_click(event.pos, sim.camera_offset)
+        timer.lap("events")
+
+        # Run the ticks owed since the last frame
+        now = time.perf_counter()
+        ticks_owed += (now - last_time) / tick_length * sim.steps_per_frame
+        ticks_owed = min(ticks_owed, sim.steps_per_frame * (SIM_MAX_FRAME_SKIP + 1))
+        last_time = now
+        while ticks_owed >= 1 and time.perf_counter() - now < tick_length:
+            sim.step()
+            snapshot_if_due()
+            ticks_owed -= 1
+            ticks_run += 1
+
+        # Falling behind, skip drawing this frame
+        if ticks_owed >= 1 and frames_skipped < SIM_MAX_FRAME_SKIP:
+            frames_skipped += 1
+            continue
+        frames_skipped = 0
         
+        timer.start()
         screen.fill(BACKGROUND_FILL_COLOUR)
         
         current_background_view = background.update_background(MAP_SIZE, sim.camera_offset, sim.scaled)
@@ -1682,15 +3965,72 @@ def main():
         # test_area = pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
         # screen.blit(background_surface, (0,0), area=test_area)
         # pygame.draw.circle(screen, "black", (30, 30), 500)
+        timer.lap("background")
 
-        sim.run()
+        sim.render()
+        if sim.show_profiler:
+            sim.draw_profiler()
+            timer.lap("profiler")
 
         pygame.display.flip()
+        timer.lap("display")
         clock.tick(FPS)
-        pygame.display.set_caption(f"simulation | {round(clock.get_fps(), 2)} fps")
+        timer.lap("idle")
+        pygame.display.set_caption(f"simulation | {round(clock.get_fps(), 2)} fps | {sim.steps_per_frame}x | tick {sim.frames}")
+        timer.end_frame(sim.frames, ticks_run)
+        ticks_run = 0
+        profile_if_due()
     
-
+    profile_if_due(force=True)
     pygame.quit()
 
+def run_batch(ticks: int) -> dict:
+    """Run the simulation headless as fast as possible up to a fixed tick.
+
+    Args:
+        ticks: Tick to stop at. A run replayed from a snapshot stops at the
+            same tick as the run that saved it
+
+    Returns:
+        dict: The simulation summary, plus timing information: the total and
+        per-phase seconds, ticks per second and, where the platform reports
+        it, the process's peak memory
+    """
+    sim.phase_timer.reset()
+    start_time = time.perf_counter()
+    start_tick = sim.frames
+    while sim.frames < ticks:
+        sim.step()
+        snapshot_if_due()
+        checkpoint_if_due()
+        if args.profile_out:
+            sim.phase_timer.end_frame(sim.frames, 1)
+            profile_if_due()
+    elapsed = time.perf_counter() - start_time
+    ticks = sim.frames - start_tick
+    profile_if_due(force=True)
+
+    summary = sim.summary()
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["ticks_per_second"] = round(ticks / elapsed, 2) if elapsed > 0 else float("inf")
+    for phase, seconds in sim.phase_timer.totals.items():
+        summary[f"phase_{phase}_seconds"] = round(seconds, 3)
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        summary["peak_memory_mb"] = round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return summary
+
 if __name__ == "__main__":
-    main()
+    if args.batch:
+        ticks = args.ticks if args.ticks is not None else BATCH_DEFAULT_TICKS
+        summary = run_batch(max(0, ticks))
+        if args.json:
+            print(json.dumps(summary))
+        else:
+            print("::::::::::::::::::::::SUMMARY::[Batch Mode]::::::::::::::::::::::")
+            for key, value in summary.items():
+                print(f"{key}: {value}")
+        pygame.quit()
+    else:
+        main()
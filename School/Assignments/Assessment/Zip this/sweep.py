@@ -0,0 +1,201 @@
+"""
+Parameter Sweep
+===============
+
+Runs the bee simulation's batch mode over many parameter sets at once and
+collects every run's summary into one CSV table.
+
+Parameter sets are either the grid of every combination of the values given
+with --set, or the rows of a CSV file given with --runs (a header row of
+parameter names, then one run per row). Each set is layered over the base
+parameter file and written to a temporary parameter file. Each run is a
+separate `main.py -b` process, and up to --jobs of them run at the same time.
+
+Example:
+    $ python sweep.py -f map_oasis.csv -p params.csv -t 2000 \\
+          --set H_INITIAL_WORKERS=10,20,40 --set SEED=1,2,3 -o results.csv
+"""
+
+# Standard library imports
+import os
+import sys
+import csv
+import json
+import argparse
+import itertools
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+SWEEP_STATUS_OK = "ok"
+
+def parse_value(text: str):
+    """Convert a parameter value the same way main.load_parameters_from_file does.
+
+    Args:
+        text: Value as written on the command line or in a CSV
+
+    Returns:
+        int, float or str: The converted value
+    """
+    text = text.strip()
+    try:
+        return float(text) if '.' in text else int(text)
+    except ValueError:
+        return text
+
+def read_parameter_file(filepath: str) -> dict:
+    """Read a NAME,value parameter file, keeping the order of its rows.
+
+    Args:
+        filepath: Path to the parameter CSV file
+
+    Returns:
+        dict: Parameter names to values
+    """
+    parameters = {}
+    with open(filepath, mode='r', newline='') as file:
+        for row in csv.reader(file):
+            if len(row) == 2:
+                parameters[row[0].strip()] = parse_value(row[1])
+    return parameters
+
+def grid_runs(settings: list[str]) -> list[dict]:
+    """Every combination of the values given with --set.
+
+    Args:
+        settings: Strings of the form NAME=value1,value2,...
+
+    Returns:
+        list[dict]: One dict of parameter overrides per run
+    """
+    names = []
+    choices = []
+    for setting in settings:
+        name, _, values = setting.partition("=")
+        if not name or not values:
+            raise ValueError(f"--set expects NAME=value1,value2,... but got {setting!r}")
+        names.append(name.strip())
+        choices.append([parse_value(value) for value in values.split(",")])
+    return [dict(zip(names, combination)) for combination in itertools.product(*choices)]
+
+def list_runs(filepath: str) -> list[dict]:
+    """Parameter sets listed one per row in a CSV file with a header row.
+
+    Empty cells leave that parameter at its base value.
+
+    Args:
+        filepath: Path to the runs CSV file
+
+    Returns:
+        list[dict]: One dict of parameter overrides per run
+    """
+    with open(filepath, mode='r', newline='') as file:
+        return [{name.strip(): parse_value(value) for name, value in row.items() if value and value.strip()}
+                for row in csv.DictReader(file)]
+
+def run_one(mapfile: str, parameters: dict, ticks: int, workdir: str, index: int) -> dict:
+    """Run one batch mode simulation in its own process.
+
+    Args:
+        mapfile: Path to the map file
+        parameters: Full parameter set for the run
+        ticks: Number of ticks to simulate
+        workdir: Directory for the run's parameter file
+        index: Run number, used to name the parameter file
+
+    Returns:
+        dict: The run's summary, plus a status that is SWEEP_STATUS_OK or an error message
+    """
+    param_path = os.path.join(workdir, f"run_{index}.csv")
+    with open(param_path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        for name, value in parameters.items():
+            writer.writerow([name, value])
+
+    command = [sys.executable, MAIN_SCRIPT, "-b", "-f", mapfile, "-p", param_path, "-t", str(ticks), "--json"]
+    result = subprocess.run(command, capture_output=True, text=True)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        # a crash ends stderr with the exception, main.py's own errors are printed to stdout
+        output = result.stderr if "Traceback" in result.stderr else result.stdout
+        error = (output.strip().splitlines() or ["no output"])[-1]
+        return {"status": f"exit {result.returncode}: {error}"}
+    try:
+        summary = json.loads(lines[-1])
+    except ValueError:
+        return {"status": f"unreadable summary: {lines[-1]}"}
+    summary["status"] = SWEEP_STATUS_OK
+    return summary
+
+def run_sweep(mapfile: str, base: dict, runs: list[dict], ticks: int, jobs: int) -> list[dict]:
+    """Run every parameter set, up to jobs at a time.
+
+    Args:
+        mapfile: Path to the map file
+        base: Base parameters that each run's overrides are layered over
+        runs: Parameter overrides for each run
+        ticks: Number of ticks to simulate per run
+        jobs: Number of runs to have going at once
+
+    Returns:
+        list[dict]: One row per run, in the order of runs. Each row holds the
+        run number, its overrides and its summary
+    """
+    rows = [None] * len(runs)
+    with tempfile.TemporaryDirectory(prefix="bee_sweep_") as workdir:
+        # the runs are separate processes, so threads are enough to keep jobs of them busy
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(run_one, mapfile, {**base, **overrides}, ticks, workdir, index): index
+                       for index, overrides in enumerate(runs)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                rows[index] = {"run": index, **runs[index], **future.result()}
+                print(f"[{done}/{len(runs)}] run {index} {rows[index]['status']}", file=sys.stderr)
+    return rows
+
+def write_results(rows: list[dict], output) -> None:
+    """Write the results table as CSV.
+
+    Args:
+        rows: Rows from run_sweep
+        output: File object to write to
+    """
+    columns = []
+    for row in rows:
+        columns.extend(column for column in row if column not in columns)
+    writer = csv.DictWriter(output, fieldnames=columns)
+    writer.writeheader()
+    writer.writerows(rows)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the bee simulation over many parameter sets in parallel.")
+    parser.add_argument('-f', '--mapfile', type=str, required=True, help='Path to the map file used by every run.')
+    parser.add_argument('-p', '--paramfile', type=str, help='Base parameter file that each run\'s parameters override.')
+    parser.add_argument('-s', '--set', action='append', default=[], metavar='NAME=V1,V2,...', help='Values to sweep for a parameter. Repeat for more parameters, every combination is run.')
+    parser.add_argument('-r', '--runs', type=str, help='CSV file with a header of parameter names and one parameter set per row, instead of --set.')
+    parser.add_argument('-t', '--ticks', type=int, default=3600, help='Number of ticks per run (default=3600).')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Number of runs at once (default=number of CPUs).')
+    parser.add_argument('-o', '--output', type=str, help='Path of the results CSV (default=standard output).')
+    args = parser.parse_args()
+
+    if bool(args.set) == bool(args.runs):
+        parser.error("give either --set or --runs")
+    try:
+        base = read_parameter_file(args.paramfile) if args.paramfile else {}
+        runs = list_runs(args.runs) if args.runs else grid_runs(args.set)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    rows = run_sweep(args.mapfile, base, runs, args.ticks, max(1, args.jobs))
+
+    if args.output:
+        with open(args.output, mode='w', newline='') as file:
+            write_results(rows, file)
+    else:
+        write_results(rows, sys.stdout)
+
+if __name__ == "__main__":
+    main()
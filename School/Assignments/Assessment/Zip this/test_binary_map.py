@@ -0,0 +1,105 @@
+"""Tests for the BEEMAP01 binary map format and the chunks read from it."""
+
+# Standard library imports
+import os
+import sys
+import json
+import subprocess
+
+# Third-party imports
+import numpy as np
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RUN_TICKS = 300
+
+@pytest.fixture
+def terrain():
+    return np.random.default_rng(0).random((70, 90))
+
+@pytest.fixture
+def map_path(bee_sim, tmp_path, terrain):
+    path = str(tmp_path / "terrain.map")
+    bee_sim.write_binary_map(path, terrain, 0.7, 0.6)
+    return path
+
+def test_binary_map_round_trip(bee_sim, map_path, terrain):
+    header, maparr = bee_sim.open_binary_map(map_path)
+    assert header["magic"] == bee_sim.MAP_FILE_MAGIC
+    assert (header["height"], header["width"]) == terrain.shape
+    assert np.dtype(header["dtype"].decode("ascii")) == np.dtype(bee_sim.MAP_FILE_DTYPE)
+    assert (header["water_threshold"], header["sand_threshold"]) == (0.7, 0.6)
+    assert isinstance(maparr, np.memmap) and not maparr.flags.writeable
+    np.testing.assert_array_equal(maparr, terrain.astype(bee_sim.MAP_FILE_DTYPE))
+    assert os.path.getsize(map_path) == bee_sim.MAP_HEADER_DTYPE.itemsize + maparr.nbytes
+
+def test_foreign_and_truncated_files_are_rejected(bee_sim, map_path, tmp_path):
+    csv_path = os.path.join(HERE, "map_oasis.csv")
+    assert bee_sim.read_map_header(csv_path) is None
+    assert bee_sim.read_map_header(str(tmp_path / "missing.map")) is None
+    for path in (csv_path, str(tmp_path / "missing.map")):
+        with pytest.raises(ValueError, match="not a binary map"):
+            bee_sim.open_binary_map(path)
+
+    data = open(map_path, "rb").read()
+    short = tmp_path / "short.map"
+    short.write_bytes(data[:-1])
+    with pytest.raises(ValueError, match="truncated"):
+        bee_sim.open_binary_map(str(short))
+    header_only = tmp_path / "header.map"
+    header_only.write_bytes(data[:bee_sim.MAP_HEADER_DTYPE.itemsize - 1])
+    with pytest.raises(ValueError, match="not a binary map"):
+        bee_sim.open_binary_map(str(header_only))
+
+@pytest.mark.parametrize("block_rows", [1, 7, 256])
+def test_map_values_in_range(bee_sim, terrain, block_rows):
+    assert bee_sim.map_values_in_range(terrain, block_rows)
+    assert bee_sim.map_values_in_range(np.zeros((5, 5)), block_rows)
+    assert bee_sim.map_values_in_range(np.ones((5, 5)), block_rows)
+    for bad in (1.0001, -0.0001, np.nan, np.inf):
+        maparr = terrain.copy()
+        maparr[-1, -1] = bad # in the last block, whatever the block size
+        assert not bee_sim.map_values_in_range(maparr, block_rows)
+
+def test_mapped_chunks_match_the_whole_map_in_memory(bee_sim, tmp_path):
+    size = 100
+    maparr = np.random.default_rng(1).random((size, size))
+    maparr[20:45, 30:80] = 0.95 # a lake, so there is a shore to be pushed away from
+    path = str(tmp_path / "square.map")
+    bee_sim.write_binary_map(path, maparr, 0.7, 0.6)
+    _, source = bee_sim.open_binary_map(path)
+    maparr = maparr.astype(bee_sim.MAP_FILE_DTYPE)
+    colour_fn = bee_sim.background.get_tile_colours
+    # small chunks and budget, so lookups cross chunks and chunks get dropped and read again
+    chunks = bee_sim.MappedTerrainChunks(source, colour_fn, chunk_size=16, budget=20000)
+
+    assert chunks.shape == (size, size)
+    rng = np.random.default_rng(2)
+    for x, y in rng.integers(0, size, (500, 2)).tolist():
+        assert chunks[x, y] == maparr[x, y]
+    for x0, y0, x1, y1 in ((0, 0, size, size), (5, 17, 60, 33), (31, 0, 32, size)):
+        np.testing.assert_array_equal(chunks.colours(x0, y0, x1, y1), colour_fn(maparr[x0:x1, y0:y1]))
+    np.testing.assert_array_equal(chunks.colours(3, 3, 97, 97, step=4), colour_fn(maparr[4:97:4, 4:97:4]))
+
+    points = rng.uniform(0, size, (3000, 2))
+    water = bee_sim.WaterField(maparr, 0.7)
+    np.testing.assert_allclose(chunks.water_field(0.7).sample(points), water.sample(points), rtol=0, atol=1e-12)
+    assert chunks.cached_bytes <= max(20000, max(chunk.nbytes for chunk in chunks.chunks.values()))
+
+def test_converted_map_runs_like_the_csv(tmp_path):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy")
+
+    def run(*extra):
+        result = subprocess.run([sys.executable, "main.py", "-p", "params.csv", *extra], cwd=HERE, env=env,
+                                capture_output=True, text=True, timeout=600)
+        assert result.returncode == 0, result.stdout + result.stderr
+        return result.stdout
+
+    def summary(mapfile):
+        values = json.loads(run("-b", "--json", "-f", mapfile, "-t", str(RUN_TICKS)).splitlines()[-1])
+        return {key: value for key, value in values.items()
+                if not (key.startswith("phase_") or key in ("elapsed_seconds", "ticks_per_second", "peak_memory_mb"))}
+
+    converted = str(tmp_path / "map_oasis.map")
+    run("-f", "map_oasis.csv", "-c", converted)
+    assert summary(converted) == summary("map_oasis.csv")
@@ -0,0 +1,89 @@
+"""Tests for checkpointing and resuming batch runs."""
+
+# Standard library imports
+import os
+import sys
+import json
+import subprocess
+
+# Third-party imports
+import numpy as np
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RUN_TICKS = 300
+INTERRUPT_TICK = 200
+CHECKPOINT_EVERY = 50
+CHECKPOINT_KEEP = 2
+
+def run_main(*extra) -> subprocess.CompletedProcess:
+    """Run main.py headless on the oasis map."""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy")
+    return subprocess.run([sys.executable, "main.py", "-f", "map_oasis.csv", "-p", "params.csv", *extra],
+                          cwd=HERE, env=env, capture_output=True, text=True, timeout=600)
+
+def run_batch(*extra) -> tuple:
+    """Run batch mode and return its output and its summary, without the timings that change from run to run."""
+    result = run_main("-b", "--json", *extra)
+    assert result.returncode == 0, result.stdout + result.stderr
+    summary = json.loads(result.stdout.splitlines()[-1])
+    return result.stdout, {key: value for key, value in summary.items()
+                           if not (key.startswith("phase_") or key in ("elapsed_seconds", "ticks_per_second", "peak_memory_mb"))}
+
+def batch_summary(*extra) -> dict:
+    return run_batch(*extra)[1]
+
+@pytest.fixture(scope="module")
+def uninterrupted():
+    return batch_summary("-t", str(RUN_TICKS))
+
+@pytest.fixture
+def interrupted(tmp_path):
+    """A checkpoint directory left by a run stopped at INTERRUPT_TICK."""
+    checkpoint_dir = tmp_path / "checkpoints"
+    batch_summary("-t", str(INTERRUPT_TICK), "--checkpoint-every", str(CHECKPOINT_EVERY),
+                  "--checkpoint-keep", str(CHECKPOINT_KEEP), "--checkpoint-dir", str(checkpoint_dir))
+    return checkpoint_dir
+
+def test_only_the_newest_checkpoints_are_kept(interrupted):
+    expected = [f"checkpoint_{tick:08d}.npz" for tick in range(INTERRUPT_TICK - (CHECKPOINT_KEEP - 1) * CHECKPOINT_EVERY,
+                                                                 INTERRUPT_TICK + 1, CHECKPOINT_EVERY)]
+    assert sorted(os.listdir(interrupted)) == expected # and no temporary files left behind
+
+def test_resume_matches_an_uninterrupted_run(interrupted, uninterrupted):
+    resumed = batch_summary("-t", str(RUN_TICKS), "--resume", "--checkpoint-dir", str(interrupted))
+    assert resumed == uninterrupted
+
+def test_resume_skips_an_unreadable_newest_checkpoint(interrupted, uninterrupted):
+    newest = interrupted / f"checkpoint_{INTERRUPT_TICK:08d}.npz"
+    newest.write_bytes(newest.read_bytes()[:100]) # cut short, as a crash while copying it could leave it
+    output, resumed = run_batch("-t", str(RUN_TICKS), "--resume", "--checkpoint-dir", str(interrupted))
+    assert f"Skipping checkpoint {newest}" in output
+    assert f"Resuming from tick {INTERRUPT_TICK - CHECKPOINT_EVERY}" in output
+    assert resumed == uninterrupted
+
+def test_checkpoint_options_need_batch_mode(tmp_path):
+    for option in (["--resume"], ["--checkpoint-every", "10"], ["--checkpoint-dir", str(tmp_path)],
+                   ["--checkpoint-keep", "1"]):
+        result = run_main(*option)
+        assert result.returncode == 1
+        assert f"Error: {option[0]} can only be used in batch mode (-b)." in result.stdout
+
+def test_save_writes_a_temporary_file_and_renames_it(bee_sim, tmp_path, monkeypatch):
+    path = str(tmp_path / "checkpoint.npz")
+    replaced = []
+    replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda src, dst: (replaced.append((src, dst)), replace(src, dst)))
+    bee_sim.sim.save_snapshot(path)
+    assert replaced == [(f"{path}.{os.getpid()}.tmp", path)]
+    saved = open(path, "rb").read()
+
+    def fail(file, **arrays):
+        file.write(b"half a checkpoint")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(np, "savez_compressed", fail)
+    with pytest.raises(OSError):
+        bee_sim.sim.save_snapshot(path)
+    assert open(path, "rb").read() == saved # the last good checkpoint is untouched
+    assert os.listdir(tmp_path) == ["checkpoint.npz"]
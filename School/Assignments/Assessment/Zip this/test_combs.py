@@ -0,0 +1,99 @@
+"""Tests for the comb cell lookup and Creature.dohoneythings."""
+
+# Third-party imports
+import numpy as np
+import pygame
+
+RANDOM_POINTS = 50000
+RANDOM_STATES = 30000
+CELL_VALUES = [-3, -2, -1, -1, 0, 50, 99.95, 100, 100.05, 120]
+
+def cells_within_reach(bee_sim, x, y) -> set:
+    distances = np.hypot(bee_sim.COMB_CENTRES[:, 0] - x, bee_sim.COMB_CENTRES[:, 1] - y)
+    return set(np.flatnonzero(distances <= bee_sim.COMB_RADIUS).tolist())
+
+def test_comb_layout_matches_the_comb_shape(bee_sim):
+    assert bee_sim.COMB_CENTRES.shape == (bee_sim.COMB_WIDTH * bee_sim.COMB_HEIGHT, 2)
+    hive = bee_sim.sim.hives[0]
+    assert [tuple(centre) for centre in bee_sim.COMB_CENTRES.tolist()] == [tuple(comb) for comb in hive.combs]
+
+def test_comb_cells_near_finds_every_cell_within_reach(bee_sim):
+    rng = np.random.default_rng(0)
+    centres = bee_sim.COMB_CENTRES
+    radius = bee_sim.COMB_RADIUS
+    low, high = centres.min(axis=0) - 2 * radius, centres.max(axis=0) + 2 * radius
+    points = rng.uniform(low, high, (RANDOM_POINTS, 2)).tolist()
+    # cell centres and the points on their edges, where rounding decides
+    for x, y in centres.tolist():
+        points += [(x, y), (x - radius, y), (x + radius, y), (x, y - radius), (x, y + radius)]
+    for x, y in points:
+        near = bee_sim.comb_cells_near(x, y)
+        assert len(near) <= 2
+        assert cells_within_reach(bee_sim, x, y) <= set(near), (x, y)
+
+def dohoneythings_loop(bee_sim, bee):
+    """The old version, which looked at every cell of the comb."""
+    i = 0
+    j = 0
+    diff = pygame.Vector2(0, 0)
+    nomForce = pygame.Vector2(0, 0)
+    if bee.honey <= 0 and bee.role == 'worker':
+        bee.seeking_honey = True
+        bee.hive.release(bee)
+    comb_pos = None
+    role = bee.role
+    hive_pos = bee.hive_pos
+    for comb_honey in bee.hive.combs_honey:
+        for comb_honey_actual in comb_honey:
+            comb_pos = pygame.math.Vector2(bee.hive.combs[i][0], bee.hive.combs[i][1])
+            lowest_egg = -1
+            if role == 'worker':
+                if 0 <= comb_honey_actual <= 100:
+                    diff = comb_pos - hive_pos
+                    if diff.magnitude() <= bee_sim.COMB_RADIUS and bee.honey >= 0:
+                        bee.honey = max(bee.honey - 0.1, 0)
+                        bee.hive.combs_honey[j, i % bee_sim.COMB_WIDTH] += 0.1
+                        bee.energy = min(bee.energy + 0.5, bee_sim.CREATURE_INITIAL_ENERGY)
+            elif role == 'queen':
+                if lowest_egg <= comb_honey_actual <= -1:
+                    lowest_egg = comb_honey_actual
+                    diff = comb_pos - hive_pos
+                    if diff.magnitude() <= bee_sim.COMB_RADIUS and bee.eggs > 0:
+                        bee.eggs -= 1
+                        bee.hive.combs_honey[j, i % bee_sim.COMB_WIDTH] -= 1
+            i += 1
+        j += 1
+    if comb_pos and diff.magnitude() != 0:
+        nomForce = diff.normalize() * bee.speed
+    return nomForce
+
+def test_dohoneythings_matches_the_loop(bee_sim):
+    rng = np.random.default_rng(0)
+    centres = bee_sim.COMB_CENTRES
+    bees = [bee for bee in bee_sim.sim.creatures if not bee.outside]
+    assert bees
+    for _ in range(RANDOM_STATES):
+        bee = bees[rng.integers(len(bees))]
+        bee.role = rng.choice(["worker", "worker", "queen", "drone"]).item()
+        if rng.random() < 0.5:
+            # on or next to a cell, sometimes exactly on its edge
+            centre = centres[rng.integers(len(centres))]
+            pos = centre + rng.normal(0, 0.7, 2)
+            if rng.random() < 0.2:
+                pos = centre + np.array([rng.choice([-1, 0, 1]) * bee_sim.COMB_RADIUS, 0.0])
+        else:
+            pos = rng.random(2) * 40
+        combs = rng.choice(CELL_VALUES, size=(bee_sim.COMB_HEIGHT, bee_sim.COMB_WIDTH)).astype(float)
+        honey = rng.choice([0, 0.05, 5]).item()
+        eggs = int(rng.integers(0, 3))
+
+        results = []
+        for update in (dohoneythings_loop, lambda sim, bee: bee.dohoneythings()):
+            bee.hive.admit(bee)
+            bee.hive_pos = pygame.Vector2(pos.tolist())
+            bee.hive.combs_honey = combs.copy()
+            bee.honey, bee.eggs, bee.energy, bee.seeking_honey = honey, eggs, 40, False
+            force = update(bee_sim, bee)
+            results.append((tuple(force), bee.hive.combs_honey.tolist(), bee.honey, bee.eggs, bee.energy,
+                            bee.outside, bee.seeking_honey))
+        assert results[0] == results[1], (bee.role, pos)
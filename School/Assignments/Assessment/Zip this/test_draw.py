@@ -0,0 +1,167 @@
+"""Tests that the faster drawing paths give the same frames as drawing every entity itself."""
+
+# Third-party imports
+import numpy as np
+import pygame
+import pytest
+
+WARMUP_TICKS = 150
+# (scale, camera x, camera y) as fractions of the world size in pixels
+VIEWS = [(None, 0.0, 0.0), (4.0, 0.3, 0.3), (7.5, 0.45, 0.4), (13.0, 0.1, 0.6), (2.25, 0.6, 0.05)]
+# (scale, detection radius, grid units) with the selected bee that far left of the screen,
+# where only its detection ring reaches onto it
+RING_VIEWS = [(13.0, 12.0, 9), (9.0, 12.0, 10), (4.0, 20.0, 16)]
+
+@pytest.fixture(scope="module")
+def screen(bee_sim):
+    """An off-screen surface for main.py to draw on, batch mode has no window."""
+    main_globals = bee_sim.run_batch.__globals__ # the globals main.py's functions really use
+    surface = pygame.Surface((bee_sim.WINDOW_WIDTH, bee_sim.WINDOW_HEIGHT))
+    main_globals["screen"] = surface
+    sim = bee_sim.sim
+    while sim.frames < WARMUP_TICKS:
+        sim.step()
+    yield surface
+    main_globals["screen"] = None
+
+def frame(surface) -> bytes:
+    return pygame.image.tobytes(surface, "RGB")
+
+def zoom(sim, scale):
+    """Change the scale, and the hive sizes to what Hive.update gives them on the next tick."""
+    sim.scaled = scale
+    for hive in sim.hives:
+        hive.size = scale * 4
+
+def set_view(bee_sim, scale, x, y):
+    sim = bee_sim.sim
+    if scale is not None:
+        zoom(sim, scale)
+    world = bee_sim.MAP_SIZE * sim.scaled
+    sim.camera_offset = pygame.Vector2(x * world, y * world)
+
+def draw_everything(sim):
+    """Every entity drawing itself, in the order of the old update loop."""
+    for hive in sim.hives:
+        hive.draw(sim.camera_offset)
+    for bee in sim.creatures:
+        if bee.outside:
+            bee.draw(sim.camera_offset, sim.scaled)
+    for flower in sim.flowers:
+        flower.draw(sim.camera_offset, sim.scaled)
+    for obstacle in sim.obstacles:
+        obstacle.draw(sim.camera_offset, sim.scaled)
+
+@pytest.mark.parametrize("view", VIEWS + RING_VIEWS)
+@pytest.mark.parametrize("selected", [False, True])
+def test_culled_frame_matches_drawing_everything(bee_sim, screen, view, selected):
+    sim = bee_sim.sim
+    main_globals = bee_sim.run_batch.__globals__
+    scaled, camera_offset = sim.scaled, sim.camera_offset
+    detection_radius = main_globals["CREATURE_DETECTION_RADIUS"]
+    try:
+        if view in RING_VIEWS:
+            scale, main_globals["CREATURE_DETECTION_RADIUS"], off_screen = view
+            zoom(sim, scale)
+            bees = [bee for bee in sim.creatures if bee.outside]
+            bee = bees[len(bees) // 2]
+            sim.camera_offset = pygame.Vector2((bee.pos.x + off_screen) * sim.scaled,
+                                               bee.pos.y * sim.scaled - bee_sim.WINDOW_HEIGHT / 2)
+            sim.selected_bee = bee if selected else None
+        else:
+            set_view(bee_sim, *view)
+            x0, y0, x1, y1 = sim.view_rect()
+            outside = [bee for bee in sim.creatures if bee.outside and x0 <= bee.pos.x <= x1 and y0 <= bee.pos.y <= y1]
+            sim.selected_bee = outside[len(outside) // 2] if selected and outside else None
+
+        screen.fill((0, 0, 0))
+        sim.draw()
+        culled = frame(screen)
+        screen.fill((0, 0, 0))
+        draw_everything(sim)
+        assert culled == frame(screen)
+    finally:
+        zoom(sim, scaled)
+        sim.camera_offset, sim.selected_bee = camera_offset, None
+        main_globals["CREATURE_DETECTION_RADIUS"] = detection_radius
+
+def test_cached_text_matches_rendering_every_time(bee_sim, screen):
+    labels = [("12", "topleft", (40, 50)), ("hello bees", "center", (300, 200)), ("12", "center", (41.5, 80.7)),
+              ("0", "topleft", (-3, 10)), ("12", "topleft", (40, 50))]
+    for colour in ((0, 0, 0), bee_sim.TEXT_COLOUR, (255, 0, 0)):
+        screen.fill((90, 140, 60))
+        for text, anchor, position in labels:
+            bee_sim.draw_text(screen, text, bee_sim.STATS_FONT, colour, position, anchor)
+        cached = frame(screen)
+        screen.fill((90, 140, 60))
+        for text, anchor, position in labels:
+            text_surface = bee_sim.STATS_FONT.render(text, True, colour)
+            text_rect = text_surface.get_rect()
+            setattr(text_rect, anchor, position)
+            screen.blit(text_surface, text_rect)
+        assert cached == frame(screen)
+
+def test_text_cache_drops_the_least_recently_used(bee_sim):
+    cache = bee_sim.TextCache(max_entries=3)
+    font, colour = bee_sim.STATS_FONT, (0, 0, 0)
+    first = cache.render("a", font, colour)
+    cache.render("b", font, colour)
+    cache.render("c", font, colour)
+    assert cache.render("a", font, colour) is first
+    cache.render("d", font, colour) # drops "b", used longest ago
+    assert [key[0] for key in cache.surfaces] == ["c", "a", "d"]
+    assert cache.render("a", font, [0, 0, 0]) is first # colours are keyed as tuples
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert cache.hit_rate() == 2 / 6
+    assert bee_sim.TextCache().hit_rate() == 0.0
+
+def test_circle_sprites_match_drawing_circles(bee_sim, screen):
+    rng = np.random.default_rng(0)
+    sprites = bee_sim.CircleSprites()
+    colours = [(255, 0, 0), (30, 200, 90), (10, 10, 250)]
+    circles = [(colours[rng.integers(len(colours))], tuple(rng.uniform(-20, 420, 2)), rng.uniform(0, 30))
+               for _ in range(400)]
+    screen.fill((0, 0, 0))
+    screen.blits([sprites.blit_item(colour, centre, radius) for colour, centre, radius in circles], doreturn=False)
+    blitted = frame(screen)
+    screen.fill((0, 0, 0))
+    for colour, centre, radius in circles:
+        pygame.draw.circle(screen, colour, centre, radius)
+    assert blitted == frame(screen)
+
+def test_sprite_bees_and_flowers_match_drawing_each(bee_sim, screen):
+    sim = bee_sim.sim
+    scaled, camera_offset = sim.scaled, sim.camera_offset
+    try:
+        for view in VIEWS:
+            set_view(bee_sim, *view)
+            bees = [bee for bee in sim.creatures if bee.outside]
+            sim.selected_bee = bees[len(bees) // 3]
+            sim.circle_sprites.rescale(sim.scaled)
+
+            screen.fill((0, 0, 0))
+            sim.draw_bees(bees)
+            sim.draw_flowers(sim.flowers)
+            batched = frame(screen)
+            screen.fill((0, 0, 0))
+            for bee in bees:
+                bee.draw(sim.camera_offset, sim.scaled)
+            for flower in sim.flowers:
+                flower.draw(sim.camera_offset, sim.scaled)
+            assert batched == frame(screen), view
+    finally:
+        zoom(sim, scaled)
+        sim.camera_offset, sim.selected_bee = camera_offset, None
+
+def test_circle_sprites_are_dropped_on_rescale_and_overflow(bee_sim):
+    sprites = bee_sim.CircleSprites(max_entries=2)
+    sprites.rescale(1.0)
+    first = sprites.sprite((1, 2, 3), 4)
+    assert sprites.sprite((1, 2, 3), 4) is first
+    sprites.rescale(1.0)
+    assert sprites.sprites
+    sprites.rescale(2.0)
+    assert not sprites.sprites
+    for radius in range(3):
+        sprites.sprite((1, 2, 3), radius)
+    assert list(sprites.sprites) == [((1, 2, 3), 2)]
@@ -0,0 +1,89 @@
+"""Tests for Hive.update_eggs against the cell-by-cell loop it replaced."""
+
+# Third-party imports
+import numpy as np
+
+RANDOM_STATES = 20000
+CELL_VALUES = [-40, -31, -30, -29, -5, -2, -1, 0, 50, 80, 81, 100]
+
+class SpawnRecorder():
+    """Stands in for the simulation, remembers where bees were spawned."""
+
+    def __init__(self):
+        self.spawned = []
+
+    def spawn_new_bee(self, hive, pos):
+        self.spawned.append(pos)
+
+def update_eggs_loop(bee_sim, hive, manager, max_hatch):
+    """The old per-cell loop, carried on past a hatch until max_hatch eggs have hatched."""
+    hatched = 0
+    for r_egg, row_data in enumerate(hive.combs_honey):
+        for c_egg, value in enumerate(row_data):
+            if value <= bee_sim.EGG_CELL_VALUE:
+                hive.combs_honey[r_egg, c_egg] -= 1
+                if value <= bee_sim.H_EGG_MATURE_VALUE:
+                    honey_rows, honey_cols = np.where(hive.combs_honey > bee_sim.H_HATCH_HONEY_VALUE)
+                    if honey_rows.size >= bee_sim.H_HATCH_HONEY_CELLS:
+                        for i in range(bee_sim.H_HATCH_HONEY_CELLS):
+                            hive.combs_honey[honey_rows[i], honey_cols[i]] = 0
+                        hive.combs_honey[r_egg, c_egg] = -1
+                        manager.spawn_new_bee(hive, hive.combs[r_egg * bee_sim.COMB_WIDTH + c_egg])
+                        hatched += 1
+                        if hatched >= max_hatch:
+                            return
+
+def make_hive(bee_sim):
+    hive = bee_sim.Hive.__new__(bee_sim.Hive)
+    hive.combs = [(i, i) for i in range(bee_sim.COMB_WIDTH * bee_sim.COMB_HEIGHT)]
+    return hive
+
+def random_combs(bee_sim, rng):
+    combs = rng.choice(CELL_VALUES, size=(bee_sim.COMB_HEIGHT, bee_sim.COMB_WIDTH)).astype(float)
+    if rng.random() < 0.5:
+        combs += rng.random(combs.shape) # fractional honey, and eggs between the whole values
+    return combs
+
+def check_against_loop(bee_sim, hive, combs, max_hatch):
+    hive.combs_honey = combs.copy()
+    expected_manager = SpawnRecorder()
+    update_eggs_loop(bee_sim, hive, expected_manager, max_hatch)
+    expected = hive.combs_honey.copy()
+
+    hive.combs_honey = combs.copy()
+    manager = SpawnRecorder()
+    hive.update_eggs(manager, max_hatch)
+    np.testing.assert_array_equal(hive.combs_honey, expected)
+    assert manager.spawned == expected_manager.spawned
+
+def test_one_hatch_matches_the_loop(bee_sim):
+    rng = np.random.default_rng(1)
+    hive = make_hive(bee_sim)
+    for _ in range(RANDOM_STATES):
+        check_against_loop(bee_sim, hive, random_combs(bee_sim, rng), 1)
+
+def test_batched_hatches_match_the_loop(bee_sim):
+    rng = np.random.default_rng(2)
+    hive = make_hive(bee_sim)
+    for _ in range(RANDOM_STATES // 10):
+        check_against_loop(bee_sim, hive, random_combs(bee_sim, rng), int(rng.integers(2, 8)))
+
+def test_default_batch_is_one_hatch(bee_sim):
+    hive = make_hive(bee_sim)
+    combs = np.full((bee_sim.COMB_HEIGHT, bee_sim.COMB_WIDTH), 100.0)
+    combs[0, :4] = bee_sim.H_EGG_MATURE_VALUE
+    hive.combs_honey = combs
+    manager = SpawnRecorder()
+    hive.update_eggs(manager)
+    assert len(manager.spawned) == bee_sim.H_HATCH_BATCH == 1
+
+def test_no_hatches_still_ages_every_egg(bee_sim):
+    hive = make_hive(bee_sim)
+    combs = random_combs(bee_sim, np.random.default_rng(3))
+    hive.combs_honey = combs.copy()
+    manager = SpawnRecorder()
+    hive.update_eggs(manager, max_hatch=0)
+    eggs = combs <= bee_sim.EGG_CELL_VALUE
+    np.testing.assert_array_equal(hive.combs_honey[eggs], combs[eggs] - 1)
+    np.testing.assert_array_equal(hive.combs_honey[~eggs], combs[~eggs])
+    assert manager.spawned == []
@@ -0,0 +1,84 @@
+"""Tests for the nearest unsaturated flower lookup."""
+
+# Third-party imports
+import numpy as np
+import pygame
+
+RANDOM_QUERIES = 3000
+
+def nearest_by_scan(bee_sim, flowers, pos):
+    """The old linear scan over every flower, keeping the first of the nearest with room for more bees."""
+    closest = None
+    for flower in flowers:
+        if flower.n_bees <= bee_sim.F_MAX_BEES:
+            if closest is None or bee_sim.distance(flower.pos, pos) < bee_sim.distance(closest.pos, pos):
+                closest = flower
+    return closest
+
+def make_flowers(bee_sim, positions, n_bees=0):
+    flowers = [bee_sim.Flower(x, y) for x, y in positions]
+    for flower in flowers:
+        flower.n_bees = n_bees
+    return flowers
+
+def test_nearest_matches_the_linear_scan(bee_sim):
+    rng = np.random.default_rng(0)
+    # whole-number positions on a small grid, so many flowers are the same distance away
+    flowers = make_flowers(bee_sim, rng.integers(0, 12, (40, 2)).tolist())
+    index = bee_sim.FlowerIndex()
+    index.rebuild(flowers)
+    for _ in range(RANDOM_QUERIES):
+        flower = flowers[rng.integers(len(flowers))]
+        if rng.random() < 0.5:
+            index.add_visitor(flower)
+        elif flower.n_bees > 0:
+            index.remove_visitor(flower)
+        if rng.random() < 0.3:
+            # push a flower up to the threshold, so it is one visitor away from saturation
+            flower.n_bees = bee_sim.F_MAX_BEES
+            index.rebuild(flowers)
+        pos = pygame.Vector2((rng.integers(-2, 28, 2) / 2).tolist())
+        assert index.nearest(pos) is nearest_by_scan(bee_sim, flowers, pos)
+
+def test_ties_go_to_the_earlier_flower(bee_sim):
+    left, right = make_flowers(bee_sim, [(0, 5), (10, 5)])
+    index = bee_sim.FlowerIndex()
+    middle = pygame.Vector2(5, 5)
+    index.rebuild([left, right])
+    assert index.nearest(middle) is left
+    index.rebuild([right, left])
+    assert index.nearest(middle) is right
+
+def test_visitors_crossing_the_threshold_flip_availability(bee_sim):
+    near, far = make_flowers(bee_sim, [(1, 1), (9, 9)], n_bees=bee_sim.F_MAX_BEES)
+    index = bee_sim.FlowerIndex()
+    index.rebuild([near, far])
+    origin = pygame.Vector2(0, 0)
+    assert index.available.tolist() == [True, True]
+    assert index.nearest(origin) is near
+
+    index.add_visitor(near)
+    assert index.available.tolist() == [False, True]
+    assert index.nearest(origin) is far
+    index.add_visitor(far)
+    assert index.nearest(origin) is None
+
+    index.remove_visitor(near)
+    assert index.available.tolist() == [True, False]
+    assert index.nearest(origin) is near
+
+def test_removing_a_flower_rebuilds_the_index(bee_sim):
+    sim = bee_sim.sim
+    flower = sim.flowers[0]
+    pos = pygame.Vector2(flower.pos)
+    assert sim.flower_index.nearest(pos) is flower
+
+    sim.rem_flo(flower)
+    assert sim.flower_index.flowers == sim.flowers
+    assert flower not in sim.flower_index.rows
+    assert sim.flower_index.nearest(pos) is nearest_by_scan(bee_sim, sim.flowers, pos)
+    sim.flower_index.remove_visitor(flower) # bees still heading to a removed flower can leave it
+
+    sim.add_flo(flower)
+    assert sim.flower_index.flowers == sim.flowers
+    assert sim.flower_index.nearest(pos) is flower
@@ -0,0 +1,93 @@
+"""Tests for the aggregate hive interior model behind --hive-lod."""
+
+# Standard library imports
+import types
+
+# Third-party imports
+import numpy as np
+
+RANDOM_STATES = 500
+CELL_VALUES = [-5, -2, -1, -1, 0, 0, 30, 99.9, 100, 100.05, 120]
+LOD_RUN_TICKS = 400
+
+def random_interior(bee_sim, hive, rng) -> dict:
+    """Put every bee of the hive inside with a random role, honey and eggs, and fill the comb at random."""
+    for bee in hive.bees_outside[:]:
+        hive.admit(bee)
+    for bee in hive.bees_inside:
+        bee.role = rng.choice(["worker", "worker", "worker", "queen", "drone"]).item()
+        bee.honey = rng.choice([0.0, 0.5, 2.0, 25.0]).item()
+        bee.energy = rng.uniform(0, bee_sim.CREATURE_INITIAL_ENERGY)
+        bee.eggs = int(rng.integers(0, 6))
+        bee.seeking_honey = bool(rng.random() < 0.1)
+    hive.combs_honey = rng.choice(CELL_VALUES, size=(bee_sim.COMB_HEIGHT, bee_sim.COMB_WIDTH)).astype(float)
+    hive.lod_ticks = int(rng.integers(1, 4 * bee_sim.HIVE_LOD_INTERVAL))
+    return {bee: (bee.role, bee.honey, bee.energy, bee.eggs, bee.seeking_honey) for bee in hive.bees_inside}
+
+def test_aggregate_update_keeps_its_invariants(bee_sim):
+    rng = np.random.default_rng(0)
+    hive = bee_sim.sim.hives[0]
+    for _ in range(RANDOM_STATES):
+        before = random_interior(bee_sim, hive, rng)
+        combs = hive.combs_honey.copy()
+        ticks = hive.lod_ticks
+        last_tick = int(rng.integers(ticks, 10000))
+        hive.update_aggregate(types.SimpleNamespace(rng=np.random.default_rng(int(rng.integers(1 << 32)))), last_tick)
+        cells = hive.combs_honey
+        assert hive.lod_ticks == 0
+
+        # honey only moves from the workers into cells that held 0 to 100, up to the cell capacity
+        fillable = (combs >= 0) & (combs <= 100)
+        assert np.all(cells[~fillable & (combs != -1)] == combs[~fillable & (combs != -1)])
+        assert np.all(cells[fillable] >= combs[fillable])
+        assert np.all(cells[fillable] <= bee_sim.HIVE_LOD_CELL_CAPACITY + 1e-9)
+        worker_honey = sum(honey for role, honey, *_ in before.values() if role == 'worker')
+        assert np.isclose(cells[fillable].sum() - combs[fillable].sum(),
+                          worker_honey - sum(bee.honey for bee, (role, *_) in before.items() if role == 'worker'))
+
+        # queens only lay into empty cells, one egg each
+        laid = combs - cells
+        assert np.all(laid[combs == -1] >= 0) and np.all(laid[combs == -1] <= 1)
+        queen_eggs_gained = sum(last_tick // 60 - (last_tick - ticks) // 60
+                                for role, *_ in before.values() if role == 'queen')
+        queen_eggs = sum(bee.eggs - eggs for bee, (role, _, _, eggs, _) in before.items() if role == 'queen')
+        assert queen_eggs == queen_eggs_gained - int(laid[combs == -1].sum())
+
+        for bee, (role, honey, energy, eggs, seeking_honey) in before.items():
+            if role != 'worker' or seeking_honey:
+                if role != 'queen':
+                    assert (bee.honey, bee.energy, bee.eggs) == (honey, energy, eggs)
+                assert not bee.outside and bee in hive.bees_inside
+                continue
+            deposit = honey - bee.honey
+            assert -1e-12 <= deposit <= bee_sim.HIVE_LOD_DEPOSIT_RATE * ticks + 1e-12
+            assert np.isclose(bee.energy, min(energy + deposit * bee_sim.HIVE_LOD_ENERGY_PER_HONEY,
+                                              bee_sim.CREATURE_INITIAL_ENERGY))
+            # a worker with no honey left goes looking for more
+            assert bee.outside == (bee.honey <= 0) == bee.seeking_honey
+
+def test_aggregate_update_is_deterministic(bee_sim):
+    hive = bee_sim.sim.hives[0]
+    results = []
+    for _ in range(2):
+        before = random_interior(bee_sim, hive, np.random.default_rng(1))
+        hive.update_aggregate(types.SimpleNamespace(rng=np.random.default_rng(2)), 5000)
+        results.append((hive.combs_honey.tolist(),
+                        [(bee.honey, bee.energy, bee.eggs, bee.outside, bee.seeking_honey) for bee in before]))
+    assert results[0] == results[1]
+
+def test_hive_lod_run_keeps_every_bee(bee_sim):
+    sim = bee_sim.sim
+    sim.hive_lod = True
+    try:
+        for _ in range(LOD_RUN_TICKS):
+            combs = [hive.combs_honey.copy() for hive in sim.hives]
+            sim.step()
+            for hive, before in zip(sim.hives, combs):
+                assert hive.lod_ticks < bee_sim.HIVE_LOD_INTERVAL
+                # no deposit takes a cell past the capacity, cells can start above it
+                assert np.all(hive.combs_honey <= np.maximum(before, bee_sim.HIVE_LOD_CELL_CAPACITY) + 1e-9)
+    finally:
+        sim.hive_lod = False
+    summary = sim.summary()
+    assert summary["bees"] == summary["bees_inside"] + summary["bees_outside"] == sim.bees.count
@@ -0,0 +1,57 @@
+"""Tests for saving and replaying simulation snapshots."""
+
+# Third-party imports
+import numpy as np
+import pytest
+
+SNAPSHOT_TICK = 200
+REPLAY_TICKS = 300
+
+def run_state(sim) -> dict:
+    """Everything a replay has to reproduce: the summary and every bee's row."""
+    store = sim.bees
+    n = store.count
+    return {
+        "summary": sim.summary(),
+        "store": {name: getattr(store, name)[:n].copy() for name in store._fields()},
+        "creatures": [bee.idx for bee in sim.creatures],
+        "combs_honey": [hive.combs_honey.copy() for hive in sim.hives],
+        "flowers": [(tuple(flower.pos), flower.pollen, flower.n_bees) for flower in sim.flowers],
+    }
+
+def test_snapshot_replays_the_same_run(bee_sim, tmp_path):
+    sim = bee_sim.sim
+    while sim.frames < SNAPSHOT_TICK:
+        sim.step()
+    snapshot = tmp_path / "snapshot.npz"
+    sim.save_snapshot(str(snapshot))
+    for _ in range(REPLAY_TICKS):
+        sim.step()
+    expected = run_state(sim)
+
+    sim.load_snapshot(str(snapshot))
+    assert sim.frames == SNAPSHOT_TICK
+    for _ in range(REPLAY_TICKS):
+        sim.step()
+    replayed = run_state(sim)
+
+    assert replayed["summary"] == expected["summary"]
+    assert replayed["creatures"] == expected["creatures"]
+    assert replayed["store"].keys() == expected["store"].keys()
+    for name, values in expected["store"].items():
+        np.testing.assert_array_equal(replayed["store"][name], values, err_msg=name)
+    for replayed_combs, combs in zip(replayed["combs_honey"], expected["combs_honey"], strict=True):
+        np.testing.assert_array_equal(replayed_combs, combs)
+    assert replayed["flowers"] == expected["flowers"]
+
+def test_snapshot_from_another_map_is_refused(bee_sim, tmp_path):
+    sim = bee_sim.sim
+    snapshot = tmp_path / "snapshot.npz"
+    sim.save_snapshot(str(snapshot))
+    fingerprint = sim.background.fingerprint
+    sim.background.fingerprint = "map:another"
+    try:
+        with pytest.raises(ValueError):
+            sim.load_snapshot(str(snapshot))
+    finally:
+        sim.background.fingerprint = fingerprint
@@ -0,0 +1,53 @@
+"""Tests for the spatial hash behind the flocking neighbour lookup."""
+
+# Third-party imports
+import numpy as np
+import pytest
+
+def pairs_within(points, groups, radius) -> set:
+    """Every (i, j) pair of different points in the same group within radius, by brute force."""
+    dist = np.hypot(*(points[:, None, :] - points[None, :, :]).transpose(2, 0, 1))
+    near = (dist <= radius) & (groups[:, None] == groups[None, :])
+    np.fill_diagonal(near, False)
+    return set(zip(*(index.tolist() for index in np.nonzero(near))))
+
+def hashed_pairs_within(grid, points, groups, radius) -> set:
+    query, candidate = grid.query_pairs(points, groups)
+    dist = np.hypot(*(points[query] - points[candidate]).T)
+    keep = (dist <= radius) & (query != candidate)
+    return set(zip(query[keep].tolist(), candidate[keep].tolist()))
+
+@pytest.mark.parametrize("radius", [0.5, 2.5, 7.0])
+def test_query_pairs_finds_every_pair_within_the_cell_size(bee_sim, radius):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 40, (600, 2))
+    groups = rng.integers(0, 3, 600)
+    grid = bee_sim.SpatialHash(radius)
+    grid.rebuild(points, groups)
+    assert hashed_pairs_within(grid, points, groups, radius) == pairs_within(points, groups, radius)
+
+@pytest.mark.parametrize("radius", [6.0, 1.0])
+def test_radius_changed_after_the_simulation_is_created(bee_sim, radius, monkeypatch):
+    sim = bee_sim.sim
+    grid = sim.bee_grid
+    rebuilds = []
+
+    def rebuild(points, groups, *args):
+        rebuilds.append((points.copy(), groups.copy()))
+        bee_sim.SpatialHash.rebuild(grid, points, groups, *args)
+
+    monkeypatch.setattr(grid, "rebuild", rebuild)
+    main_globals = bee_sim.run_batch.__globals__
+    detection_radius = main_globals["CREATURE_DETECTION_RADIUS"]
+    assert sim.bee_grid.cell_size == detection_radius
+    main_globals["CREATURE_DETECTION_RADIUS"] = radius # as interactive mode does after the sim is made
+    try:
+        sim.step()
+        assert grid.cell_size == radius
+        points, groups = rebuilds[-1] # the bees the hash was built from this tick
+        expected = pairs_within(points, groups, radius)
+        assert expected
+        assert hashed_pairs_within(grid, points, groups, radius) == expected
+    finally:
+        main_globals["CREATURE_DETECTION_RADIUS"] = detection_radius
+        sim.step()
@@ -0,0 +1,55 @@
+"""Tests for the vectorised terrain generation and colouring."""
+
+# Third-party imports
+import numpy as np
+import pytest
+
+def test_perlin_noise_matches_pnoise2(bee_sim):
+    noise = pytest.importorskip("noise") # the simulation no longer needs it, only this comparison does
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-50, 2000, 2000)
+    y = rng.uniform(-50, 2000, 2000)
+    for octaves in (1, 4, 6):
+        expected = [noise.pnoise2(float(px), float(py), octaves) for px, py in zip(x, y)]
+        np.testing.assert_array_equal(bee_sim.perlin_noise_2d(x, y, octaves), np.float32(expected))
+
+def test_terrain_matches_per_cell_generation(bee_sim):
+    noise = pytest.importorskip("noise")
+    size, x_offset, y_offset = 40, 1234, 987
+    terrain = bee_sim.generate_terrain(np.arange(size), np.arange(size), x_offset, y_offset, size)
+    scale = bee_sim.BG_NOISE_SCALE
+    # the double loop generate_background_texture used to run
+    expected = np.zeros((size, size))
+    for i in range(size):
+        for j in range(size):
+            value = noise.pnoise2((i + x_offset) * scale / size, (j + y_offset) * scale / size,
+                                  bee_sim.BG_NOISE_OCTAVES)
+            expected[i][j] = (value + 1) / 2
+    np.testing.assert_array_equal(terrain, expected)
+
+def test_terrain_is_the_same_generated_in_parts(bee_sim):
+    size = 96
+    whole = bee_sim.generate_terrain(np.arange(size), np.arange(size), 10, 20, size)
+    part = bee_sim.generate_terrain(np.arange(30, 70), np.arange(5, 90), 10, 20, size)
+    np.testing.assert_array_equal(part, whole[30:70, 5:90])
+    assert whole.min() >= 0 and whole.max() <= 1
+
+def test_tile_colours_match_per_tile_colours(bee_sim):
+    terrain = np.concatenate((np.linspace(0, 1, 1001), [bee_sim.BG_SAND_THRESHOLD, bee_sim.BG_WATER_THRESHOLD]))
+    colours = bee_sim.background.get_tile_colours(terrain)
+
+    def channel(value):
+        return max(0, min(255, int(round(value))))
+
+    # the per-tile get_tile_colour this replaced
+    for pno, colour in zip(terrain.tolist(), colours.tolist()):
+        c_float = 255 * (pno**bee_sim.BG_COLOUR_DULLNESS_EXP)
+        fav_float = 255 * (pno**bee_sim.BG_COLOUR_VIBRANCY_EXP)
+        c, fav = channel(c_float), channel(fav_float)
+        if pno >= bee_sim.BG_WATER_THRESHOLD:
+            expected = [channel(220 - c_float), channel(200 - c_float / 2.0), fav]
+        elif bee_sim.BG_SAND_THRESHOLD < pno < bee_sim.BG_WATER_THRESHOLD:
+            expected = [fav, fav, c]
+        else:
+            expected = [c, channel(fav_float + 15), channel(c_float - 10)]
+        assert colour == expected, pno